@@ -1,12 +1,18 @@
 from .basics import QComposed, QOperation, QParticle, QSystem, QSystemStruct, R
-from .operations import AllocateParticle, C, CNOT, CX, CY, CZ, Controlled, DM, DesiredMeasure, DesiredMeasurement, \
-    GlobalPhaseGate, H, HGate, HadamardGate, HalfPiPhaseGate, I, Identity, M, MatrixOperation, Measure, \
-    MeasurementResult, NOT, NOTGate, PauliXGate, PauliYGate, PauliZGate, Phase, ProjectiveMeasurement, \
-    PureStatePreparation, QuarterPiPhaseGate, QubitsMatrixOperation, Remapped, RotationXGate, RotationYGate, \
-    RotationZGate, Rx, Ry, Rz, S, SGate, Sequential, T, TGate, X, XGate, Y, YGate, Z, ZGate, allocate_particle, \
-    allocate_qubit, allocate_qubits
+from .formats import load_circuit, read_qasm, save_circuit, write_qasm
+from .operations import AllocateParticle, AmplitudeDampingChannel, C, CNOT, CX, CY, CZ, Checkpoint, CompactCircuit, \
+    Controlled, DM, DepolarizingChannel, DesiredMeasure, DesiredMeasurement, GlobalPhaseGate, H, HGate, HadamardGate, \
+    HalfPiPhaseGate, I, Identity, InverseHalfPiPhaseGate, InverseQFT, InverseQuantumFourierTransform, \
+    InverseQuarterPiPhaseGate, KrausChannel, Layout, M, MatrixOperation, Measure, MeasurementResult, Moment, NOT, \
+    NOTGate, PauliChannel, PauliEvolution, PauliXGate, PauliYGate, PauliZGate, Phase, ProjectiveMeasurement, \
+    PureStatePreparation, QFT, QuantumFourierTransform, QuarterPiPhaseGate, QubitsMatrixOperation, ReadoutError, \
+    Remapped, Repeat, RotationXGate, RotationYGate, RotationZGate, Rx, Ry, Rz, S, SGate, Sdg, SdgGate, Sequential, \
+    StreamingSequential, T, TGate, Tdg, TdgGate, X, XGate, Y, YGate, Z, ZGate, allocate_particle, allocate_qubit, \
+    allocate_qubits
 from .traits import CompilePass, Conversion, QRuntime, apply, compile, convert, get_current_runtime, match_apply_impls, \
     match_compile_impls, match_convert_impls, register_apply_impl, register_compile_impl, register_convert_impl, \
     set_current_runtime
-from .traits_impls import BnkParticle, BnkRuntime, BnkState, FlattenPass, FreezePass, Invert, SymbolicParticle, \
-    SymbolicRuntime, ToMatrix
+from .traits_impls import BnkParticle, BnkRuntime, BnkSnapshot, BnkState, BranchingRuntime, DensityMatrixRuntime, \
+    FlattenPass, FreezePass, Invert, LayoutPass, LightConePass, SchedulePass, SimulationCache, SimulationResult, \
+    StructuralHash, SymbolicParticle, SymbolicRuntime, ToMatrix, ToSparseMatrix, TrajectoryRuntime, run_parallel, \
+    simulate
@@ -1,2 +1,2 @@
-from .operation import QOperation, R
+from .operation import QOperation, QOperationMeta, R, intern_operation
 from .system import QComposed, QParticle, QSystem, QSystemStruct
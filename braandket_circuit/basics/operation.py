@@ -1,5 +1,6 @@
 import abc
-from typing import Generic, Iterable, Optional, ParamSpec, TypeVar, Union, overload
+import weakref
+from typing import Generic, Hashable, Iterable, Optional, ParamSpec, TypeVar, Union, overload
 
 from .system import QSystemStruct
 
@@ -9,7 +10,14 @@ QSystemSpec = ParamSpec('QSystemSpec', bound=QSystemStruct)
 IndexStruct = Union[int, Iterable['IndexStruct']]
 
 
-class QOperation(Generic[R], abc.ABC):
+class QOperationMeta(abc.ABCMeta):
+    def __call__(cls, *args, **kwargs):
+        return intern_operation(super().__call__(*args, **kwargs))
+
+
+class QOperation(Generic[R], abc.ABC, metaclass=QOperationMeta):
+    __slots__ = ('_name', '__weakref__')
+
     def __init_subclass__(cls, **kwargs):
         if cls.__call__ != QOperation.__call__:
             cls._custom_call = cls.__call__
@@ -30,6 +38,24 @@ class QOperation(Generic[R], abc.ABC):
         name_str = f" name={self.name}" if self.name else ""
         return f"<{type(self).__name__}{name_str}>"
 
+    # interning
+
+    def _intern_key(self) -> Optional[Hashable]:
+        """ Structural key of an immutable operation, or None to compare and hash it by identity. """
+        return None
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(self) is not type(other):
+            return NotImplemented
+        key = self._intern_key()
+        return key is not None and key == other._intern_key()
+
+    def __hash__(self):
+        key = self._intern_key()
+        return object.__hash__(self) if key is None else hash((type(self), key))
+
     # remap
 
     @overload
@@ -64,3 +90,16 @@ class QOperation(Generic[R], abc.ABC):
 
         from braandket_circuit import Controlled
         return Remapped(Controlled(self), control, target)
+
+
+# interning
+
+_intern_table: weakref.WeakValueDictionary[Hashable, QOperation] = weakref.WeakValueDictionary()
+
+
+def intern_operation(op: QOperation) -> QOperation:
+    """ Returns the canonical instance structurally equal to op, registering op if there is none yet. """
+    key = op._intern_key()
+    if key is None:
+        return op
+    return _intern_table.setdefault((type(op), key), op)
@@ -0,0 +1,2 @@
+from .binary import load_circuit, save_circuit
+from .qasm import read_qasm, write_qasm
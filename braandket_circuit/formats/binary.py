@@ -0,0 +1,234 @@
+import json
+import os
+import struct
+from typing import Any
+
+import numpy as np
+
+from braandket_circuit.basics import QOperation
+from braandket_circuit.operations import AllocateParticle, AmplitudeDampingChannel, Checkpoint, CompactCircuit, \
+    Controlled, DepolarizingChannel, DesiredMeasurement, GlobalPhaseGate, HadamardGate, HalfPiPhaseGate, Identity, \
+    InverseHalfPiPhaseGate, InverseQuantumFourierTransform, InverseQuarterPiPhaseGate, KrausChannel, Layout, \
+    MatrixOperation, Moment, PauliChannel, PauliEvolution, PauliXGate, PauliYGate, PauliZGate, ProjectiveMeasurement, \
+    PureStatePreparation, QuantumFourierTransform, QuarterPiPhaseGate, QubitsMatrixOperation, ReadoutError, Remapped, \
+    Repeat, RotationXGate, RotationYGate, RotationZGate, Sequential
+from braandket_circuit.utils import freeze_struct
+
+_MAGIC = b"BNKC"
+_VERSION = 2
+_ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<4sIQ")  # magic, version, header size
+
+_COLUMNS = {
+    'parametric': np.dtype('|b1'),
+    'opcodes': np.dtype('<i4'),
+    'params': np.dtype('<f8'),
+    'remapped': np.dtype('|b1'),
+    'offsets': np.dtype('<i8'),
+    'indices': np.dtype('<i4'),
+}
+
+
+def save_circuit(circuit: QOperation, path: str | os.PathLike):
+    """ Saves the circuit in the binary format read by load_circuit(), flattening it into a CompactCircuit first.
+
+    The file holds a JSON header, the table of distinct ops as JSON data and the aligned raw columns.
+    Only built-in operations can be saved, as custom ones have no data form.
+    """
+    if not isinstance(circuit, CompactCircuit):
+        from braandket_circuit.traits_impls import FlattenPass
+        from braandket_circuit.traits import compile
+        flattened = compile(FlattenPass(), circuit)
+        if not isinstance(flattened, Sequential):
+            flattened = Sequential([flattened], name=circuit.name)
+        circuit = CompactCircuit.from_sequential(flattened)
+
+    ops_bytes = json.dumps([_encode_op(op) for op in circuit.ops]).encode()
+    columns = {name: np.ascontiguousarray(getattr(circuit, name), dtype=dtype) for name, dtype in _COLUMNS.items()}
+
+    # the header size depends on the offsets it contains, so the offsets are computed from a size bound
+    header = {'name': circuit.name, 'ops': None, 'columns': {}}
+    header_size = _align(len(json.dumps(_header_bound(header, columns)).encode()))
+    offset = _align(_PREAMBLE.size + header_size)
+    header['ops'] = [offset, len(ops_bytes)]
+    offset = _align(offset + len(ops_bytes))
+    for name, column in columns.items():
+        header['columns'][name] = [offset, len(column)]
+        offset = _align(offset + column.nbytes)
+    header_bytes = json.dumps(header).encode().ljust(header_size)
+
+    with open(path, 'wb') as file:
+        file.write(_PREAMBLE.pack(_MAGIC, _VERSION, header_size))
+        file.write(header_bytes)
+        _write_at(file, header['ops'][0], ops_bytes)
+        for name, column in columns.items():
+            _write_at(file, header['columns'][name][0], column.tobytes())
+
+
+def load_circuit(path: str | os.PathLike, *, mmap: bool = True) -> CompactCircuit:
+    """ Loads a circuit saved by save_circuit().
+
+    With mmap, the columns are read-only numpy.memmap views of the file, shared by all the processes mapping it,
+    and only the small table of ops is decoded. The ops are rebuilt from data by their constructors,
+    so loading a file never runs code from it, and the rebuilt ops (nested ones included) are interned.
+    """
+    with open(path, 'rb') as file:
+        magic, version, header_size = _PREAMBLE.unpack(file.read(_PREAMBLE.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a braandket circuit file.")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported circuit file version {version}.")
+        header = json.loads(file.read(header_size).decode())
+
+        ops_offset, ops_size = header['ops']
+        file.seek(ops_offset)
+        ops = tuple(_decode_op(data) for data in json.loads(file.read(ops_size).decode()))
+
+        columns = {}
+        for name, dtype in _COLUMNS.items():
+            offset, length = header['columns'][name]
+            if mmap and length > 0:
+                columns[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(length,))
+            else:
+                file.seek(offset)
+                columns[name] = np.fromfile(file, dtype=dtype, count=length)
+
+    return CompactCircuit(ops, **columns, name=header['name'])
+
+
+# ops
+
+_constant_types = (
+    PauliXGate, PauliYGate, PauliZGate, HalfPiPhaseGate, QuarterPiPhaseGate, InverseHalfPiPhaseGate,
+    InverseQuarterPiPhaseGate, HadamardGate, Identity, Checkpoint, Layout, ProjectiveMeasurement)
+_rotation_types = (RotationXGate, RotationYGate, RotationZGate, GlobalPhaseGate)
+_fourier_types = (QuantumFourierTransform, InverseQuantumFourierTransform)
+_matrix_types = (MatrixOperation, QubitsMatrixOperation)
+_op_types = {typ.__name__: typ for typ in (
+    *_constant_types, *_rotation_types, *_fourier_types, *_matrix_types,
+    AllocateParticle, DesiredMeasurement, PureStatePreparation, PauliEvolution,
+    KrausChannel, PauliChannel, DepolarizingChannel, AmplitudeDampingChannel, ReadoutError,
+    Controlled, Remapped, Repeat, Sequential, Moment)}
+
+
+def _encode_op(op: QOperation) -> dict:
+    typ = type(op)
+    if _op_types.get(typ.__name__) is not typ:
+        raise ValueError(f"Can not save operation {op}, which is not built-in.")
+
+    if typ in _constant_types:
+        fields = {}
+    elif typ in _rotation_types:
+        fields = {'theta': _encode_value(op.theta)}
+    elif typ in _fourier_types:
+        fields = {'n': op.n}
+    elif typ in _matrix_types:
+        fields = {'matrix': _encode_value(op.matrix)}
+    elif typ is AllocateParticle:
+        fields = {'ndim': op.ndim}
+    elif typ is DesiredMeasurement:
+        fields = {'value': _encode_value(op.value)}
+    elif typ is PureStatePreparation:
+        return {'type': typ.__name__, 'state': _encode_value(op.state)}  # takes no name
+    elif typ is PauliEvolution:
+        fields = {'observable': [[pauli, _encode_value(c)] for pauli, c in op.observable],
+                  'time': _encode_value(op.time)}
+    elif typ is KrausChannel:
+        fields = {'kraus': [_encode_value(k) for k in op.kraus]}
+    elif typ is PauliChannel:
+        fields = {'probabilities': op.probabilities}
+    elif typ is DepolarizingChannel:
+        fields = {'p': op.p, 'n': op.n}
+    elif typ is AmplitudeDampingChannel:
+        fields = {'gamma': op.gamma}
+    elif typ is ReadoutError:
+        fields = {'p01': op.p01, 'p10': op.p10}
+    elif typ is Controlled:
+        fields = {'op': _encode_op(op.op)}
+    elif typ is Remapped:
+        fields = {'op': _encode_op(op.op), 'indices': op.indices}
+    elif typ is Repeat:
+        fields = {'op': _encode_op(op.op), 'n': op.n}
+    else:  # Sequential and Moment
+        fields = {'steps': [_encode_op(step) for step in op]}
+    return {'type': typ.__name__, 'name': op.name, **fields}
+
+
+def _decode_op(data: dict) -> QOperation:
+    typ = _op_types.get(data['type'])
+    if typ is None:
+        raise ValueError(f"Unknown operation type {data['type']!r} in circuit file.")
+    name = data.get('name')
+
+    if typ in _constant_types:
+        return typ(name=name)
+    if typ in _rotation_types:
+        return typ(_decode_value(data['theta']), name=name)
+    if typ in _fourier_types:
+        return typ(data['n'], name=name)
+    if typ in _matrix_types:
+        return typ(_decode_value(data['matrix']), name=name)
+    if typ is AllocateParticle:
+        return typ(data['ndim'], name=name)
+    if typ is DesiredMeasurement:
+        return typ(_decode_value(data['value']), name=name)
+    if typ is PureStatePreparation:
+        return typ(_decode_value(data['state']))
+    if typ is PauliEvolution:
+        observable = [(pauli, _decode_value(c)) for pauli, c in data['observable']]
+        return typ(observable, _decode_value(data['time']), name=name)
+    if typ is KrausChannel:
+        return typ([_decode_value(k) for k in data['kraus']], name=name)
+    if typ is PauliChannel:
+        return typ(data['probabilities'], name=name)
+    if typ is DepolarizingChannel:
+        return typ(data['p'], data['n'], name=name)
+    if typ is AmplitudeDampingChannel:
+        return typ(data['gamma'], name=name)
+    if typ is ReadoutError:
+        return typ(data['p01'], data['p10'], name=name)
+    if typ is Controlled:
+        return typ(_decode_op(data['op']), name=name)
+    if typ is Remapped:
+        return typ(_decode_op(data['op']), *freeze_struct(data['indices']), name=name)
+    if typ is Repeat:
+        return typ(_decode_op(data['op']), data['n'], name=name)
+    return typ([_decode_op(step) for step in data['steps']], name=name)
+
+
+def _encode_value(value: Any) -> Any:
+    # python scalars are kept as they are, so that for example float angles stay float
+    if type(value) in (bool, int, float):
+        return value
+    array = np.asarray(value)
+    if array.dtype == object:
+        raise ValueError(f"Can not save parameter {value!r}.")
+    data = {'dtype': array.dtype.str, 'real': np.real(array).tolist()}
+    if np.iscomplexobj(array):
+        data['imag'] = np.imag(array).tolist()
+    return data
+
+
+def _decode_value(data: Any) -> Any:
+    if not isinstance(data, dict):
+        return data
+    array = np.asarray(data['real'])
+    if 'imag' in data:
+        array = array + 1j * np.asarray(data['imag'])
+    return np.asarray(array, dtype=np.dtype(data['dtype']))[()]
+
+
+# utils
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _header_bound(header: dict, columns: dict[str, np.ndarray]) -> dict:
+    big = 2 ** 63 - 1
+    return {**header, 'ops': [big, big], 'columns': {name: [big, big] for name in columns}}
+
+
+def _write_at(file, offset: int, data: bytes):
+    file.write(b"\0" * (offset - file.tell()))
+    file.write(data)
@@ -0,0 +1,326 @@
+import ast
+import math
+import operator
+import os
+import re
+from contextlib import nullcontext
+from typing import Callable, Iterable, Iterator, TextIO
+
+from braandket_circuit.basics import QOperation
+from braandket_circuit.operations import CX, CY, CZ, CompactCircuit, Controlled, GlobalPhaseGate, H, HadamardGate, \
+    HalfPiPhaseGate, I, Identity, InverseHalfPiPhaseGate, InverseQuarterPiPhaseGate, M, PauliXGate, PauliYGate, \
+    PauliZGate, Phase, ProjectiveMeasurement, QuarterPiPhaseGate, Remapped, RotationXGate, RotationYGate, \
+    RotationZGate, Rx, Ry, Rz, S, Sdg, Sequential, T, Tdg, X, Y, Z
+from braandket_circuit.utils import iter_struct
+
+
+# read
+
+def read_qasm(source: str | os.PathLike | Iterable[str]) -> Iterator[QOperation]:
+    """ Reads an OpenQASM 2 or 3 program statement by statement, yielding the gates as Remapped steps.
+
+    The source is a path or an iterable of lines (like an opened file). Qubits of all the registers are indexed
+    in the order of declaration. Classical registers, barriers and includes are skipped, and measurement results
+    are not assigned anywhere.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as file:
+            yield from read_qasm(file)
+        return
+
+    registers: dict[str, range] = {}
+    for statement in _iter_statements(source):
+        keyword = statement.split(maxsplit=1)[0]
+        if keyword in ("OPENQASM", "include", "creg", "barrier") or keyword.startswith("bit"):
+            continue
+        if keyword == "qreg":
+            name, size = _parse_register(statement[len(keyword):])
+            registers[name] = _allocate(registers, size)
+            continue
+        if keyword.startswith("qubit"):
+            match = re.fullmatch(r"qubit\s*(?:\[\s*(\d+)\s*])?\s*(\w+)", statement)
+            if match is None:
+                raise ValueError(f"Invalid qubit declaration: {statement!r}")
+            size, name = match.groups()
+            registers[name] = _allocate(registers, int(size) if size else 1)
+            continue
+
+        # measurements in the forms "measure q -> c" and "c = measure q"
+        match = re.fullmatch(r"(?:[\w\[\]\s]+=\s*)?measure\s+(.+?)(?:\s*->.*)?", statement)
+        if match is not None:
+            for indices in _broadcast(registers, match.group(1)):
+                yield Remapped(M, *indices)
+            continue
+
+        name, params, args = _parse_gate(statement)
+        factory = _qasm_gates.get(name)
+        if factory is None:
+            raise ValueError(f"Unsupported OpenQASM statement: {statement!r}")
+        for indices in _broadcast(registers, args):
+            yield from factory(params, indices)
+
+
+def _iter_statements(lines: Iterable[str]) -> Iterator[str]:
+    buffer = ""
+    for line in lines:
+        buffer += line.split("//", 1)[0]
+        if "{" in buffer:
+            raise ValueError(f"Gate definitions and blocks are not supported: {buffer.strip()!r}")
+        *statements, buffer = buffer.split(";")
+        for statement in statements:
+            statement = statement.strip()
+            if statement:
+                yield statement
+    if buffer.strip():
+        raise ValueError(f"Unterminated OpenQASM statement: {buffer.strip()!r}")
+
+
+def _parse_register(text: str) -> tuple[str, int]:
+    match = re.fullmatch(r"\s*(\w+)\s*\[\s*(\d+)\s*]\s*", text)
+    if match is None:
+        raise ValueError(f"Invalid register declaration: {text!r}")
+    return match.group(1), int(match.group(2))
+
+
+def _allocate(registers: dict[str, range], size: int) -> range:
+    start = max((register.stop for register in registers.values()), default=0)
+    return range(start, start + size)
+
+
+def _parse_gate(statement: str) -> tuple[str, tuple[float, ...], str]:
+    match = re.match(r"\s*(\w+)\s*", statement)
+    name, rest = match.group(1), statement[match.end():]
+    params = ()
+    if rest.startswith("("):
+        depth = 0
+        for end, char in enumerate(rest):
+            depth += {"(": 1, ")": -1}.get(char, 0)
+            if depth == 0:
+                break
+        else:
+            raise ValueError(f"Unbalanced parentheses: {statement!r}")
+        params = tuple(_evaluate(param) for param in _split_top_level(rest[1:end]))
+        rest = rest[end + 1:]
+    return name, params, rest.strip()
+
+
+def _split_top_level(text: str) -> list[str]:
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if char == "," and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _broadcast(registers: dict[str, range], args: str) -> Iterator[tuple[int, ...]]:
+    # a whole register as argument applies the gate to each of its qubits
+    if not args:
+        yield ()
+        return
+    resolved = []
+    for arg in args.split(","):
+        match = re.fullmatch(r"\s*(\w+)\s*(?:\[\s*(\d+)\s*])?\s*", arg)
+        if match is None or match.group(1) not in registers:
+            raise ValueError(f"Invalid qubit argument: {arg!r}")
+        register = registers[match.group(1)]
+        resolved.append((register[int(match.group(2))],) if match.group(2) is not None else tuple(register))
+
+    size = max(len(qubits) for qubits in resolved)
+    if any(len(qubits) not in (1, size) for qubits in resolved):
+        raise ValueError(f"Registers of different sizes: {args!r}")
+    for i in range(size):
+        yield tuple(qubits[i] if len(qubits) > 1 else qubits[0] for qubits in resolved)
+
+
+_operators = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.Pow: operator.pow, ast.USub: operator.neg, ast.UAdd: operator.pos,
+}
+_constants = {'pi': math.pi, 'π': math.pi, 'tau': math.tau, 'τ': math.tau, 'euler': math.e}
+_functions = {'sin': math.sin, 'cos': math.cos, 'tan': math.tan, 'exp': math.exp, 'ln': math.log, 'sqrt': math.sqrt}
+
+
+def _evaluate(expression: str) -> float:
+    def evaluate(node: ast.AST) -> float:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.Name) and node.id in _constants:
+            return _constants[node.id]
+        if isinstance(node, ast.BinOp) and type(node.op) in _operators:
+            return _operators[type(node.op)](evaluate(node.left), evaluate(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _operators:
+            return _operators[type(node.op)](evaluate(node.operand))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _functions:
+            return _functions[node.func.id](*map(evaluate, node.args))
+        raise ValueError(f"Unsupported parameter expression: {expression!r}")
+
+    return float(evaluate(ast.parse(expression.strip(), mode='eval').body))
+
+
+GateFactory = Callable[[tuple[float, ...], tuple[int, ...]], Iterable[QOperation]]
+
+
+def _gate(op: QOperation) -> GateFactory:
+    return lambda params, indices: (Remapped(op, *_nest_controls(indices)),)
+
+
+def _rotation_gate(op_type: type) -> GateFactory:
+    return lambda params, indices: (Remapped(op_type(*params), *_nest_controls(indices)),)
+
+
+def _controlled_rotation_gate(op_type: type) -> GateFactory:
+    return lambda params, indices: (Remapped(Controlled(op_type(*params)), *indices),)
+
+
+def _phase_gate(params: tuple[float, ...], indices: tuple[int, ...]) -> Iterable[QOperation]:
+    # diag(1, e^{i theta}) = Rz(theta) with a global phase of theta/2
+    theta, = params
+    return Remapped(Rz(theta), *indices), Remapped(Phase(theta / 2), *indices)
+
+
+def _controlled_phase_gate(params: tuple[float, ...], indices: tuple[int, ...]) -> Iterable[QOperation]:
+    theta, = params
+    return Remapped(Controlled(Rz(theta)), *indices), Remapped(Controlled(Phase(theta / 2)), *indices)
+
+
+def _u_gate(params: tuple[float, ...], indices: tuple[int, ...]) -> Iterable[QOperation]:
+    # U(theta, phi, lambda) = e^{i (phi + lambda) / 2} Rz(phi) Ry(theta) Rz(lambda)
+    theta, phi, lam = params
+    return tuple(Remapped(op, *indices) for op in (Rz(lam), Ry(theta), Rz(phi), Phase((phi + lam) / 2)))
+
+
+def _swap_gate(_: tuple[float, ...], indices: tuple[int, ...]) -> Iterable[QOperation]:
+    i, j = indices
+    return Remapped(CX, i, j), Remapped(CX, j, i), Remapped(CX, i, j)
+
+
+def _gphase_gate(params: tuple[float, ...], indices: tuple[int, ...]) -> Iterable[QOperation]:
+    theta, = params
+    return Remapped(Phase(theta), *(indices or (0,))),
+
+
+def _nest_controls(indices: tuple[int, ...]):
+    # Controlled(op) takes (control, target), so ccx on (a, b, c) is C(CX) on (a, (b, c))
+    if len(indices) <= 2:
+        return indices
+    return indices[0], _nest_controls(indices[1:])
+
+
+_qasm_gates: dict[str, GateFactory] = {
+    'id': _gate(I), 'x': _gate(X), 'y': _gate(Y), 'z': _gate(Z), 'h': _gate(H), 's': _gate(S), 't': _gate(T),
+    'sdg': _gate(Sdg), 'tdg': _gate(Tdg),
+    'rx': _rotation_gate(Rx), 'ry': _rotation_gate(Ry), 'rz': _rotation_gate(Rz),
+    'p': _phase_gate, 'u1': _phase_gate, 'phase': _phase_gate,
+    'U': _u_gate, 'u': _u_gate, 'u3': _u_gate,
+    'CX': _gate(CX), 'cx': _gate(CX), 'cnot': _gate(CX), 'cy': _gate(CY), 'cz': _gate(CZ), 'ch': _gate(Controlled(H)),
+    'ccx': _gate(Controlled(CX)),
+    'crx': _controlled_rotation_gate(Rx), 'cry': _controlled_rotation_gate(Ry), 'crz': _controlled_rotation_gate(Rz),
+    'cp': _controlled_phase_gate, 'cu1': _controlled_phase_gate, 'cphase': _controlled_phase_gate,
+    'swap': _swap_gate,
+    'gphase': _gphase_gate,
+}
+
+
+# write
+
+def write_qasm(
+    circuit: QOperation | Iterable[QOperation],
+    file: str | os.PathLike | TextIO, *,
+    n: int | None = None,
+    version: int = 2,
+):
+    """ Writes the circuit as an OpenQASM 2 or 3 program with a register q of n qubits, one statement per line.
+
+    The circuit is flattened first. It can also be given as an iterable of flattened steps (like from read_qasm()),
+    which is consumed lazily when n is given. Global phases that are not controlled are dropped in OpenQASM 2.
+    """
+    if version not in (2, 3):
+        raise ValueError(f"Unsupported OpenQASM version {version}.")
+
+    if isinstance(circuit, QOperation):
+        if not isinstance(circuit, CompactCircuit):
+            from braandket_circuit.traits_impls import FlattenPass
+            from braandket_circuit.traits import compile
+            circuit = compile(FlattenPass(), circuit)
+            circuit = circuit if isinstance(circuit, Sequential) else (circuit,)
+    if n is None:
+        circuit = tuple(circuit)
+        n = max((i + 1 for step in circuit for i in _step_indices(step)), default=0)
+
+    with (open(file, 'w') if isinstance(file, (str, os.PathLike)) else nullcontext(file)) as file:
+        if version == 2:
+            file.write(f"OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[{n}];\ncreg c[{n}];\n")
+        else:
+            file.write(f"OPENQASM 3.0;\ninclude \"stdgates.inc\";\nqubit[{n}] q;\nbit[{n}] c;\n")
+        for step in circuit:
+            file.write(_format_step(step, version))
+
+
+def _step_indices(step: QOperation) -> tuple[int, ...]:
+    if isinstance(step, Remapped):
+        return tuple(iter_struct(step.indices, atom_typ=int))
+    return tuple(range(_arity(step)))
+
+
+def _arity(op: QOperation) -> int:
+    if isinstance(op, Controlled):
+        return 1 + _arity(op.op)
+    if isinstance(op, (*_qasm_names, GlobalPhaseGate, ProjectiveMeasurement, Identity)):
+        return 1
+    raise ValueError(f"Operation {op} can not be written as OpenQASM, try flattening it.")
+
+
+_qasm_names: dict[type, str] = {
+    PauliXGate: "x", PauliYGate: "y", PauliZGate: "z", HadamardGate: "h",
+    HalfPiPhaseGate: "s", QuarterPiPhaseGate: "t", InverseHalfPiPhaseGate: "sdg", InverseQuarterPiPhaseGate: "tdg",
+    RotationXGate: "rx", RotationYGate: "ry", RotationZGate: "rz",
+}
+
+
+def _format_step(step: QOperation, version: int) -> str:
+    op = step.op if isinstance(step, Remapped) else step
+    qubits = [f"q[{i}]" for i in _step_indices(step)]
+
+    if isinstance(op, ProjectiveMeasurement):
+        return "".join(f"measure {qubit} -> c{qubit[1:]};\n" for qubit in qubits)
+    if isinstance(op, Identity):
+        return "".join(f"id {qubit};\n" for qubit in qubits)
+
+    controlled = False
+    while isinstance(op, Controlled):
+        controlled, op = True, op.op
+    # the controls (possibly structs of several qubits) all come before the single target qubit
+    controls = len(qubits) - 1
+    if controls > 0 and not controlled:
+        raise ValueError(f"Operation {step} can not be written as OpenQASM.")
+
+    if isinstance(op, GlobalPhaseGate):
+        if controls == 0:
+            if version == 2:
+                return ""  # unobservable, and OpenQASM 2 has no statement for it
+            return f"gphase({_format_param(op.theta)});\n"
+        # a controlled global phase is a phase gate on the controls
+        name = "u1" if version == 2 else "p"
+        controls, qubits = controls - 1, qubits[:-1]
+        if controls > 1:
+            raise ValueError(f"Operation {step} can not be written as OpenQASM.")
+        return _format_gate("c" * controls + name, (op.theta,), qubits)
+
+    name = _qasm_names.get(type(op))
+    max_controls = 0 if name in ("s", "t", "sdg", "tdg") else 2 if name == "x" else 1
+    if name is None or controls > max_controls:
+        raise ValueError(f"Operation {step} can not be written as OpenQASM.")
+    params = (op.theta,) if isinstance(op, (RotationXGate, RotationYGate, RotationZGate)) else ()
+    return _format_gate("c" * controls + name, params, qubits)
+
+
+def _format_gate(name: str, params: tuple, qubits: list[str]) -> str:
+    params_str = f"({', '.join(map(_format_param, params))})" if params else ""
+    return f"{name}{params_str} {', '.join(qubits)};\n"
+
+
+def _format_param(param) -> str:
+    return repr(float(param))
@@ -1,12 +1,21 @@
-from .alias import C, CNOT, CX, CY, CZ, DM, DesiredMeasure, H, HGate, I, M, Measure, NOT, NOTGate, Phase, Rx, Ry, Rz, S, \
-    SGate, T, TGate, X, XGate, Y, YGate, Z, ZGate
+from .alias import C, CNOT, CX, CY, CZ, DM, DesiredMeasure, H, HGate, I, InverseQFT, M, Measure, NOT, NOTGate, Phase, \
+    QFT, Rx, Ry, Rz, S, SGate, Sdg, SdgGate, T, TGate, Tdg, TdgGate, X, XGate, Y, YGate, Z, ZGate
 from .allocate import AllocateParticle, allocate_particle, allocate_qubit, allocate_qubits
+from .checkpoint import Checkpoint
+from .compact import CompactCircuit
 from .controlled import Controlled
-from .gates import GlobalPhaseGate, HadamardGate, HalfPiPhaseGate, PauliXGate, PauliYGate, PauliZGate, \
-    QuarterPiPhaseGate, RotationXGate, RotationYGate, RotationZGate
+from .evolution import PauliEvolution
+from .fourier import InverseQuantumFourierTransform, QuantumFourierTransform
+from .gates import GlobalPhaseGate, HadamardGate, HalfPiPhaseGate, InverseHalfPiPhaseGate, InverseQuarterPiPhaseGate, \
+    PauliXGate, PauliYGate, PauliZGate, QuarterPiPhaseGate, RotationXGate, RotationYGate, RotationZGate
 from .identity import Identity
+from .layout import Layout
 from .matrix import MatrixOperation, QubitsMatrixOperation
+from .moment import Moment
 from .measurement import DesiredMeasurement, MeasurementResult, ProjectiveMeasurement
+from .noise import AmplitudeDampingChannel, DepolarizingChannel, KrausChannel, PauliChannel, ReadoutError
 from .remapped import Remapped
+from .repeat import Repeat
 from .sequential import Sequential
 from .state import PureStatePreparation
+from .streaming import StreamingSequential
@@ -1,6 +1,7 @@
 from .controlled import Controlled
-from .gates import GlobalPhaseGate, HadamardGate, HalfPiPhaseGate, PauliXGate, PauliYGate, PauliZGate, \
-    QuarterPiPhaseGate, RotationXGate, RotationYGate, RotationZGate
+from .fourier import InverseQuantumFourierTransform, QuantumFourierTransform
+from .gates import GlobalPhaseGate, HadamardGate, HalfPiPhaseGate, InverseHalfPiPhaseGate, InverseQuarterPiPhaseGate, \
+    PauliXGate, PauliYGate, PauliZGate, QuarterPiPhaseGate, RotationXGate, RotationYGate, RotationZGate
 from .identity import Identity
 from .measurement import DesiredMeasurement, ProjectiveMeasurement
 
@@ -13,6 +14,8 @@ YGate = PauliYGate
 ZGate = PauliZGate
 SGate = HalfPiPhaseGate
 TGate = QuarterPiPhaseGate
+SdgGate = InverseHalfPiPhaseGate
+TdgGate = InverseQuarterPiPhaseGate
 HGate = HadamardGate
 NOTGate = PauliXGate
 
@@ -21,6 +24,8 @@ Y = PauliYGate()
 Z = PauliZGate()
 S = HalfPiPhaseGate()
 T = QuarterPiPhaseGate()
+Sdg = InverseHalfPiPhaseGate()
+Tdg = InverseQuarterPiPhaseGate()
 H = HadamardGate()
 NOT = X
 
@@ -39,6 +44,11 @@ CY = C(Y)
 CZ = C(Z)
 CNOT = CX
 
+# fourier transforms
+
+QFT = QuantumFourierTransform
+InverseQFT = InverseQuantumFourierTransform
+
 # measurements
 
 Measure = ProjectiveMeasurement
@@ -0,0 +1,12 @@
+from braandket_circuit.basics import QOperation, QSystemStruct
+
+
+class Checkpoint(QOperation[None]):
+    """ Operation that does nothing, marking a point in a Sequential where runtimes may cache the state. """
+
+    def __call__(self, *args: QSystemStruct):
+        pass  # do nothing
+
+    def __repr__(self):
+        name_str = f"name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({name_str})"
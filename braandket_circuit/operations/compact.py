@@ -0,0 +1,142 @@
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from braandket_circuit.basics import QOperation, QSystemStruct
+from .gates import GlobalPhaseGate, RotationXGate, RotationYGate, RotationZGate
+from .remapped import Remapped
+from .sequential import Sequential
+
+_parametric_types = (RotationXGate, RotationYGate, RotationZGate, GlobalPhaseGate)
+
+
+class CompactCircuit(QOperation[tuple]):
+    """ Columnar form of the steps of a (flattened) Sequential.
+
+    Step i applies ops[opcodes[i]] on the args indexed by indices[offsets[i]:offsets[i+1]] if remapped[i] is set,
+    or on all the args otherwise. For rotation gates with a float angle, ops holds one gate per type and name,
+    with the angles of the steps in params.
+    """
+
+    def __init__(self,
+        ops: Sequence[QOperation],
+        parametric: Sequence[bool] | np.ndarray,
+        opcodes: Sequence[int] | np.ndarray,
+        params: Sequence[float] | np.ndarray,
+        remapped: Sequence[bool] | np.ndarray,
+        offsets: Sequence[int] | np.ndarray,
+        indices: Sequence[int] | np.ndarray,
+        *, name: Optional[str] = None,
+    ):
+        super().__init__(name=name)
+        self._ops = tuple(ops)
+        self._parametric = np.asarray(parametric, dtype=bool)
+        self._opcodes = np.asarray(opcodes, dtype=np.int32)
+        self._params = np.asarray(params, dtype=np.float64)
+        self._remapped = np.asarray(remapped, dtype=bool)
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._indices = np.asarray(indices, dtype=np.int32)
+
+        n = len(self._opcodes)
+        if len(self._parametric) != len(self._ops):
+            raise ValueError(f"expected {len(self._ops)} parametric flags, got {len(self._parametric)}")
+        if len(self._params) != n or len(self._remapped) != n or len(self._offsets) != n + 1:
+            raise ValueError("expected params and remapped of the length of opcodes, and offsets of one more")
+
+    @classmethod
+    def from_sequential(cls, circuit: Sequential) -> 'CompactCircuit':
+        ops, parametric, codes = [], [], {}
+        opcodes, params, remapped, offsets, indices = [], [], [], [0], []
+        for step in circuit:
+            step_remapped = isinstance(step, Remapped) and all(isinstance(i, int) for i in step.indices)
+            op = step.op if step_remapped else step
+            if isinstance(op, _parametric_types) and type(op.theta) is float:
+                key, param = (type(op), op.name), op.theta
+            else:
+                key, param = op, np.nan
+
+            code = codes.get(key)
+            if code is None:
+                code = codes[key] = len(ops)
+                ops.append(op)
+                parametric.append(not isinstance(key, QOperation))
+
+            opcodes.append(code)
+            params.append(param)
+            remapped.append(step_remapped)
+            if step_remapped:
+                indices.extend(step.indices)
+            offsets.append(len(indices))
+        return cls(ops, parametric, opcodes, params, remapped, offsets, indices, name=circuit.name)
+
+    def to_sequential(self) -> Sequential:
+        return Sequential(list(self), name=self.name)
+
+    @property
+    def ops(self) -> tuple[QOperation, ...]:
+        return self._ops
+
+    @property
+    def parametric(self) -> np.ndarray:
+        return self._parametric
+
+    @property
+    def opcodes(self) -> np.ndarray:
+        return self._opcodes
+
+    @property
+    def params(self) -> np.ndarray:
+        return self._params
+
+    @property
+    def remapped(self) -> np.ndarray:
+        return self._remapped
+
+    @property
+    def offsets(self) -> np.ndarray:
+        return self._offsets
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self._indices
+
+    def __len__(self):
+        return len(self._opcodes)
+
+    def __iter__(self) -> Iterator[QOperation]:
+        for op, indices in self._iter_ops():
+            yield op if indices is None else Remapped(op, *indices)
+
+    def __getitem__(self, item: int) -> QOperation:
+        return self.to_sequential()[item] if isinstance(item, slice) else self._step(item)
+
+    def __call__(self, *args: QSystemStruct) -> tuple:
+        results = []
+        for op, indices in self._iter_ops():
+            results.append(op(*args) if indices is None else op(*(args[i] for i in indices)))
+        return tuple(results)
+
+    def _iter_ops(self) -> Iterator[tuple[QOperation, list[int] | None]]:
+        # converting the columns to lists at once is much faster than indexing the arrays element by element
+        opcodes, params, remapped = self._opcodes.tolist(), self._params.tolist(), self._remapped.tolist()
+        offsets, indices = self._offsets.tolist(), self._indices.tolist()
+        parametric = self._parametric.tolist()
+        for i, code in enumerate(opcodes):
+            op = self._ops[code]
+            if parametric[code]:
+                op = type(op)(params[i], name=op.name)
+            yield op, (indices[offsets[i]:offsets[i + 1]] if remapped[i] else None)
+
+    def _step(self, i: int) -> QOperation:
+        i = range(len(self))[i]
+        code = int(self._opcodes[i])
+        op = self._ops[code]
+        if self._parametric[code]:
+            op = type(op)(float(self._params[i]), name=op.name)
+        if self._remapped[i]:
+            op = Remapped(op, *self._indices[self._offsets[i]:self._offsets[i + 1]].tolist())
+        return op
+
+    def __repr__(self) -> str:
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}(<{len(self)} steps, {len(self.ops)} ops>{name_str})"
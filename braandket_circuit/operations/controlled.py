@@ -6,6 +6,8 @@ Op = TypeVar("Op", bound=QOperation)
 
 
 class Controlled(Generic[Op], QOperation[None]):
+    __slots__ = ('_op',)
+
     def __init__(self, op: Op, *, name: Optional[str] = None):
         super().__init__(name=name)
         self._op = op
@@ -14,6 +16,9 @@ class Controlled(Generic[Op], QOperation[None]):
     def op(self) -> Op:
         return self._op
 
+    def _intern_key(self):
+        return self.name, self.op
+
     def __repr__(self):
         name_str = f", name={self.name!r}" if self.name else ""
         return f"{type(self).__name__}({self._op!r}{name_str})"
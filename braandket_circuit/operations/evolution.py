@@ -0,0 +1,78 @@
+import math
+from typing import Iterable, Mapping, Optional
+
+from braandket import ArrayLike
+from braandket_circuit.basics import QOperation, QParticle
+
+PauliTerm = tuple[str, ArrayLike]
+PauliObservable = Mapping[str, ArrayLike] | Iterable[PauliTerm]
+
+
+class PauliEvolution(QOperation[None]):
+    """ Evolution exp(-i t H) under H = sum of c * P, with Pauli strings P (like "XZI") acting on the qubits in order.
+
+    The terms are applied one after another as exp(-i t c P),
+    which is exact for commuting terms and a first-order Trotter step otherwise.
+    """
+
+    def __init__(self, observable: PauliObservable, time: ArrayLike, *, name: Optional[str] = None):
+        super().__init__(name=name)
+        observable = observable.items() if isinstance(observable, Mapping) else observable
+        observable = tuple((str(pauli), coefficient) for pauli, coefficient in observable)
+        if len(observable) == 0:
+            raise ValueError("expected at least one Pauli term")
+
+        n = len(observable[0][0])
+        for pauli, _ in observable:
+            if len(pauli) != n:
+                raise ValueError(f"expected Pauli strings of length {n}, got {pauli!r}")
+            if any(p not in "IXYZ" for p in pauli):
+                raise ValueError(f"expected Pauli strings consisting of 'I', 'X', 'Y' and 'Z', got {pauli!r}")
+
+        self._observable = observable
+        self._time = time
+        self._n = n
+
+    @property
+    def observable(self) -> tuple[PauliTerm, ...]:
+        return self._observable
+
+    @property
+    def time(self) -> ArrayLike:
+        return self._time
+
+    @property
+    def n(self) -> int:
+        return self._n
+
+    def __call__(self, *qubits: QParticle):
+        if len(qubits) != self.n:
+            raise TypeError(f"{self} expected {self.n} qubits, got {len(qubits)}")
+        from .alias import CX, H, Phase, Rx, Rz
+        for pauli, coefficient in self.observable:
+            theta = coefficient * self.time
+            support = tuple(i for i, p in enumerate(pauli) if p != "I")
+            if not support:
+                Phase(-theta)(qubits[0])
+                continue
+
+            # rotate into the Z basis, where exp(-i theta Z...Z) is an Rz on the parity
+            for i in support:
+                if pauli[i] == "X":
+                    H(qubits[i])
+                elif pauli[i] == "Y":
+                    Rx(math.pi / 2)(qubits[i])
+            for i, j in zip(support[:-1], support[1:]):
+                CX(qubits[i], qubits[j])
+            Rz(2 * theta)(qubits[support[-1]])
+            for i, j in reversed(tuple(zip(support[:-1], support[1:]))):
+                CX(qubits[i], qubits[j])
+            for i in support:
+                if pauli[i] == "X":
+                    H(qubits[i])
+                elif pauli[i] == "Y":
+                    Rx(-math.pi / 2)(qubits[i])
+
+    def __repr__(self):
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({list(self.observable)!r}, {self.time!r}{name_str})"
@@ -0,0 +1,78 @@
+import math
+from typing import Optional
+
+from braandket_circuit.basics import QOperation, QParticle
+
+
+class _FourierTransform(QOperation[None]):
+    __slots__ = ('_n',)
+
+    def __init__(self, n: int, *, name: Optional[str] = None):
+        super().__init__(name=name)
+        if n < 1:
+            raise ValueError(f"expected n >= 1, got {n}")
+        self._n = n
+
+    @property
+    def n(self) -> int:
+        return self._n
+
+    def _intern_key(self):
+        return self.name, self.n
+
+    def __repr__(self):
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({self.n!r}{name_str})"
+
+
+class QuantumFourierTransform(_FourierTransform):
+    """ Quantum Fourier transform on n qubits, with the first qubit as the most significant one. """
+    __slots__ = ()
+
+    def __call__(self, *qubits: QParticle):
+        _check_qubits_n(self, qubits)
+        from .alias import H
+        n = len(qubits)
+        for i in range(n):
+            H(qubits[i])
+            for j in range(i + 1, n):
+                _controlled_phase(math.pi / 2 ** (j - i), qubits[j], qubits[i])
+        for i in range(n // 2):
+            _swap(qubits[i], qubits[n - 1 - i])
+
+
+class InverseQuantumFourierTransform(_FourierTransform):
+    """ Inverse quantum Fourier transform on n qubits, with the first qubit as the most significant one. """
+    __slots__ = ()
+
+    def __call__(self, *qubits: QParticle):
+        _check_qubits_n(self, qubits)
+        from .alias import H
+        n = len(qubits)
+        for i in reversed(range(n // 2)):
+            _swap(qubits[i], qubits[n - 1 - i])
+        for i in reversed(range(n)):
+            for j in reversed(range(i + 1, n)):
+                _controlled_phase(-math.pi / 2 ** (j - i), qubits[j], qubits[i])
+            H(qubits[i])
+
+
+# utils
+
+def _check_qubits_n(op: _FourierTransform, qubits: tuple[QParticle, ...]):
+    if len(qubits) != op.n:
+        raise TypeError(f"{op} expected {op.n} qubits, got {len(qubits)}")
+
+
+def _controlled_phase(theta: float, control: QParticle, target: QParticle):
+    # diag(1, 1, 1, e^{i theta}) = C(Rz(theta)) followed by a phase of theta/2 on the control
+    from .alias import C, Phase, Rz
+    C(Rz(theta))(control, target)
+    C(Phase(theta / 2))(control, target)
+
+
+def _swap(qubit0: QParticle, qubit1: QParticle):
+    from .alias import CX
+    CX(qubit0, qubit1)
+    CX(qubit1, qubit0)
+    CX(qubit0, qubit1)
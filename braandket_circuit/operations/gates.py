@@ -3,9 +3,12 @@ from typing import Optional
 
 from braandket import ArrayLike
 from braandket_circuit.basics import QOperation, QParticle
+from braandket_circuit.utils import value_key
 
 
 class _SingleQubitGate(QOperation[None], abc.ABC):
+    __slots__ = ()
+
     def __call__(self, qubit: QParticle):
         return super().__call__(qubit)
 
@@ -13,38 +16,53 @@ class _SingleQubitGate(QOperation[None], abc.ABC):
 # constant gates
 
 class _SingleQubitConstantGate(_SingleQubitGate, abc.ABC):
+    __slots__ = ()
+
+    def _intern_key(self):
+        return self.name,
+
     def __repr__(self):
         name_str = f"name={self.name!r}" if self.name else ""
         return f"{type(self).__name__}({name_str})"
 
 
 class PauliXGate(_SingleQubitConstantGate):
-    pass
+    __slots__ = ()
 
 
 class PauliYGate(_SingleQubitConstantGate):
-    pass
+    __slots__ = ()
 
 
 class PauliZGate(_SingleQubitConstantGate):
-    pass
+    __slots__ = ()
 
 
 class HalfPiPhaseGate(_SingleQubitConstantGate):
-    pass
+    __slots__ = ()
 
 
 class QuarterPiPhaseGate(_SingleQubitConstantGate):
-    pass
+    __slots__ = ()
+
+
+class InverseHalfPiPhaseGate(_SingleQubitConstantGate):
+    __slots__ = ()
+
+
+class InverseQuarterPiPhaseGate(_SingleQubitConstantGate):
+    __slots__ = ()
 
 
 class HadamardGate(_SingleQubitConstantGate):
-    pass
+    __slots__ = ()
 
 
 # rotation gates
 
 class _SingleQubitRotationGate(_SingleQubitGate, abc.ABC):
+    __slots__ = ('_theta',)
+
     def __init__(self, theta: ArrayLike, *, name: Optional[str] = None):
         super().__init__(name=name)
         self._theta = theta
@@ -53,22 +71,25 @@ class _SingleQubitRotationGate(_SingleQubitGate, abc.ABC):
     def theta(self) -> ArrayLike:
         return self._theta
 
+    def _intern_key(self):
+        return self.name, value_key(self.theta)
+
     def __repr__(self):
         name_str = f", name={self.name!r}" if self.name else ""
         return f"{type(self).__name__}({self.theta!r}{name_str})"
 
 
 class RotationXGate(_SingleQubitRotationGate):
-    pass
+    __slots__ = ()
 
 
 class RotationYGate(_SingleQubitRotationGate):
-    pass
+    __slots__ = ()
 
 
 class RotationZGate(_SingleQubitRotationGate):
-    pass
+    __slots__ = ()
 
 
 class GlobalPhaseGate(_SingleQubitRotationGate):
-    pass
+    __slots__ = ()
@@ -3,10 +3,14 @@ from braandket_circuit.basics import QOperation, QSystemStruct
 
 class Identity(QOperation[None]):
     """ Operation that does nothing """
+    __slots__ = ()
 
     def __call__(self, *args: QSystemStruct):
         pass  # do nothing
 
+    def _intern_key(self):
+        return self.name,
+
     def __repr__(self):
         name_str = f"name={self.name!r}" if self.name else ""
         return f"{type(self).__name__}({name_str})"
@@ -0,0 +1,20 @@
+from braandket_circuit.basics import QOperation, QSystemStruct
+
+
+class Layout(QOperation[None]):
+    """ Operation that does nothing, hinting runtimes to lay out the particles in the order of the args.
+
+    Runtimes keeping a stable layout (like BnkRuntime with stable_layout) then lay out the axes of these particles
+    in the state tensors in this order, and in the merges of their states after.
+    """
+    __slots__ = ()
+
+    def __call__(self, *args: QSystemStruct):
+        pass  # do nothing
+
+    def _intern_key(self):
+        return self.name,
+
+    def __repr__(self):
+        name_str = f"name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({name_str})"
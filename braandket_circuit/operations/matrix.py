@@ -1,3 +1,4 @@
+import copy
 from typing import Optional
 
 import numpy as np
@@ -17,6 +18,7 @@ class MatrixOperation(QOperation[None]):
         if len(shape) != 2 or shape[0] != shape[1]:
             raise ValueError(f"expected matrix shape (N, N), got {shape}")
         self._N = shape[0]
+        self._ct = None
 
     @property
     def N(self) -> int:
@@ -24,8 +26,20 @@ class MatrixOperation(QOperation[None]):
 
     @property
     def matrix(self) -> ArrayLike:
+        if self._matrix is None:
+            self._matrix = np.conj(np.transpose(self._ct.matrix))
         return self._matrix
 
+    @property
+    def ct(self) -> 'MatrixOperation':
+        """ The conjugate transpose, whose matrix is computed only when accessed, and whose ct is self. """
+        if self._ct is None:
+            ct = copy.copy(self)
+            ct._matrix = None
+            ct._ct = self
+            self._ct = ct
+        return self._ct
+
 
 class QubitsMatrixOperation(MatrixOperation):
     """ MatrixOperation that acts on qubit systems. """
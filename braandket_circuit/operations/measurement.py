@@ -16,6 +16,11 @@ class MeasurementResult:
 
 
 class ProjectiveMeasurement(QOperation[MeasurementResult]):
+    __slots__ = ()
+
+    def _intern_key(self):
+        return self.name,
+
     def __repr__(self):
         name_str = f"name={self.name!r}" if self.name else ""
         return f"{type(self).__name__}({name_str})"
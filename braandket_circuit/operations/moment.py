@@ -0,0 +1,10 @@
+from typing import TypeVar
+
+from braandket_circuit.basics import QOperation
+from .sequential import Sequential
+
+Op = TypeVar('Op', bound=QOperation)
+
+
+class Moment(Sequential[Op]):
+    """ Sequential whose steps act on disjoint qubits, so that they can be applied in any order or all at once. """
@@ -0,0 +1,161 @@
+import itertools
+import math
+from typing import Iterable, Mapping, Optional
+
+import numpy as np
+
+from braandket import ArrayLike
+from braandket_circuit.basics import QOperation
+from .measurement import MeasurementResult
+from .matrix import _get_shape, _log2int
+
+_pauli_matrices = {
+    "I": np.asarray([[1, 0], [0, 1]], dtype=complex),
+    "X": np.asarray([[0, 1], [1, 0]], dtype=complex),
+    "Y": np.asarray([[0, -1j], [1j, 0]], dtype=complex),
+    "Z": np.asarray([[1, 0], [0, -1]], dtype=complex),
+}
+
+
+class KrausChannel(QOperation[None]):
+    """ Quantum channel rho -> sum of K rho K^dagger on n qubits, given by its Kraus operators K. """
+
+    def __init__(self, kraus: Iterable[ArrayLike], *, name: Optional[str] = None):
+        super().__init__(name=name)
+        kraus = tuple(kraus)
+        if len(kraus) == 0:
+            raise ValueError("expected at least one Kraus operator")
+
+        shape = _get_shape(kraus[0])
+        n = _log2int(shape[0], strict=True) if len(shape) == 2 and shape[0] == shape[1] else None
+        if n is None:
+            raise ValueError(f"expected Kraus operators of shape (2**n, 2**n), got {shape}")
+        for k in kraus:
+            if _get_shape(k) != shape:
+                raise ValueError(f"expected Kraus operators of shape {shape}, got {_get_shape(k)}")
+
+        self._kraus = kraus
+        self._n = n
+
+    @property
+    def kraus(self) -> tuple[ArrayLike, ...]:
+        return self._kraus
+
+    @property
+    def n(self) -> int:
+        return self._n
+
+    @property
+    def is_diagonal(self) -> bool:
+        """ Whether all the Kraus operators are diagonal, so that the channel only scales the elements of rho. """
+        return all(np.count_nonzero(k - np.diag(np.diagonal(k))) == 0 for k in map(np.asarray, self.kraus))
+
+    def __repr__(self):
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}(<{len(self.kraus)} Kraus operators on {self.n} qubits>{name_str})"
+
+
+class PauliChannel(KrausChannel):
+    """ Channel applying each Pauli string P (like "XZ") with its probability, as rho -> sum of p P rho P.
+
+    The identity takes the remaining probability.
+    """
+
+    def __init__(self, probabilities: Mapping[str, float], *, name: Optional[str] = None):
+        probabilities = {str(pauli): float(p) for pauli, p in probabilities.items()}
+        if len(probabilities) == 0:
+            raise ValueError("expected at least one Pauli string")
+        n = len(next(iter(probabilities)))
+        for pauli in probabilities:
+            if len(pauli) != n or any(p not in "IXYZ" for p in pauli):
+                raise ValueError(f"expected Pauli strings of length {n} of 'I', 'X', 'Y' and 'Z', got {pauli!r}")
+
+        identity = "I" * n
+        probabilities[identity] = 1.0 - sum(p for pauli, p in probabilities.items() if pauli != identity)
+        if any(p < 0 for p in probabilities.values()):
+            raise ValueError(f"expected probabilities summing up to at most 1, got {probabilities}")
+        probabilities = {pauli: p for pauli, p in probabilities.items() if p > 0}
+
+        super().__init__((
+            math.sqrt(p) * _pauli_string_matrix(pauli)
+            for pauli, p in probabilities.items()), name=name)
+        self._probabilities = probabilities
+
+    @property
+    def probabilities(self) -> dict[str, float]:
+        return dict(self._probabilities)
+
+    def __repr__(self):
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({self._probabilities!r}{name_str})"
+
+
+class DepolarizingChannel(PauliChannel):
+    """ Channel applying a uniformly random non-identity Pauli string on n qubits with probability p. """
+
+    def __init__(self, p: float, n: int = 1, *, name: Optional[str] = None):
+        paulis = ["".join(pauli) for pauli in itertools.product("IXYZ", repeat=n)][1:]
+        super().__init__({pauli: p / len(paulis) for pauli in paulis}, name=name)
+        self._p = p
+
+    @property
+    def p(self) -> float:
+        return self._p
+
+    def __repr__(self):
+        n_str = f", {self.n!r}" if self.n != 1 else ""
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({self.p!r}{n_str}{name_str})"
+
+
+class AmplitudeDampingChannel(KrausChannel):
+    """ Channel decaying |1> to |0> of a qubit with probability gamma. """
+
+    def __init__(self, gamma: float, *, name: Optional[str] = None):
+        super().__init__((
+            np.asarray([[1, 0], [0, math.sqrt(1 - gamma)]], dtype=complex),
+            np.asarray([[0, math.sqrt(gamma)], [0, 0]], dtype=complex),
+        ), name=name)
+        self._gamma = gamma
+
+    @property
+    def gamma(self) -> float:
+        return self._gamma
+
+    def __repr__(self):
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({self.gamma!r}{name_str})"
+
+
+class ReadoutError(QOperation[MeasurementResult]):
+    """ Projective measurement whose reported values are flipped from 0 to 1 with probability p01,
+    and from 1 to 0 with probability p10, independently for each qubit.
+
+    The state collapses by the true values, and the prob of the result is the probability of the true values.
+    """
+
+    def __init__(self, p01: float, p10: Optional[float] = None, *, name: Optional[str] = None):
+        super().__init__(name=name)
+        self._p01 = p01
+        self._p10 = p01 if p10 is None else p10
+
+    @property
+    def p01(self) -> float:
+        return self._p01
+
+    @property
+    def p10(self) -> float:
+        return self._p10
+
+    def __repr__(self):
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({self.p01!r}, {self.p10!r}{name_str})"
+
+
+# utils
+
+def _pauli_string_matrix(pauli: str) -> np.ndarray:
+    matrix = np.ones((1, 1), dtype=complex)
+    for p in pauli:
+        matrix = np.kron(matrix, _pauli_matrices[p])
+    return matrix
@@ -9,6 +9,8 @@ IndexStruct = Union[int, Iterable['IndexStruct']]
 
 
 class Remapped(QOperation, Generic[Op]):
+    __slots__ = ('_op', '_indices')
+
     def __init__(self, op: Op, *indices: IndexStruct, name: Optional[str] = None):
         super().__init__(name=name)
         self._op = op
@@ -28,5 +30,8 @@ class Remapped(QOperation, Generic[Op]):
     def __call__(self, *args: QSystemStruct) -> R:
         return self.op(*self.remap(*args))
 
+    def _intern_key(self):
+        return self.name, self.op, self.indices
+
     def __repr__(self) -> str:
         return f"Remapped({self.op!r}, {', '.join(map(repr, self._indices))})"
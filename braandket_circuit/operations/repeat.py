@@ -0,0 +1,35 @@
+from typing import Generic, Optional, TypeVar
+
+from braandket_circuit.basics import QOperation, QSystemStruct
+
+Op = TypeVar('Op', bound=QOperation)
+
+
+class Repeat(QOperation[tuple], Generic[Op]):
+    """ Operation applying op n times on the same args. """
+    __slots__ = ('_op', '_n')
+
+    def __init__(self, op: Op, n: int, *, name: Optional[str] = None):
+        super().__init__(name=name)
+        if n < 0:
+            raise ValueError(f"expected n >= 0, got {n}")
+        self._op = op
+        self._n = int(n)
+
+    @property
+    def op(self) -> Op:
+        return self._op
+
+    @property
+    def n(self) -> int:
+        return self._n
+
+    def __call__(self, *args: QSystemStruct) -> tuple:
+        return tuple(self.op(*args) for _ in range(self.n))
+
+    def _intern_key(self):
+        return self.name, self.op, self.n
+
+    def __repr__(self):
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({self.op!r}, {self.n!r}{name_str})"
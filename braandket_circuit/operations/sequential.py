@@ -2,6 +2,7 @@ from copy import copy
 from typing import Generic, Iterable, Iterator, Optional, TypeVar, Union, overload
 
 from braandket_circuit.basics import QOperation, QSystemStruct, R
+from .repeat import Repeat
 
 Op = TypeVar('Op', bound=QOperation)
 
@@ -58,8 +59,8 @@ class Sequential(QOperation[tuple], Generic[Op]):
     def __radd__(self, other: Op) -> 'Sequential[Op]':
         return Sequential((other, *self), name=self.name)
 
-    def __mul__(self, other: int) -> 'Sequential[Op]':
-        return Sequential([self] * other, name=self.name)
+    def __mul__(self, other: int) -> 'Repeat[Sequential[Op]]':
+        return Repeat(self, other, name=self.name)
 
     def __call__(self, *args: QSystemStruct) -> R:
         results = []
@@ -0,0 +1,58 @@
+from collections.abc import Reversible
+from typing import Callable, Generic, Iterable, Iterator, Optional, TypeVar
+
+from braandket_circuit.basics import QOperation, QSystemStruct
+from braandket_circuit.utils import iter_struct
+
+Op = TypeVar('Op', bound=QOperation)
+
+
+class StreamingSequential(QOperation[tuple], Generic[Op]):
+    """ Sequential whose steps are produced lazily, each time it is iterated.
+
+    The steps come from a re-iterable (like a range-based generator class or a sequence)
+    or from a factory returning a new iterable (like a generator function) on each call.
+    Applying it keeps only the results of the steps that are not all None (like measurements), in their order,
+    so that a long stream of gates is applied in constant memory.
+    """
+
+    def __init__(self, steps: Iterable[Op] | Callable[[], Iterable[Op]], *, name: Optional[str] = None):
+        super().__init__(name=name)
+        # checked as an iterable first, as operations like Sequential are both iterable and callable
+        if isinstance(steps, Iterable):
+            if iter(steps) is steps:
+                raise TypeError("An iterator can be iterated only once, pass a factory of it instead.")
+        elif not callable(steps) or isinstance(steps, QOperation):
+            raise TypeError(f"Expected an iterable of steps or a factory of it, got {steps!r}.")
+        self._steps = steps
+        self._factory = not isinstance(steps, Iterable)
+
+    @property
+    def reversible(self) -> bool:
+        """ Whether the steps can be iterated in reverse order without materializing them. """
+        if self._factory:
+            return False
+        # like reversed(), also taking the sequence protocol (like of Sequential)
+        steps_type = type(self._steps)
+        is_sequence = hasattr(steps_type, '__len__') and hasattr(steps_type, '__getitem__')
+        return isinstance(self._steps, Reversible) or is_sequence
+
+    def __iter__(self) -> Iterator[Op]:
+        return iter(self._steps() if self._factory else self._steps)
+
+    def __reversed__(self) -> Iterator[Op]:
+        if self.reversible:
+            return reversed(self._steps)
+        return reversed(tuple(self))
+
+    def __call__(self, *args: QSystemStruct) -> tuple:
+        results = []
+        for step in self:
+            result = step(*args)
+            if not all(atom is None for atom in iter_struct(result)):
+                results.append(result)
+        return tuple(results)
+
+    def __repr__(self) -> str:
+        name_str = f", name={self.name!r}" if self.name else ""
+        return f"{type(self).__name__}({self._steps!r}{name_str})"
@@ -70,6 +70,8 @@ def convert(cv: Conversion[T], op: QOperation) -> T:
             return impl(cv, op)
         except Exception as err:
             impls_error.append(err)
+    # impls not applicable to the op do not hide the error of the one that is
+    impls_error = [err for err in impls_error if not isinstance(err, NotImplementedError)] or impls_error
     if not impls_error:
         raise NotImplementedError(f"No implementation for conversion {cv} and operation {op}.")
     elif len(impls_error) == 1:
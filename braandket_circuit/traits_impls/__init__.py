@@ -1,3 +1,4 @@
-from .apply import BnkParticle, BnkRuntime, BnkState, SymbolicParticle, SymbolicRuntime
-from .compile import FlattenPass, FreezePass
-from .convert import Invert, ToMatrix
+from .apply import BnkParticle, BnkRuntime, BnkSnapshot, BnkState, BranchingRuntime, DensityMatrixRuntime, \
+    SimulationCache, SimulationResult, SymbolicParticle, SymbolicRuntime, TrajectoryRuntime, run_parallel, simulate
+from .compile import FlattenPass, FreezePass, LayoutPass, LightConePass, SchedulePass
+from .convert import Invert, StructuralHash, ToMatrix, ToSparseMatrix
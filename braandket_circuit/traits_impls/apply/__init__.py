@@ -1,7 +1,10 @@
 import importlib
 
-from .braandket import BnkParticle, BnkRuntime, BnkState
+from .braandket import BnkParticle, BnkRuntime, BnkSnapshot, BnkState, DensityMatrixRuntime, SimulationCache, \
+    SimulationResult, run_parallel, simulate
+from .branching import BranchingRuntime
 from .symbolic import SymbolicParticle, SymbolicRuntime
+from .trajectory import TrajectoryRuntime
 
 importlib.import_module(".impls", __package__)
 del importlib
@@ -1 +1,4 @@
-from .runtime import BnkParticle, BnkRuntime, BnkState
+from .density import DensityMatrixRuntime
+from .parallel import run_parallel
+from .runtime import BnkParticle, BnkRuntime, BnkSnapshot, BnkState
+from .simulation import SimulationCache, SimulationResult, simulate
@@ -0,0 +1,12 @@
+from braandket import MixedStateTensor, PureStateTensor, StateTensor
+
+from .runtime import BnkRuntime
+
+
+class DensityMatrixRuntime(BnkRuntime):
+    """ BnkRuntime keeping the states as density matrices, so that noise channels are applied exactly. """
+
+    def _adapted(self, tensor: StateTensor) -> StateTensor:
+        if isinstance(tensor, PureStateTensor):
+            tensor = MixedStateTensor.of(tensor)
+        return super()._adapted(tensor)
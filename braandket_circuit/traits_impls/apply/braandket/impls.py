@@ -1,14 +1,21 @@
+import math
+import weakref
+from typing import Callable
+
 import numpy as np
 
 import braandket as bnk
-from braandket import MixedStateTensor, OperatorTensor, PureStateTensor
-from braandket_circuit.basics import QParticle, QSystemStruct
-from braandket_circuit.operations import AllocateParticle, Controlled, DesiredMeasurement, GlobalPhaseGate, \
-    HadamardGate, HalfPiPhaseGate, MeasurementResult, PauliXGate, PauliYGate, PauliZGate, ProjectiveMeasurement, \
-    PureStatePreparation, QuarterPiPhaseGate, RotationXGate, RotationYGate, RotationZGate
+from braandket import ArrayLike, MixedStateTensor, NumSpace, NumpyBackend, OperatorTensor, PureStateTensor, \
+    StateTensor
+from braandket_circuit.basics import QOperation, QParticle, QSystemStruct
+from braandket_circuit.operations import AllocateParticle, Checkpoint, Controlled, DesiredMeasurement, \
+    GlobalPhaseGate, HadamardGate, HalfPiPhaseGate, InverseHalfPiPhaseGate, InverseQuantumFourierTransform, \
+    InverseQuarterPiPhaseGate, KrausChannel, Layout, MeasurementResult, Moment, PauliChannel, PauliEvolution, \
+    PauliXGate, PauliYGate, PauliZGate, ProjectiveMeasurement, PureStatePreparation, QuantumFourierTransform, \
+    QuarterPiPhaseGate, ReadoutError, Remapped, Repeat, RotationXGate, RotationYGate, RotationZGate, Sequential
 from braandket_circuit.traits import register_apply_impl
-from braandket_circuit.utils import iter_struct
-from .runtime import BnkParticle, BnkRuntime, BnkState
+from braandket_circuit.utils import iter_struct, map_struct
+from .runtime import BnkParticle, BnkRuntime, BnkSnapshot, BnkState
 
 
 @register_apply_impl(BnkRuntime, AllocateParticle)
@@ -16,57 +23,121 @@ def allocate_particle_impl(rt: BnkRuntime, op: AllocateParticle):
     return BnkParticle(rt, bnk.KetSpace(op.ndim, name=op.name))
 
 
-@register_apply_impl(BnkRuntime, PauliXGate)
-def x_gate_impl(rt: BnkRuntime, _: PauliXGate, qubit: BnkParticle):
-    matrix = np.asarray([[0, 1], [1, 0]])
-    operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+single_qubit_matrix_impls: dict[type[QOperation], Callable[[BnkRuntime, QOperation], ArrayLike]] = {}
 
 
-@register_apply_impl(BnkRuntime, PauliYGate)
-def y_gate_impl(rt: BnkRuntime, _: PauliYGate, qubit: BnkParticle):
-    matrix = np.asarray([[0, -1j], [+1j, 0]])
-    operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+def single_qubit_gate_impl(op_type: type[QOperation]):
+    """ Registers the matrix of a single qubit gate, which is then applied by apply_single_qubit_matrix(). """
 
+    def decorator(matrix_impl: Callable[[BnkRuntime, QOperation], ArrayLike]):
+        def impl(rt: BnkRuntime, op: QOperation, qubit: BnkParticle):
+            apply_single_qubit_matrix(rt, matrix_impl(rt, op), qubit)
 
-@register_apply_impl(BnkRuntime, PauliZGate)
-def z_gate_impl(rt: BnkRuntime, _: PauliZGate, qubit: BnkParticle):
-    matrix = np.asarray([[1, 0], [0, -1]])
-    operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+        single_qubit_matrix_impls[op_type] = matrix_impl
+        register_apply_impl(BnkRuntime, op_type, impl)
+        return matrix_impl
 
+    return decorator
 
-@register_apply_impl(BnkRuntime, HalfPiPhaseGate)
-def s_gate_impl(rt: BnkRuntime, _: HalfPiPhaseGate, qubit: BnkParticle):
-    matrix = np.asarray([[1, 0], [0, 1j]])
+
+def apply_single_qubit_matrix(rt: BnkRuntime, matrix: ArrayLike, qubit: BnkParticle):
     operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+    qubit.state.tensor = apply_operator(qubit.state.tensor, operator)
+
+
+def apply_operator(tensor: StateTensor, operator: OperatorTensor) -> StateTensor:
+    """ Applies the operator on a pure state, or on both sides of a mixed state. """
+    if isinstance(tensor, MixedStateTensor):
+        return MixedStateTensor.of(operator @ tensor @ operator.ct)
+    return operator @ tensor
+
+
+def measure_tensor(tensor: StateTensor, spaces: tuple[bnk.KetSpace, ...], results: tuple | None = None) -> tuple:
+    """ Measures the spaces of the tensor like StateTensor.measure, also for a mixed state of only these spaces. """
+    args = spaces if results is None else tuple(zip(spaces, results))
+    if isinstance(tensor, MixedStateTensor) and len(tensor.spaces) == 2 * len(spaces):
+        # braandket fails to measure a mixed state with nothing left to reduce, so a trivial space is padded
+        padding = bnk.KetSpace(1)
+        tensor = MixedStateTensor.of(tensor @ MixedStateTensor.of(PureStateTensor.of(np.ones([1]), [padding])))
+        results, prob, tensor = tensor.measure(args)
+        return results, prob, MixedStateTensor.of(tensor.trace(padding))
+    return tensor.measure(args)
+
+
+def sample_measurement(rt: BnkRuntime, tensor: StateTensor, spaces: tuple[bnk.KetSpace, ...]) -> tuple:
+    """ Samples the results of measuring the spaces with the random generator of the runtime,
+    one for each element along the batch axes (NumSpaces) of the tensor. """
+    batch_spaces = tuple(space for space in tensor.spaces if isinstance(space, NumSpace))
+    other_spaces = tuple(space for space in tensor.ket_spaces if space not in spaces)
+    batch_shape, shape = tuple(space.n for space in batch_spaces), tuple(space.n for space in spaces)
+    batches_n, choices_n = math.prod(batch_shape), math.prod(shape)
+    others_n = math.prod(space.n for space in other_spaces)
+    if isinstance(tensor, MixedStateTensor):
+        ket_spaces = (*spaces, *other_spaces)
+        values = np.asarray(tensor.values(*batch_spaces, *ket_spaces, *(space.ct for space in ket_spaces)))
+        values = np.reshape(values, [batches_n, choices_n, others_n, choices_n, others_n])
+        probs = np.real(np.einsum("bcoco->bc", values))
+    else:
+        values = np.asarray(tensor.values(*batch_spaces, *spaces, *other_spaces))
+        probs = np.sum(np.reshape(np.abs(values) ** 2, [batches_n, choices_n, others_n]), axis=-1)
+    choice = sample_choices(rt.rng, probs)
+    return tuple(np.reshape(results, batch_shape) for results in np.unravel_index(choice, shape))
 
 
-@register_apply_impl(BnkRuntime, QuarterPiPhaseGate)
-def t_gate_impl(rt: BnkRuntime, _: QuarterPiPhaseGate, qubit: BnkParticle):
-    matrix = np.asarray([[1, 0], [0, np.exp(1j * np.pi / 4)]])
-    operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+def sample_choices(rng: np.random.Generator, probs: np.ndarray) -> np.ndarray:
+    """ Samples one choice for each row of (possibly unnormalized) probabilities. """
+    cumulative = np.cumsum(probs, axis=-1)
+    randoms = rng.random(len(probs)) * cumulative[:, -1]
+    return np.minimum(np.sum(cumulative <= randoms[:, None], axis=-1), probs.shape[-1] - 1)
 
 
-@register_apply_impl(BnkRuntime, HadamardGate)
-def h_gate_impl(rt: BnkRuntime, _: HadamardGate, qubit: BnkParticle):
-    matrix = np.asarray([[1, 1], [1, -1]]) / np.sqrt(2)
-    operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+@single_qubit_gate_impl(PauliXGate)
+def x_gate_matrix(rt: BnkRuntime, _: PauliXGate) -> ArrayLike:
+    return np.asarray([[0, 1], [1, 0]])
 
 
-@register_apply_impl(BnkRuntime, GlobalPhaseGate)
-def phase_gate_impl(rt: BnkRuntime, op: GlobalPhaseGate, qubit: BnkParticle):
-    matrix = np.asarray([[np.exp(1j * op.theta), 0], [0, np.exp(1j * op.theta)]])
-    operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+@single_qubit_gate_impl(PauliYGate)
+def y_gate_matrix(rt: BnkRuntime, _: PauliYGate) -> ArrayLike:
+    return np.asarray([[0, -1j], [+1j, 0]])
+
+
+@single_qubit_gate_impl(PauliZGate)
+def z_gate_matrix(rt: BnkRuntime, _: PauliZGate) -> ArrayLike:
+    return np.asarray([[1, 0], [0, -1]])
+
+
+@single_qubit_gate_impl(HalfPiPhaseGate)
+def s_gate_matrix(rt: BnkRuntime, _: HalfPiPhaseGate) -> ArrayLike:
+    return np.asarray([[1, 0], [0, 1j]])
+
 
+@single_qubit_gate_impl(QuarterPiPhaseGate)
+def t_gate_matrix(rt: BnkRuntime, _: QuarterPiPhaseGate) -> ArrayLike:
+    return np.asarray([[1, 0], [0, np.exp(1j * np.pi / 4)]])
 
-@register_apply_impl(BnkRuntime, RotationXGate)
-def rx_gate_impl(rt: BnkRuntime, op: RotationXGate, qubit: BnkParticle):
+
+@single_qubit_gate_impl(InverseHalfPiPhaseGate)
+def sdg_gate_matrix(rt: BnkRuntime, _: InverseHalfPiPhaseGate) -> ArrayLike:
+    return np.asarray([[1, 0], [0, -1j]])
+
+
+@single_qubit_gate_impl(InverseQuarterPiPhaseGate)
+def tdg_gate_matrix(rt: BnkRuntime, _: InverseQuarterPiPhaseGate) -> ArrayLike:
+    return np.asarray([[1, 0], [0, np.exp(-1j * np.pi / 4)]])
+
+
+@single_qubit_gate_impl(HadamardGate)
+def h_gate_matrix(rt: BnkRuntime, _: HadamardGate) -> ArrayLike:
+    return np.asarray([[1, 1], [1, -1]]) / np.sqrt(2)
+
+
+@single_qubit_gate_impl(GlobalPhaseGate)
+def phase_gate_matrix(rt: BnkRuntime, op: GlobalPhaseGate) -> ArrayLike:
+    return np.asarray([[np.exp(1j * op.theta), 0], [0, np.exp(1j * op.theta)]])
+
+
+@single_qubit_gate_impl(RotationXGate)
+def rx_gate_matrix(rt: BnkRuntime, op: RotationXGate) -> ArrayLike:
     backend = rt.backend
     theta = backend.convert(op.theta)
     half_theta = backend.div(theta, 2.0)
@@ -75,14 +146,11 @@ def rx_gate_impl(rt: BnkRuntime, op: RotationXGate, qubit: BnkParticle):
     m1j_sin_half_theta = backend.mul(sin_half_theta, -1.0j)
 
     cos_half_theta, m1j_sin_half_theta = backend.compact(cos_half_theta, m1j_sin_half_theta)
-    matrix = backend.convert([[cos_half_theta, m1j_sin_half_theta], [m1j_sin_half_theta, cos_half_theta]])
-
-    operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+    return backend.convert([[cos_half_theta, m1j_sin_half_theta], [m1j_sin_half_theta, cos_half_theta]])
 
 
-@register_apply_impl(BnkRuntime, RotationYGate)
-def ry_gate_impl(rt: BnkRuntime, op: RotationYGate, qubit: BnkParticle):
+@single_qubit_gate_impl(RotationYGate)
+def ry_gate_matrix(rt: BnkRuntime, op: RotationYGate) -> ArrayLike:
     backend = rt.backend
     theta = backend.convert(op.theta)
     half_theta = backend.div(theta, 2.0)
@@ -90,14 +158,11 @@ def ry_gate_impl(rt: BnkRuntime, op: RotationYGate, qubit: BnkParticle):
     sin_half_theta = backend.sin(half_theta)
 
     cos_half_theta, sin_half_theta = backend.compact(cos_half_theta, sin_half_theta)
-    matrix = backend.convert([[cos_half_theta, -sin_half_theta], [sin_half_theta, cos_half_theta]])
-
-    operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+    return backend.convert([[cos_half_theta, -sin_half_theta], [sin_half_theta, cos_half_theta]])
 
 
-@register_apply_impl(BnkRuntime, RotationZGate)
-def rz_gate_impl(rt: BnkRuntime, op: RotationZGate, qubit: BnkParticle):
+@single_qubit_gate_impl(RotationZGate)
+def rz_gate_matrix(rt: BnkRuntime, op: RotationZGate) -> ArrayLike:
     backend = rt.backend
     theta = backend.convert(op.theta)
     half_theta = backend.div(theta, 2.0)
@@ -108,14 +173,11 @@ def rz_gate_impl(rt: BnkRuntime, op: RotationZGate, qubit: BnkParticle):
 
     exp_p1j_half_theta, exp_m1j_half_theta, zero \
         = backend.compact(exp_p1j_half_theta, exp_m1j_half_theta, 0)
-    matrix = backend.convert([[exp_m1j_half_theta, zero], [zero, exp_p1j_half_theta]])
-
-    operator = OperatorTensor.from_matrix(matrix, [qubit.space], backend=rt.backend)
-    qubit.state.tensor = operator @ qubit.state.tensor
+    return backend.convert([[exp_m1j_half_theta, zero], [zero, exp_p1j_half_theta]])
 
 
 @register_apply_impl(BnkRuntime, Controlled)
-def controlled_impl(_: BnkRuntime, op: Controlled, control: QSystemStruct, target: QSystemStruct):
+def controlled_impl(rt: BnkRuntime, op: Controlled, control: QSystemStruct, target: QSystemStruct):
     control_spaces = set(particle.space for particle in iter_struct(control, atom_typ=BnkParticle))
     control_identity = bnk.prod(*(sp.identity() for sp in control_spaces))
     control_projector_on = bnk.prod(*(sp.projector(1) for sp in control_spaces))
@@ -124,6 +186,20 @@ def controlled_impl(_: BnkRuntime, op: Controlled, control: QSystemStruct, targe
     total_state = BnkState.prod(
         *(particle.state for particle in iter_struct(control, atom_typ=BnkParticle)),
         *(particle.state for particle in iter_struct(target, atom_typ=BnkParticle)))
+    if isinstance(total_state.tensor, MixedStateTensor):
+        # applying the op on rho would lose the coherences between the control states, so it is applied as a matrix
+        from braandket_circuit.traits import convert
+        from braandket_circuit.traits_impls.convert import ToMatrix
+        target_particles = tuple(iter_struct(target, atom_typ=BnkParticle))
+        target_args = (target,) if isinstance(target, QParticle) else tuple(target)
+        matrix = convert(ToMatrix(map_struct(lambda p: p.ndim, target_args, atom_typ=BnkParticle)), op.op)
+        target_spaces = tuple(particle.space for particle in target_particles)
+        operator = bnk.sum(
+            control_projector_on @ OperatorTensor.from_matrix(matrix, target_spaces, backend=rt.backend),
+            control_projector_off @ bnk.prod(*(sp.identity() for sp in target_spaces)))
+        total_state.tensor = apply_operator(total_state.tensor, operator)
+        return
+
     total_state_off = total_state.tensor
 
     if isinstance(target, QParticle):
@@ -144,12 +220,82 @@ def controlled_impl(_: BnkRuntime, op: Controlled, control: QSystemStruct, targe
             control_projector_off @ total_state_off @ control_projector_off))
 
 
+@register_apply_impl(BnkRuntime, QuantumFourierTransform)
+def qft_impl(rt: BnkRuntime, _: QuantumFourierTransform, *qubits: QSystemStruct):
+    fourier_transform(rt, qubits, inverse=False)
+
+
+@register_apply_impl(BnkRuntime, InverseQuantumFourierTransform)
+def inverse_qft_impl(rt: BnkRuntime, _: InverseQuantumFourierTransform, *qubits: QSystemStruct):
+    fourier_transform(rt, qubits, inverse=True)
+
+
+def fourier_transform(rt: BnkRuntime, qubits: QSystemStruct, *, inverse: bool):
+    if not isinstance(rt.backend, NumpyBackend):
+        raise NotImplementedError  # falls back to the gate decomposition
+
+    particles = tuple(iter_struct(qubits, atom_typ=BnkParticle))
+    state = BnkState.prod(*(particle.state for particle in particles))
+    if not isinstance(state.tensor, PureStateTensor):
+        raise NotImplementedError  # falls back to the gate decomposition
+
+    target_spaces = tuple(particle.space for particle in particles)
+    other_spaces = tuple(space for space in state.tensor.spaces if space not in target_spaces)
+    values = state.tensor.values(*target_spaces, *other_spaces)
+
+    # the amplitudes of the register are contiguous along axis 0 after the reshape,
+    # so that one FFT over it (O(N log N)) replaces the O(n^2) gates of the decomposition
+    shape = np.shape(values)
+    values = np.reshape(values, (np.prod(shape[:len(target_spaces)], dtype=int), -1))
+    if inverse:
+        values = np.fft.fft(values, axis=0, norm="ortho")
+    else:
+        values = np.fft.ifft(values, axis=0, norm="ortho")
+    values = np.reshape(values, shape)
+
+    state.tensor = PureStateTensor.of(values, (*target_spaces, *other_spaces), backend=rt.backend)
+
+
+@register_apply_impl(BnkRuntime, PauliEvolution)
+def pauli_evolution_impl(rt: BnkRuntime, op: PauliEvolution, *qubits: QSystemStruct):
+    if not isinstance(rt.backend, NumpyBackend):
+        raise NotImplementedError  # falls back to the gate decomposition
+
+    particles = tuple(iter_struct(qubits, atom_typ=BnkParticle))
+    state = BnkState.prod(*(particle.state for particle in particles))
+    if not isinstance(state.tensor, PureStateTensor):
+        raise NotImplementedError  # falls back to the gate decomposition
+
+    target_spaces = tuple(particle.space for particle in particles)
+    other_spaces = tuple(space for space in state.tensor.spaces if space not in target_spaces)
+    values = state.tensor.values(*target_spaces, *other_spaces)
+    values = np.asarray(values, dtype=np.result_type(values, np.complex64))
+
+    # exp(-i theta P) = cos(theta) - i sin(theta) P,
+    # where P flips the axes of X and Y and multiplies the phases of Y and Z
+    for pauli, coefficient in op.observable:
+        theta = np.multiply(coefficient, op.time)
+        flip_axes = tuple(axis for axis, p in enumerate(pauli) if p in "XY")
+        phases = np.ones([1] * np.ndim(values), dtype=values.dtype)
+        for axis, p in enumerate(pauli):
+            if p in "YZ":
+                phases = phases * np.reshape(_pauli_phases[p], [-1 if i == axis else 1 for i in range(np.ndim(values))])
+        values = np.cos(theta) * values - 1j * np.sin(theta) * phases * np.flip(values, flip_axes)
+
+    state.tensor = PureStateTensor.of(values, (*target_spaces, *other_spaces), backend=rt.backend)
+
+
+_pauli_phases = {"Y": np.asarray([-1j, 1j]), "Z": np.asarray([1, -1])}
+
+
 @register_apply_impl(BnkRuntime, ProjectiveMeasurement)
-def projective_measurement_impl(_: BnkRuntime, __: ProjectiveMeasurement, *args: QSystemStruct) -> MeasurementResult:
+def projective_measurement_impl(rt: BnkRuntime, _: ProjectiveMeasurement, *args: QSystemStruct) -> MeasurementResult:
     particles = tuple(particle for particle in iter_struct(args, atom_typ=BnkParticle))
     state = BnkState.prod(*(particle.state for particle in particles))
     spaces = tuple(particle.space for particle in particles)
-    results, prob, state.tensor = state.tensor.measure(spaces)
+    # other backends sample by themselves, for example inside compiled functions
+    results = sample_measurement(rt, state.tensor, spaces) if isinstance(rt.backend, NumpyBackend) else None
+    results, prob, state.tensor = measure_tensor(state.tensor, spaces, results)
     if len(args) == 1:
         args = args[0]
         results = results[0]
@@ -162,7 +308,7 @@ def desired_measurement_impl(_: BnkRuntime, op: DesiredMeasurement, *args: QSyst
     state = BnkState.prod(*(particle.state for particle in particles))
     spaces = tuple(particle.space for particle in particles)
     results = tuple(iter_struct(op.value))
-    results, prob, state.tensor = state.tensor.measure(zip(spaces, results))
+    results, prob, state.tensor = measure_tensor(state.tensor, spaces, results)
     if len(args) == 1:
         args = args[0]
         results = results[0]
@@ -181,3 +327,171 @@ def pure_state_preparation_impl(rt: BnkRuntime, op: PureStatePreparation, *args:
 
     state = BnkState.prod(*(particle.state for particle in particles))
     state.tensor = state_tensor
+
+
+@register_apply_impl(BnkRuntime, Sequential)
+def sequential_impl(rt: BnkRuntime, op: Sequential, *args: QSystemStruct) -> tuple:
+    if rt.prefix_cache is None:
+        raise NotImplementedError
+    checkpoint_index = next((i for i, step in enumerate(op) if isinstance(step, Checkpoint)), None)
+    if checkpoint_index is None:
+        raise NotImplementedError
+
+    # the cached prefix is valid only when starting from the initial states
+    particles = tuple(iter_struct(args, atom_typ=BnkParticle))
+    if not all(particle.is_initial for particle in particles):
+        raise NotImplementedError
+
+    prefix = tuple(op[:checkpoint_index + 1])
+    key = (prefix[:-1], map_struct(lambda particle: particle.ndim, args, atom_typ=BnkParticle))
+    cached = rt.prefix_cache.get(key)
+    if cached is not None:
+        snapshot, results = cached
+        snapshot.restore(particles)
+        results = list(results)
+    else:
+        results = [step(*args) for step in prefix]
+        # only deterministic prefixes (without results like measurements) can be cached
+        if all(result is None for result in iter_struct(results)):
+            try:
+                rt.prefix_cache[key] = BnkSnapshot(particles), tuple(results)
+            except ValueError:
+                pass  # the states involve particles allocated in the prefix
+
+    for step in op[checkpoint_index + 1:]:
+        results.append(step(*args))
+    return tuple(results)
+
+
+@register_apply_impl(BnkRuntime, Moment)
+def moment_impl(rt: BnkRuntime, op: Moment, *args: QSystemStruct) -> tuple:
+    # single qubit gates are contracted on their own axes by their matrices, skipping the dispatch
+    results = [None] * len(op)
+    for i, step in enumerate(op):
+        matrix_impl = None
+        if isinstance(step, Remapped) and len(step.indices) == 1 and isinstance(step.indices[0], int):
+            matrix_impl = single_qubit_matrix_impls.get(type(step.op))
+        qubit = args[step.indices[0]] if matrix_impl is not None else None
+        if isinstance(qubit, BnkParticle):
+            apply_single_qubit_matrix(rt, matrix_impl(rt, step.op), qubit)
+        else:
+            results[i] = step(*args)
+    return tuple(results)
+
+
+@register_apply_impl(BnkRuntime, Repeat)
+def repeat_impl(_: BnkRuntime, op: Repeat, *args: QSystemStruct) -> tuple:
+    if op.n == 0:
+        return ()
+    first = op.op(*args)
+    if not all(result is None for result in iter_struct(first)):
+        # the body has results (like measurements), so it is applied as it is
+        return first, *(op.op(*args) for _ in range(op.n - 1))
+
+    # a body without results is applied by a flattened plan, skipping the dispatch through its nesting
+    plan = repeat_plan(op.op)
+    for _ in range(op.n - 1):
+        plan(*args)
+    return (first,) * op.n
+
+
+def repeat_plan(body: QOperation) -> QOperation:
+    """ The flattened plan of a Repeat body, compiled once for each body. """
+    try:
+        plan = _repeat_plans.get(body, body)
+    except TypeError:  # not hashable
+        plan = body
+    if plan is not body:
+        return plan if plan is not None else body
+
+    from braandket_circuit.traits import compile
+    from braandket_circuit.traits_impls.compile import FlattenPass
+    plan = compile(FlattenPass(), body)
+    try:
+        # the body itself is stored as None, so that the entry does not keep its key alive
+        _repeat_plans[body] = None if plan is body else plan
+    except TypeError:  # not hashable
+        pass
+    return plan
+
+
+_repeat_plans: weakref.WeakKeyDictionary[QOperation, QOperation | None] = weakref.WeakKeyDictionary()
+
+
+@register_apply_impl(BnkRuntime, Layout)
+def layout_impl(rt: BnkRuntime, _: Layout, *args: QSystemStruct):
+    rt.arrange(*iter_struct(args, atom_typ=BnkParticle))
+
+
+# noise
+
+@register_apply_impl(BnkRuntime, KrausChannel)
+def kraus_channel_impl(rt: BnkRuntime, op: KrausChannel, *qubits: QSystemStruct):
+    particles = tuple(iter_struct(qubits, atom_typ=BnkParticle))
+    if len(particles) != op.n:
+        raise TypeError(f"{op} expected {op.n} qubits, got {len(particles)}")
+    state = BnkState.prod(*(particle.state for particle in particles))
+    tensor = state.tensor if isinstance(state.tensor, MixedStateTensor) else MixedStateTensor.of(state.tensor)
+
+    if not isinstance(rt.backend, NumpyBackend):
+        target_spaces = tuple(particle.space for particle in particles)
+        state.tensor = MixedStateTensor.of(bnk.sum(*(
+            operator @ tensor @ operator.ct
+            for operator in (OperatorTensor.from_matrix(k, target_spaces, backend=rt.backend) for k in op.kraus))))
+        return
+
+    # the channel is applied on the axes of the target particles only, on both sides of rho
+    target_spaces = tuple(particle.space for particle in particles)
+    other_spaces = tuple(space for space in tensor.ket_spaces if space not in target_spaces)
+    ket_spaces = (*target_spaces, *other_spaces)
+    spaces = (*ket_spaces, *(space.ct for space in ket_spaces))
+    values = np.asarray(tensor.values(*spaces))
+    values = np.asarray(values, dtype=np.result_type(values, np.complex64))
+    target_size, other_size = 2 ** op.n, math.prod(space.n for space in other_spaces)
+    values = np.reshape(values, (target_size, other_size, target_size, other_size))
+
+    if isinstance(op, PauliChannel):
+        values = pauli_channel_values(op, values)
+    elif op.is_diagonal:
+        # rho[a, b] -> sum of k[a] k[b]^* rho[a, b]
+        diagonals = np.asarray([np.diagonal(k) for k in map(np.asarray, op.kraus)])
+        mask = np.einsum("ia,ib->ab", diagonals, np.conj(diagonals))
+        values = values * mask[:, None, :, None]
+    else:
+        # the superoperator sum of K (x) K^* contracted with the target axes of both sides at once
+        kraus = np.asarray([np.asarray(k) for k in op.kraus])
+        superoperator = np.einsum("iac,ibd->abcd", kraus, np.conj(kraus))
+        values = np.einsum("abcd,cxdy->axby", superoperator, values)
+
+    values = np.reshape(values, tuple(space.n for space in spaces))
+    state.tensor = MixedStateTensor.of(values, spaces, backend=rt.backend)
+
+
+def pauli_channel_values(op: PauliChannel, values: np.ndarray) -> np.ndarray:
+    """ Applies rho -> sum of p P rho P by flipping and phasing the target axes, without any contraction. """
+    shape, n = values.shape, op.n
+    values = np.reshape(values, ((2,) * n + (shape[1],)) * 2)
+    ket_axes, bra_axes = tuple(range(n)), tuple(range(n + 1, 2 * n + 1))
+
+    def axis_vector(vector: np.ndarray, axis: int) -> np.ndarray:
+        return np.reshape(vector, [-1 if i == axis else 1 for i in range(values.ndim)])
+
+    result = np.zeros_like(values)
+    for pauli, p in op.probabilities.items():
+        flip_axes = tuple(axis for axes in (ket_axes, bra_axes) for axis, q in zip(axes, pauli) if q in "XY")
+        phases = np.ones([1] * values.ndim, dtype=values.dtype)
+        for ket_axis, bra_axis, q in zip(ket_axes, bra_axes, pauli):
+            if q in "YZ":
+                phases = phases * axis_vector(_pauli_phases[q], ket_axis)
+                phases = phases * axis_vector(np.conj(_pauli_phases[q]), bra_axis)
+        result += p * phases * np.flip(values, flip_axes)
+    return np.reshape(result, shape)
+
+
+@register_apply_impl(BnkRuntime, ReadoutError)
+def readout_error_impl(rt: BnkRuntime, op: ReadoutError, *args: QSystemStruct) -> MeasurementResult:
+    result = ProjectiveMeasurement()(*args)
+    values = np.asarray(result.value)
+    flip_probs = np.where(values == 0, op.p01, op.p10)
+    values = np.where(rt.rng.random(np.shape(values)) < flip_probs, 1 - values, values)
+    return MeasurementResult(result.target, values if np.ndim(values) else values.item(), result.prob)
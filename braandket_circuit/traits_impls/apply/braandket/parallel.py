@@ -0,0 +1,65 @@
+import collections
+import concurrent.futures
+import math
+import os
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+from braandket_circuit.operations import MeasurementResult
+from braandket_circuit.traits import QRuntime
+from braandket_circuit.utils import freeze_struct, map_struct
+from .runtime import BnkRuntime
+
+
+def run_parallel(
+    circuit_fn: Callable[[], Any],
+    shots: int,
+    workers: int | None = None, *,
+    seed: int | np.random.SeedSequence | None = None,
+    runtime_fn: Callable[..., QRuntime] = BnkRuntime,
+    chunk_size: int = 64,
+) -> collections.Counter[Hashable]:
+    """ Runs circuit_fn once per shot, each in a new runtime, over a pool of worker processes.
+
+    The results of circuit_fn (like MeasurementResults) are counted by their values. Shots are run in chunks of
+    chunk_size, each with its own random stream spawned from the seed, so that the counts depend only on the seed,
+    not on the number of workers. runtime_fn is called with the random generator of the chunk as the seed keyword.
+    circuit_fn and runtime_fn must be picklable, like module-level functions.
+    """
+    seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    chunks_n = math.ceil(shots / chunk_size)
+    chunks = [
+        (circuit_fn, runtime_fn, chunk_seed, min(chunk_size, shots - i * chunk_size))
+        for i, chunk_seed in enumerate(seed.spawn(chunks_n))]
+
+    counts = collections.Counter()
+    workers = min(workers or os.cpu_count() or 1, chunks_n)
+    if workers <= 1:
+        for chunk in chunks:
+            counts.update(_run_chunk(*chunk))
+        return counts
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        for chunk_counts in executor.map(_run_chunk, *zip(*chunks)):
+            counts.update(chunk_counts)
+    return counts
+
+
+def _run_chunk(
+    circuit_fn: Callable[[], Any],
+    runtime_fn: Callable[..., QRuntime],
+    seed: np.random.SeedSequence,
+    shots: int,
+) -> collections.Counter[Hashable]:
+    rng = np.random.default_rng(seed)
+    counts = collections.Counter()
+    for _ in range(shots):
+        with runtime_fn(seed=rng):
+            counts[_outcome(circuit_fn())] += 1
+    return counts
+
+
+def _outcome(result: Any) -> Hashable:
+    return map_struct(
+        lambda r: freeze_struct(np.asarray(r.value).tolist()) if isinstance(r, MeasurementResult) else r,
+        result, atom_typ=MeasurementResult, strict=False)
@@ -1,21 +1,85 @@
 import importlib
+import itertools
+import math
 import weakref
-from typing import Optional, Union
+from typing import Any, Iterable, Optional, Union
 
-from braandket import Backend, KetSpace, StateTensor, get_default_backend
+import numpy as np
+
+from braandket import Backend, KetSpace, MixedStateTensor, StateTensor, get_default_backend
 from braandket_circuit.basics import QParticle, QSystemStruct
 from braandket_circuit.traits import QRuntime
 from braandket_circuit.utils import iter_struct
 
 
 class BnkRuntime(QRuntime):
-    def __init__(self, backend: Backend | None = None):
+    def __init__(self,
+        backend: Backend | None = None, *,
+        seed: int | np.random.SeedSequence | np.random.Generator | None = None,
+        prefix_cache: bool = False,
+        stable_layout: bool = False,
+    ):
         self._backend = backend or get_default_backend()
+        self._rng = np.random.default_rng(seed)
+        self._prefix_cache = {} if prefix_cache else None
+        self._layout = weakref.WeakKeyDictionary() if stable_layout else None
+        self._layout_counter = itertools.count()
 
     @property
     def backend(self) -> Backend:
         return self._backend
 
+    @property
+    def rng(self) -> np.random.Generator:
+        """ The random generator that sampling (like measurements) draws from on the numpy backend. """
+        return self._rng
+
+    # prefix cache
+
+    @property
+    def prefix_cache(self) -> Optional[dict[Any, tuple['BnkSnapshot', tuple]]]:
+        """ Snapshots of the states at the Checkpoint of Sequentials, or None if prefix caching is disabled. """
+        return self._prefix_cache
+
+    def clear_prefix_cache(self):
+        if self._prefix_cache is not None:
+            self._prefix_cache.clear()
+
+    # layout
+
+    @property
+    def stable_layout(self) -> bool:
+        """ Whether the axes of state tensors are laid out in the order of the layout when states are merged or
+        arranged, instead of the order of merging. Operations on a single state leave the axes in their own order. """
+        return self._layout is not None
+
+    def arrange(self, *particles: 'BnkParticle'):
+        """ Moves the particles to the end of the layout in the given order, rearranging their states.
+
+        Particles are laid out in the order of allocation until arranged. Does nothing without stable_layout.
+        """
+        if self._layout is None:
+            return
+        for particle in particles:
+            self._layout[particle.space] = next(self._layout_counter)
+        for state in {id(particle.state): particle.state for particle in particles if not particle.is_initial}.values():
+            state._tensor = self._arranged(state.tensor)
+
+    def _adapted(self, tensor: StateTensor) -> StateTensor:
+        """ Adapts a tensor given to a state, like converting it to the kind of states of the runtime. """
+        return tensor
+
+    def _arranged(self, tensor: StateTensor) -> StateTensor:
+        """ Transposes the axes of a tensor to the order of the layout. """
+        if self._layout is None:
+            return tensor
+        ket_spaces = sorted(tensor.ket_spaces, key=lambda space: self._layout.get(space, math.inf))
+        spaces = (*ket_spaces, *(space.ct for space in ket_spaces)) if isinstance(tensor, MixedStateTensor) \
+            else tuple(ket_spaces)
+        if spaces == tensor.spaces:
+            return tensor
+        return type(tensor).of(tensor.values(*spaces), spaces, backend=tensor.backend)
+
     def __enter__(self):
         self.backend.__enter__()
         return super().__enter__()
@@ -28,7 +92,7 @@ class BnkRuntime(QRuntime):
 class BnkState:
     def __init__(self, runtime: BnkRuntime, tensor: StateTensor, systems: QSystemStruct = ()):
         self._runtime = runtime
-        self._tensor = tensor
+        self._tensor = runtime._arranged(runtime._adapted(tensor))
         self._particles = weakref.WeakSet()
         self._register(*systems)
 
@@ -50,7 +114,7 @@ class BnkState:
 
     @tensor.setter
     def tensor(self, tensor: StateTensor):
-        self._tensor = tensor
+        self._tensor = self.runtime._adapted(tensor)
 
     @property
     def backend(self) -> Backend:
@@ -61,7 +125,10 @@ class BnkState:
             return self
         if self.runtime is not other.runtime:
             raise ValueError(f"The runtimes of two states are not matched!")
-        new_tensor = self._tensor @ other._tensor
+        if isinstance(self._tensor, MixedStateTensor) or isinstance(other._tensor, MixedStateTensor):
+            new_tensor = MixedStateTensor.of(MixedStateTensor.of(self._tensor) @ MixedStateTensor.of(other._tensor))
+        else:
+            new_tensor = self._tensor @ other._tensor
         new_particles = (*self._particles, *other._particles)
         return BnkState(self.runtime, new_tensor, new_particles)
 
@@ -69,9 +136,53 @@ class BnkState:
     def prod(cls, *states: 'BnkState') -> 'BnkState':
         if len(states) == 0:
             raise ValueError("No states to compose!")
-        if len(states) == 1:
-            return states[0]
-        return cls.prod(states[0] @ states[1], *states[2:])
+        # the same state may be given more than once, like for entangled particles
+        states = tuple({id(state): state for state in states}.values())
+        state = states[0]
+        for other in states[1:]:
+            state = state @ other
+        return state
+
+
+class BnkSnapshot:
+    """ Snapshot of the states of some particles.
+
+    State tensors are never modified in place, so the snapshot shares them instead of copying,
+    until they are replaced by new ones after the restoring.
+    """
+
+    def __init__(self, particles: Iterable['BnkParticle']):
+        particles = tuple(particles)
+        spaces = tuple(particle.space for particle in particles)
+
+        groups = {}
+        for i, particle in enumerate(particles):
+            state = particle.state
+            if state not in groups:
+                if any(space not in spaces for space in state.tensor.spaces if isinstance(space, KetSpace)):
+                    raise ValueError(f"The state of {particle} involves particles outside the snapshot!")
+                groups[state] = (state.tensor, [])
+            groups[state][1].append(i)
+
+        self._spaces = spaces
+        self._groups = tuple((tensor, tuple(indices)) for tensor, indices in groups.values())
+
+    def restore(self, particles: Iterable['BnkParticle']):
+        """ Restores the states into given particles, which replace the ones in the snapshot by position. """
+        particles = tuple(particles)
+        if tuple(particle.ndim for particle in particles) != tuple(space.n for space in self._spaces):
+            raise ValueError(f"The particles do not match the snapshot!")
+
+        spaces_map = {}
+        for space, particle in zip(self._spaces, particles):
+            spaces_map[space] = particle.space
+            spaces_map[space.ct] = particle.space.ct
+
+        for tensor, indices in self._groups:
+            spaces = tuple(spaces_map.get(space, space) for space in tensor.spaces)
+            if spaces != tensor.spaces:
+                tensor = type(tensor).of(tensor.values(), spaces, backend=tensor.backend)
+            BnkState(particles[indices[0]].runtime, tensor, tuple(particles[i] for i in indices))
 
 
 class BnkParticle(QParticle):
@@ -95,6 +206,8 @@ class BnkParticle(QParticle):
         elif state is not None:
             raise TypeError(f"Expected BnkState or StateTensor, got {state}!")
 
+        runtime.arrange(self)
+
     @property
     def runtime(self) -> BnkRuntime:
         return self._runtime
@@ -107,6 +220,11 @@ class BnkParticle(QParticle):
     def space(self) -> KetSpace:
         return self._space
 
+    @property
+    def is_initial(self) -> bool:
+        """ Whether the particle is still in its initial state, not touched by any operation. """
+        return self._state is None
+
     @property
     def state(self) -> BnkState:
         if self._state is None:
@@ -0,0 +1,160 @@
+import dataclasses
+import os
+import pathlib
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from braandket import Backend, MixedStateTensor, get_default_backend
+from braandket_circuit.basics import QOperation
+from .runtime import BnkRuntime, BnkState
+
+
+@dataclasses.dataclass
+class SimulationResult:
+    """ Final state over the qubits (amplitudes, or a density matrix if mixed) and the exact probabilities. """
+    state: np.ndarray
+    probabilities: np.ndarray
+
+
+class SimulationCache:
+    """ LRU cache of simulation results in memory, optionally backed by a directory on disk. """
+
+    def __init__(self, maxsize: int = 128, *, directory: str | os.PathLike | None = None):
+        self._maxsize = maxsize
+        self._directory = pathlib.Path(directory) if directory is not None else None
+        self._results = OrderedDict[str, SimulationResult]()
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def directory(self) -> Optional[pathlib.Path]:
+        return self._directory
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, key: str) -> Optional[SimulationResult]:
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            return result
+
+        if self._directory is not None:
+            path = self._directory / f"{key}.npz"
+            if path.exists():
+                with np.load(path) as data:
+                    result = _readonly_result(data["state"], data["probabilities"])
+                self._put_in_memory(key, result)
+                return result
+
+        return None
+
+    def put(self, key: str, result: SimulationResult):
+        result = _readonly_result(result.state, result.probabilities)
+        self._put_in_memory(key, result)
+
+        if self._directory is not None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            path = self._directory / f"{key}.npz"
+            temp_path = self._directory / f"{key}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as file:
+                np.savez(file, state=result.state, probabilities=result.probabilities)
+            os.replace(temp_path, path)  # atomic, so that concurrent readers never see partial files
+
+    def _put_in_memory(self, key: str, result: SimulationResult):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self._maxsize:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        """ Clears the results in memory, keeping the ones on disk. """
+        self._results.clear()
+
+
+def simulate(
+    op: QOperation, n: int, *,
+    backend: Backend | None = None,
+    seed: int | np.random.SeedSequence | np.random.Generator | None = None,
+    cache: SimulationCache | None = None,
+) -> SimulationResult:
+    """ Applies the operation on n qubits starting from |0...0> and returns the final state.
+
+    With a cache, results of deterministic circuits are looked up by the StructuralHash of the operation,
+    together with n and the type of the backend. The seed is given to the runtime, for the sampling of measurements.
+    """
+    key = None
+    if cache is not None and _is_deterministic(op):
+        from braandket_circuit.traits import convert
+        from braandket_circuit.traits_impls.convert import StructuralHash
+        try:
+            key = f"{convert(StructuralHash(), op)}-{n}-{type(backend or get_default_backend()).__name__}"
+        except (NotImplementedError, TypeError):
+            key = None  # operations without structural hash are not cached
+        if key is not None:
+            result = cache.get(key)
+            if result is not None:
+                return result
+
+    from braandket_circuit.operations import allocate_qubits
+    with BnkRuntime(backend, seed=seed):
+        qubits = allocate_qubits(n)
+        op(*qubits)
+
+        spaces = tuple(qubit.space for qubit in qubits)
+        tensor = BnkState.prod(*(qubit.state for qubit in qubits)).tensor
+        if len(tensor.ket_spaces) != len(spaces):
+            tensor = tensor.remain(*spaces)  # traces out the particles allocated by the operation
+
+        if isinstance(tensor, MixedStateTensor):
+            state = np.asarray(tensor.values(*spaces, *(space.ct for space in spaces)))
+            probabilities = np.reshape(np.real(np.diagonal(np.reshape(state, [2 ** n, 2 ** n]))), [2] * n)
+        else:
+            state = np.asarray(tensor.values(*spaces))
+            probabilities = np.abs(state) ** 2
+
+    result = SimulationResult(state, probabilities)
+    if key is not None:
+        cache.put(key, result)
+    return result
+
+
+# utils
+
+def _is_deterministic(op: QOperation) -> bool:
+    """ Whether the operation is known to contain no sampling (like measurements), judged from its frozen form.
+
+    Custom operations that can not be frozen are not known to be deterministic.
+    """
+    from braandket_circuit.operations import CompactCircuit, Controlled, DesiredMeasurement, ProjectiveMeasurement, \
+        ReadoutError, Remapped, Repeat, Sequential, StreamingSequential
+    from braandket_circuit.traits import compile, match_apply_impls
+    from braandket_circuit.traits_impls.apply.impls import default_impl
+    from braandket_circuit.traits_impls.compile import FreezePass
+
+    stack = [compile(FreezePass(), op)]
+    while stack:
+        op = stack.pop()
+        if isinstance(op, (Sequential, StreamingSequential)):
+            stack.extend(op)
+        elif isinstance(op, CompactCircuit):
+            stack.extend(op.ops)
+        elif isinstance(op, (Remapped, Controlled, Repeat)):
+            stack.append(op.op)
+        elif isinstance(op, (ProjectiveMeasurement, DesiredMeasurement, ReadoutError)):
+            return False
+        elif all(impl is default_impl for impl in match_apply_impls(BnkRuntime, op)):
+            return False  # a custom operation left unfrozen
+    return True
+
+
+def _readonly_result(state: np.ndarray, probabilities: np.ndarray) -> SimulationResult:
+    state = np.array(state)
+    state.flags.writeable = False
+    probabilities = np.array(probabilities)
+    probabilities.flags.writeable = False
+    return SimulationResult(state, probabilities)
@@ -0,0 +1,124 @@
+from typing import Optional
+
+import numpy as np
+
+from braandket import ArrayLike, NumSpace, PureStateTensor
+from braandket_circuit.basics import QSystemStruct
+from braandket_circuit.operations import AllocateParticle, DesiredMeasurement, MeasurementResult, ProjectiveMeasurement
+from braandket_circuit.traits import register_apply_impl
+from braandket_circuit.utils import iter_struct
+from .runtime import BranchingRuntime, Record
+from ..braandket import BnkParticle, BnkState
+from ..braandket.impls import allocate_particle_impl as bnk_allocate_particle_impl
+
+
+@register_apply_impl(BranchingRuntime, AllocateParticle)
+def allocate_particle_impl(rt: BranchingRuntime, op: AllocateParticle) -> BnkParticle:
+    particle = bnk_allocate_particle_impl(rt, op)
+    rt.register_particle(particle)
+    return particle
+
+
+@register_apply_impl(BranchingRuntime, ProjectiveMeasurement)
+def projective_measurement_impl(rt: BranchingRuntime, _: ProjectiveMeasurement, *args: QSystemStruct):
+    particles = tuple(iter_struct(args, atom_typ=BnkParticle))
+    results, weights = fork_branches(rt, particles)
+    if len(args) == 1:
+        args = args[0]
+        results = results[..., 0]
+    return MeasurementResult(args, results, weights)
+
+
+@register_apply_impl(BranchingRuntime, DesiredMeasurement)
+def desired_measurement_impl(rt: BranchingRuntime, op: DesiredMeasurement, *args: QSystemStruct):
+    particles = tuple(iter_struct(args, atom_typ=BnkParticle))
+    results, weights = fork_branches(rt, particles, tuple(iter_struct(op.value)))
+    if len(args) == 1:
+        args = args[0]
+        results = results[..., 0]
+    return MeasurementResult(args, results, weights)
+
+
+def fork_branches(
+    rt: BranchingRuntime,
+    particles: tuple[BnkParticle, ...],
+    desired: Optional[tuple[ArrayLike, ...]] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    # all states are joined, so that every tensor carrying the branch space is re-indexed together
+    all_particles = {particle.space: particle for particle in (*rt.particles, *particles)}
+    state = BnkState.prod(*(particle.state for particle in all_particles.values()))
+    if not isinstance(state.tensor, PureStateTensor):
+        raise NotImplementedError("BranchingRuntime supports only pure states!")
+
+    branch_space = rt.branch_space
+    measure_spaces = tuple(particle.space for particle in particles)
+    other_spaces = tuple(space for space in state.tensor.spaces
+                         if space not in measure_spaces and space is not branch_space)
+    if any(isinstance(space, NumSpace) for space in other_spaces):
+        raise NotImplementedError("BranchingRuntime does not support batched states!")
+
+    if branch_space is None:
+        values = np.expand_dims(state.tensor.values(*measure_spaces, *other_spaces), 0)
+    else:
+        values = state.tensor.values(branch_space, *measure_spaces, *other_spaces)
+    measure_shape = tuple(space.n for space in measure_spaces)
+    other_shape = tuple(space.n for space in other_spaces)
+    values = np.reshape(values, [len(rt.branch_weights), np.prod(measure_shape, dtype=int), -1])
+    # [branches_n, choices_n, reduced_n]
+
+    probs = np.sum(np.abs(values) ** 2, axis=-1)
+    weights = np.expand_dims(rt.branch_weights, -1) * probs
+    keep = weights > rt.threshold
+    if desired is not None:
+        keep &= np.arange(probs.shape[1]) == np.ravel_multi_index(desired, measure_shape)
+    branch_index, choice = np.nonzero(keep)
+    if len(branch_index) == 0:
+        raise ValueError("All branches are pruned!")
+    pruned_weight = np.sum(weights[~keep]) if desired is None else 0.0
+
+    chosen = values[branch_index, choice] / np.sqrt(np.expand_dims(probs[branch_index, choice], -1))
+    chosen_weights = weights[branch_index, choice]
+    chosen_results = np.stack(np.unravel_index(choice, measure_shape), -1)
+    chosen_records = []
+    for i, c in zip(branch_index, chosen_results):
+        result = tuple(int(x) for x in c)
+        result = result[0] if len(result) == 1 else result
+        factor = float(probs[i, np.ravel_multi_index(c, measure_shape)])
+        if desired is None:
+            chosen_records.append({(*record, result): w * factor for record, w in rt.branch_records[i].items()})
+        else:
+            chosen_records.append({record: w * factor for record, w in rt.branch_records[i].items()})
+
+    merged = merge_branches(chosen, choice, rt.atol)
+    new_n = len(merged)
+    new_values = np.zeros([new_n, *values.shape[1:]], dtype=np.result_type(values, np.complex64))
+    new_weights = np.zeros([new_n])
+    new_results = np.zeros([new_n, len(measure_spaces)], dtype=np.int32)
+    new_records = []
+    for k, group in enumerate(merged):
+        new_values[k, choice[group[0]]] = chosen[group[0]]
+        new_weights[k] = np.sum(chosen_weights[group])
+        new_results[k] = chosen_results[group[0]]
+        records = {}
+        for i in group:
+            for record, weight in chosen_records[i].items():
+                records[record] = records.get(record, 0.0) + weight
+        new_records.append(records)
+
+    new_branch_space = NumSpace(new_n, name="branch")
+    new_values = np.reshape(new_values, [new_n, *measure_shape, *other_shape])
+    state.tensor = PureStateTensor.of(new_values, (new_branch_space, *measure_spaces, *other_spaces),
+                                      backend=rt.backend)
+    rt.update_branches(new_branch_space, new_weights, tuple(new_records), float(pruned_weight))
+    return new_results, new_weights
+
+
+def merge_branches(states: np.ndarray, choice: np.ndarray, atol: float) -> list[list[int]]:
+    groups = {}
+    for i, (state, c) in enumerate(zip(states, choice)):
+        pivot = state[np.argmax(np.abs(state))]
+        state = state * np.conj(pivot) / np.abs(pivot)  # removes the global phase
+        state = np.concatenate([np.real(state), np.imag(state)])
+        key = (int(c), np.round(state / atol).astype(np.int64).tobytes())
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
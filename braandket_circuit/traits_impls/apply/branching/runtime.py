@@ -0,0 +1,87 @@
+import importlib
+import weakref
+from typing import Optional
+
+import numpy as np
+
+from braandket import NumSpace, numpy_backend
+from ..braandket import BnkParticle, BnkRuntime
+
+Record = tuple
+
+
+class BranchingRuntime(BnkRuntime):
+    """ Runtime that forks into weighted branches at each measurement instead of sampling.
+
+    Each branch holds its pure state along a batch axis (the branch space) together with the weights
+    of the measurement records leading to it. Branches with weights below `threshold` are pruned,
+    and branches with identical states (up to `atol` and a global phase) are merged.
+    Measurements return arrays of results and weights over the branches after them.
+    """
+
+    def __init__(self, *, threshold: float = 1e-12, atol: float = 1e-8):
+        super().__init__(numpy_backend)
+        self._threshold = threshold
+        self._atol = atol
+        self._particles = weakref.WeakValueDictionary()
+
+        self._branch_space: Optional[NumSpace] = None
+        self._branch_weights = np.ones([1])
+        self._branch_records: tuple[dict[Record, float], ...] = ({(): 1.0},)
+        self._pruned_weight = 0.0
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def atol(self) -> float:
+        return self._atol
+
+    def register_particle(self, particle: BnkParticle):
+        self._particles[particle.space] = particle
+
+    @property
+    def particles(self) -> tuple[BnkParticle, ...]:
+        return tuple(self._particles.values())
+
+    # branches
+
+    @property
+    def branch_space(self) -> Optional[NumSpace]:
+        return self._branch_space
+
+    @property
+    def branch_weights(self) -> np.ndarray:
+        return self._branch_weights
+
+    @property
+    def branch_records(self) -> tuple[dict[Record, float], ...]:
+        return self._branch_records
+
+    @property
+    def pruned_weight(self) -> float:
+        return self._pruned_weight
+
+    def update_branches(self,
+        space: NumSpace,
+        weights: np.ndarray,
+        records: tuple[dict[Record, float], ...],
+        pruned_weight: float = 0.0,
+    ):
+        self._branch_space = space
+        self._branch_weights = weights
+        self._branch_records = records
+        self._pruned_weight += pruned_weight
+
+    @property
+    def distribution(self) -> dict[Record, float]:
+        """ The probabilities of all records of measurement results. """
+        distribution = {}
+        for records in self._branch_records:
+            for record, weight in records.items():
+                distribution[record] = distribution.get(record, 0.0) + weight
+        return distribution
+
+
+importlib.import_module(".impls", __package__)
@@ -0,0 +1 @@
+from .runtime import TrajectoryRuntime
@@ -0,0 +1,66 @@
+import numpy as np
+
+from braandket import PureStateTensor
+from braandket_circuit.basics import QSystemStruct
+from braandket_circuit.operations import KrausChannel, MeasurementResult, PauliChannel, ProjectiveMeasurement
+from braandket_circuit.traits import register_apply_impl
+from braandket_circuit.utils import iter_struct
+from .runtime import TrajectoryRuntime
+from ..braandket import BnkParticle, BnkState
+from ..braandket.impls import measure_tensor, sample_choices, sample_measurement
+
+
+@register_apply_impl(TrajectoryRuntime, KrausChannel)
+def kraus_channel_impl(rt: TrajectoryRuntime, op: KrausChannel, *qubits: QSystemStruct):
+    particles = tuple(iter_struct(qubits, atom_typ=BnkParticle))
+    if len(particles) != op.n:
+        raise TypeError(f"{op} expected {op.n} qubits, got {len(particles)}")
+    state = BnkState.prod(*(particle.state for particle in particles))
+    shot_space, tensor = rt.shot_space, with_shots(rt, state.tensor)
+
+    target_spaces = tuple(particle.space for particle in particles)
+    other_spaces = tuple(space for space in tensor.spaces if space not in target_spaces and space is not shot_space)
+    values = np.reshape(tensor.values(shot_space, *target_spaces, *other_spaces), [rt.shots, 2 ** op.n, -1])
+    values = np.asarray(values, dtype=np.result_type(values, np.complex64))
+    kraus = np.asarray([np.asarray(k) for k in op.kraus])
+
+    if isinstance(op, PauliChannel):
+        # the choices do not depend on the state, so each shot is only applied with the chosen Pauli string
+        probs = np.asarray(list(op.probabilities.values()))
+        choice = sample_choices(rt.rng, np.broadcast_to(probs, [rt.shots, len(probs)]))
+        for i, p in enumerate(probs):
+            chosen = choice == i
+            if np.any(chosen):
+                values[chosen] = np.einsum("ab,sbo->sao", kraus[i] / np.sqrt(p), values[chosen])
+    else:
+        branches = np.einsum("kab,sbo->ksao", kraus, values)
+        probs = np.sum(np.abs(branches) ** 2, axis=(-2, -1)).T
+        # [shots, kraus_n]
+        choice = sample_choices(rt.rng, probs)
+        shots = np.arange(rt.shots)
+        values = branches[choice, shots] / np.sqrt(probs[shots, choice])[:, None, None]
+
+    values = np.reshape(values, [rt.shots, *(space.n for space in (*target_spaces, *other_spaces))])
+    state.tensor = PureStateTensor.of(values, (shot_space, *target_spaces, *other_spaces), backend=rt.backend)
+
+
+@register_apply_impl(TrajectoryRuntime, ProjectiveMeasurement)
+def projective_measurement_impl(rt: TrajectoryRuntime, _: ProjectiveMeasurement, *args: QSystemStruct):
+    particles = tuple(iter_struct(args, atom_typ=BnkParticle))
+    state = BnkState.prod(*(particle.state for particle in particles))
+    tensor = with_shots(rt, state.tensor)
+    spaces = tuple(particle.space for particle in particles)
+    results = sample_measurement(rt, tensor, spaces)
+    _, prob, state.tensor = measure_tensor(tensor, spaces, results)
+    results = np.stack(results, -1)
+    if len(args) == 1:
+        args = args[0]
+        results = results[..., 0]
+    return MeasurementResult(args, results, prob)
+
+
+def with_shots(rt: TrajectoryRuntime, tensor: PureStateTensor) -> PureStateTensor:
+    """ Adds the shot space to the tensor if absent, repeating the state for each shot. """
+    if rt.shot_space in tensor.spaces:
+        return tensor
+    return tensor @ PureStateTensor.of(np.ones([rt.shots]), [rt.shot_space], backend=rt.backend)
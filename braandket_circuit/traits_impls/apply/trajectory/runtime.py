@@ -0,0 +1,53 @@
+import importlib
+
+import numpy as np
+
+from braandket import NumSpace, PureStateTensor, StateTensor, numpy_backend
+from ..braandket import BnkParticle, BnkRuntime, BnkState
+
+
+class TrajectoryRuntime(BnkRuntime):
+    """ Runtime simulating noise by sampling one Kraus operator of each channel per shot, on pure states.
+
+    All the shots are simulated at once along a batch axis (the shot space), which is added to a state
+    the first time it is sampled. Measurements return arrays of results over the shots.
+    """
+
+    def __init__(self, shots: int, *, seed: int | np.random.SeedSequence | np.random.Generator | None = None):
+        super().__init__(numpy_backend, seed=seed)
+        if shots < 1:
+            raise ValueError(f"expected at least 1 shot, got {shots}")
+        self._shot_space = NumSpace(shots, name="shot")
+
+    @property
+    def shots(self) -> int:
+        return self._shot_space.n
+
+    @property
+    def shot_space(self) -> NumSpace:
+        return self._shot_space
+
+    def _adapted(self, tensor: StateTensor) -> StateTensor:
+        if not isinstance(tensor, PureStateTensor):
+            raise NotImplementedError("TrajectoryRuntime supports only pure states!")
+        return super()._adapted(tensor)
+
+    def probabilities(self, *particles: BnkParticle) -> tuple[np.ndarray, np.ndarray]:
+        """ Probabilities of the results of measuring the particles, estimated by averaging over the shots,
+        and their standard errors. """
+        tensor = BnkState.prod(*(particle.state for particle in particles)).tensor
+        spaces = tuple(particle.space for particle in particles)
+        other_spaces = tuple(space for space in tensor.spaces if space not in spaces and space is not self.shot_space)
+        shape = tuple(space.n for space in spaces)
+        if self.shot_space not in tensor.spaces:
+            values = tensor.values(*spaces, *other_spaces)
+            probs = np.sum(np.reshape(np.abs(values) ** 2, [*shape, -1]), axis=-1)
+            return probs, np.zeros(shape)  # no shot has been sampled, so the probabilities are exact
+
+        values = tensor.values(self.shot_space, *spaces, *other_spaces)
+        probs = np.sum(np.reshape(np.abs(values) ** 2, [self.shots, *shape, -1]), axis=-1)
+        # [shots, *shape], the exact probabilities in each trajectory
+        return np.mean(probs, axis=0), np.std(probs, axis=0, ddof=1) / np.sqrt(self.shots)
+
+
+importlib.import_module(".impls", __package__)
@@ -2,6 +2,9 @@ import importlib
 
 from .flatten import FlattenPass
 from .freeze import FreezePass
+from .layout import LayoutPass
+from .light_cone import LightConePass
+from .schedule import SchedulePass
 
 importlib.import_module(".impls", __package__)
 del importlib
@@ -1,48 +1,92 @@
-from braandket_circuit.basics import QOperation
-from braandket_circuit.operations import Controlled, Remapped, Sequential
+from braandket_circuit.basics import QOperation, QSystemStruct
+from braandket_circuit.basics.operation import IndexStruct
+from braandket_circuit.operations import CompactCircuit, Controlled, Remapped, Repeat, Sequential, \
+    StreamingSequential
 from braandket_circuit.traits import compile, register_compile_impl
 from braandket_circuit.traits_impls.compile.freeze import FreezePass
-from braandket_circuit.utils import iter_struct
+from braandket_circuit.utils import map_struct
 from .flatten_pass import FlattenPass
 
 
 @register_compile_impl(FlattenPass, None)
-def common_impl(ps: FlattenPass, op: QOperation):
-    op = compile(FreezePass(ps.args), op)
-    return compile(ps, op)
+@register_compile_impl(FlattenPass, Sequential)
+@register_compile_impl(FlattenPass, CompactCircuit)
+@register_compile_impl(FlattenPass, Remapped)
+@register_compile_impl(FlattenPass, Controlled)
+@register_compile_impl(FlattenPass, Repeat)
+def common_impl(ps: FlattenPass, op: QOperation) -> QOperation:
+    steps, is_sequential = flatten(op, ps.args)
+    if is_sequential:
+        return Sequential(steps, name=op.name)
+    if len(steps) == 1:
+        return steps[0]
+    return Sequential(steps, name=op.name)
 
 
-@register_compile_impl(FlattenPass, Sequential)
-def sequential_impl(ps: FlattenPass, op: Sequential):
-    flattened_steps = []
-    for step in op:
-        flattened_step = compile(ps, step)
-        if isinstance(flattened_step, Sequential):
-            flattened_steps.extend(flattened_step)
+@register_compile_impl(FlattenPass, StreamingSequential)
+def streaming_impl(ps: FlattenPass, op: StreamingSequential) -> StreamingSequential:
+    return StreamingSequential(lambda: (step for op_step in op for step in flatten(op_step)[0]), name=op.name)
+
+
+def flatten(op: QOperation, args: tuple[QSystemStruct, ...] | None = None) -> tuple[list[QOperation], bool]:
+    """ Flattens op into a list of steps with an explicit stack, so that the nesting depth is not limited by recursion.
+
+    Returns the steps and whether op had to be expanded into a sequence.
+    """
+    steps = []
+    is_sequential = False
+
+    # each item is (operation, indices of its args composed down to the root, args to freeze it with)
+    stack: list[tuple[QOperation, tuple[IndexStruct, ...] | None, tuple[QSystemStruct, ...] | None]]
+    stack = [(op, None, args)]
+    while stack:
+        op, indices, args = stack.pop()
+        if isinstance(op, Sequential):
+            is_sequential = True
+            stack.extend((step, indices, None) for step in reversed(op))
+        elif isinstance(op, (CompactCircuit, StreamingSequential)):
+            is_sequential = True
+            stack.extend((step, indices, None) for step in reversed(tuple(op)))
+        elif isinstance(op, Remapped):
+            stack.append((op.op, compose_indices(indices, op.indices), None))
+        elif isinstance(op, Repeat):
+            # the body is flattened only once
+            op_steps, _ = flatten(op.op)
+            op_steps = [remap_step(step, indices) for step in op_steps]
+            is_sequential = True
+            steps.extend(op_steps * op.n)
+        elif isinstance(op, Controlled):
+            op_steps, op_is_sequential = flatten(op.op)
+            if op_is_sequential:
+                is_sequential = True
+                steps.extend(remap(Controlled(step), indices) for step in op_steps)
+            else:
+                steps.append(remap(op, indices))
         else:
-            flattened_steps.append(flattened_step)
-    return Sequential(flattened_steps, name=op.name)
+            frozen_op = compile(FreezePass(args), op)
+            if frozen_op is op:
+                steps.append(remap(op, indices))
+            else:
+                stack.append((frozen_op, indices, None))
+    return steps, is_sequential
 
 
-@register_compile_impl(FlattenPass, Remapped)
-def remapped_impl(ps: FlattenPass, op: Remapped):
-    flattened_op_op = compile(ps, op.op)
-    if isinstance(flattened_op_op, Sequential):
-        return Sequential([compile(ps, Remapped(step, op.indices)) for step in flattened_op_op], name=op.name)
-    elif isinstance(flattened_op_op, Remapped):
-        op_indices = tuple(iter_struct(op.indices))
-        op_op_indices = iter_struct(flattened_op_op.indices)
-        merged_indices = tuple(op_indices[i] for i in op_op_indices)
-        merged_op = Remapped(flattened_op_op.op, *merged_indices, name=op.name)
-        return compile(ps, merged_op)
-    else:
-        return op
+def compose_indices(
+    outer: tuple[IndexStruct, ...] | None,
+    inner: tuple[IndexStruct, ...],
+) -> tuple[IndexStruct, ...]:
+    if outer is None:
+        return inner
+    if all(isinstance(i, int) for i in inner):
+        return tuple(outer[i] for i in inner)
+    return map_struct(lambda i: outer[i], inner, atom_typ=int)
 
 
-@register_compile_impl(FlattenPass, Controlled)
-def controlled_impl(ps: FlattenPass, op: Controlled):
-    flattened_op_op = compile(ps, op.op)
-    if isinstance(flattened_op_op, Sequential):
-        return Sequential([Controlled(step) for step in flattened_op_op], name=op.name)
-    else:
-        return op
+def remap(op: QOperation, indices: tuple[IndexStruct, ...] | None) -> QOperation:
+    return op if indices is None else Remapped(op, *indices)
+
+
+def remap_step(step: QOperation, indices: tuple[IndexStruct, ...] | None) -> QOperation:
+    if isinstance(step, Remapped):
+        return remap(step.op, compose_indices(indices, step.indices))
+    return remap(step, indices)
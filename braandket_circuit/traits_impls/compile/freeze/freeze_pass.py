@@ -1,7 +1,43 @@
-from braandket_circuit.basics import QSystemStruct
+import weakref
+from typing import Hashable
+
+from braandket_circuit.basics import QOperation, QSystemStruct
 from braandket_circuit.traits import CompilePass
 
 
 class FreezePass(CompilePass):
     def __init__(self, args: tuple[QSystemStruct, ...] | None = None):
         self.args = args
+
+    # cache
+
+    @staticmethod
+    def lookup(op: QOperation, key: Hashable) -> QOperation | None:
+        try:
+            frozen = _frozen_cache[op][key]
+        except (KeyError, TypeError):
+            return None
+        return op if frozen is None else frozen
+
+    @staticmethod
+    def memoize(op: QOperation, key: Hashable, frozen: QOperation):
+        try:
+            entries = _frozen_cache.setdefault(op, {})
+        except TypeError:  # not hashable
+            return
+        # the operation itself is stored as None, so that the entry does not keep its key alive
+        entries[key] = None if frozen is op else frozen
+
+    @staticmethod
+    def invalidate(op: QOperation | None = None):
+        """ Drops the memoized results of op, or of all operations if op is None.
+
+        Needed only when a custom operation changes what its __call__ does after it has been frozen.
+        """
+        if op is None:
+            _frozen_cache.clear()
+        else:
+            _frozen_cache.pop(op, None)
+
+
+_frozen_cache: weakref.WeakKeyDictionary[QOperation, dict[Hashable, QOperation | None]] = weakref.WeakKeyDictionary()
@@ -1,25 +1,69 @@
+import functools
 import inspect
+from typing import Callable, Hashable
 
-from braandket_circuit.basics import QOperation, QSystemStruct
-from braandket_circuit.operations import Remapped, Sequential
+from braandket_circuit.basics import QOperation, QParticle, QSystemStruct
+from braandket_circuit.basics.operation import IndexStruct
+from braandket_circuit.operations import Checkpoint, CompactCircuit, InverseQuantumFourierTransform, Layout, \
+    PauliEvolution, QuantumFourierTransform, Remapped, Repeat, Sequential, StreamingSequential
 from braandket_circuit.traits import compile, match_apply_impls, register_compile_impl
 from .freeze_pass import FreezePass
 
 
 def args_from_signature(op: QOperation) -> QSystemStruct:
     # noinspection PyProtectedMember
-    org_call = op._custom_call
+    arg_names = arg_names_from_signature(op._custom_call)
 
-    spec = inspect.getfullargspec(org_call)
+    from braandket_circuit.traits_impls import SymbolicParticle
+    return tuple(SymbolicParticle(2, name=arg_name) for arg_name in arg_names)
+
+
+@functools.cache
+def arg_names_from_signature(func: Callable) -> tuple[str, ...]:
+    spec = inspect.getfullargspec(func)
     if spec.varargs is not None:
         raise TypeError("varargs is not supported in compiling!")
     if spec.varkw is not None:
         raise TypeError("varkw is not supported in compiling!")
     if spec.kwonlyargs:
         raise TypeError("kwonlyargs is not supported in compiling!")
+    return tuple(spec.args[1:])
+
 
+def args_of_qubits(n: int) -> tuple[QSystemStruct, ...]:
     from braandket_circuit.traits_impls import SymbolicParticle
-    return tuple(SymbolicParticle(2, name=arg_name) for arg_name in spec.args[1:])
+    return tuple(SymbolicParticle(2, name=f"q{i}") for i in range(n))
+
+
+def args_key(args: tuple[QSystemStruct, ...]) -> Hashable | None:
+    # the frozen operation depends only on the structure and dimensions of the args and on which particles coincide
+    first_index = {}
+
+    def particle_key(arg: QSystemStruct) -> Hashable:
+        if isinstance(arg, QParticle):
+            return first_index.setdefault(id(arg), len(first_index)), arg.ndim
+        return tuple(particle_key(item) for item in arg)
+
+    try:
+        return tuple(particle_key(arg) for arg in args)
+    except TypeError:  # not iterable
+        return None
+
+
+def args_indexer(args: tuple[QSystemStruct, ...]) -> Callable[[QSystemStruct], IndexStruct]:
+    index = {}
+    for i, arg in enumerate(args):
+        index.setdefault(id(arg), i)
+
+    def indexer(arg: QSystemStruct) -> IndexStruct:
+        i = index.get(id(arg))
+        if i is not None:
+            return i
+        if isinstance(arg, QParticle):
+            raise ValueError(f"{arg!r} is not one of the arguments.")
+        return tuple(indexer(item) for item in arg)
+
+    return indexer
 
 
 @register_compile_impl(FreezePass, None)
@@ -28,6 +72,18 @@ def common_impl(ps: FreezePass, op: QOperation) -> QOperation:
     if args is None:
         args = args_from_signature(op)
 
+    key = args_key(args)
+    if key is None:  # not a struct of particles
+        return freeze(op, args)
+
+    frozen = FreezePass.lookup(op, key)
+    if frozen is None:
+        frozen = freeze(op, args)
+        FreezePass.memoize(op, key, frozen)
+    return frozen
+
+
+def freeze(op: QOperation, args: tuple[QSystemStruct, ...]) -> QOperation:
     impls = match_apply_impls(None, op)
     if len(impls) == 0:
         return op
@@ -48,10 +104,15 @@ def common_impl(ps: FreezePass, op: QOperation) -> QOperation:
     if len(calls) == 1 and calls[0].op is op and calls[0].args == args:
         return op
 
+    indexer = args_indexer(args)
     steps = []
     for call in calls:
+        try:
+            args_index = [indexer(arg) for arg in call.args]
+        except ValueError:
+            # e.g. a particle picked out of a nested argument, which can not be expressed by indices
+            return op
         call_op = compile(FreezePass(call.args), call.op)
-        args_index = [args.index(arg) for arg in call.args]
         steps.append(call_op.on(*args_index))
     return Sequential(steps, name=op.name)
 
@@ -61,6 +122,35 @@ def sequential_impl(ps: FreezePass, op: Sequential, *args: QSystemStruct) -> Seq
     return op
 
 
+@register_compile_impl(FreezePass, CompactCircuit)
+def compact_impl(ps: FreezePass, op: CompactCircuit, *args: QSystemStruct) -> CompactCircuit:
+    return op
+
+
+@register_compile_impl(FreezePass, Repeat)
+def repeat_impl(ps: FreezePass, op: Repeat, *args: QSystemStruct) -> Repeat:
+    return op
+
+
+@register_compile_impl(FreezePass, StreamingSequential)
+def streaming_impl(ps: FreezePass, op: StreamingSequential, *args: QSystemStruct) -> StreamingSequential:
+    return op
+
+
 @register_compile_impl(FreezePass, Remapped)
 def remapped_impl(ps: FreezePass, op: Remapped, *args: QSystemStruct) -> Remapped:
     return op
+
+
+@register_compile_impl(FreezePass, Checkpoint)
+@register_compile_impl(FreezePass, Layout)
+def checkpoint_impl(ps: FreezePass, op: Checkpoint | Layout, *args: QSystemStruct) -> Checkpoint | Layout:
+    return op
+
+
+@register_compile_impl(FreezePass, QuantumFourierTransform)
+@register_compile_impl(FreezePass, InverseQuantumFourierTransform)
+@register_compile_impl(FreezePass, PauliEvolution)
+def qubits_op_impl(ps: FreezePass, op: QuantumFourierTransform | InverseQuantumFourierTransform | PauliEvolution):
+    args = ps.args if ps.args is not None else args_of_qubits(op.n)
+    return common_impl(FreezePass(args), op)
@@ -1,4 +1,4 @@
-from braandket_circuit.operations import Controlled, Remapped, Sequential
+from braandket_circuit.operations import CompactCircuit, Controlled, Remapped, Repeat, Sequential, StreamingSequential
 from braandket_circuit.traits import CompilePass, compile, register_compile_impl
 
 
@@ -12,6 +12,22 @@ def sequential_compile_impl(ps: CompilePass, op: Sequential):
     return Sequential([compile(ps, step) for step in op], name=op.name)
 
 
+@register_compile_impl(None, CompactCircuit)
+def compact_compile_impl(ps: CompilePass, op: CompactCircuit):
+    compiled = compile(ps, op.to_sequential())
+    return CompactCircuit.from_sequential(compiled) if isinstance(compiled, Sequential) else compiled
+
+
+@register_compile_impl(None, StreamingSequential)
+def streaming_compile_impl(ps: CompilePass, op: StreamingSequential):
+    return StreamingSequential(lambda: (compile(ps, step) for step in op), name=op.name)
+
+
+@register_compile_impl(None, Repeat)
+def repeat_compile_impl(ps: CompilePass, op: Repeat):
+    return Repeat(compile(ps, op.op), op.n, name=op.name)
+
+
 @register_compile_impl(None, Controlled)
 def controlled_compile_impl(ps: CompilePass, op: Controlled):
     return Controlled(compile(ps, op.op), name=op.name)
@@ -0,0 +1,6 @@
+import importlib
+
+from .layout_pass import LayoutPass
+
+importlib.import_module(".impls", __package__)
+del importlib
@@ -0,0 +1,54 @@
+import itertools
+from collections import defaultdict, deque
+
+from braandket_circuit.basics import QOperation
+from braandket_circuit.operations import Layout, Remapped, Sequential
+from braandket_circuit.traits import compile, register_compile_impl
+from braandket_circuit.traits_impls.compile.flatten import FlattenPass
+from braandket_circuit.utils import iter_struct
+from .layout_pass import LayoutPass
+
+
+@register_compile_impl(LayoutPass, None)
+def common_impl(_: LayoutPass, op: QOperation) -> Sequential:
+    steps, order = layout_steps(op)
+    return Sequential([Remapped(Layout(), *order), *steps], name=op.name)
+
+
+def layout_steps(op: QOperation) -> tuple[list[QOperation], tuple[int, ...]]:
+    """ Returns the flattened steps and the qubits they act on, in the order of the layout.
+
+    Starting with the qubit acted on together with others most, the qubit acted on together with either end of the
+    placed ones most is placed next to that end, with ties broken by the weights with all the placed qubits.
+    """
+    flattened = compile(FlattenPass(), op)
+    steps = list(flattened) if isinstance(flattened, Sequential) else [flattened]
+
+    weights: dict[int, dict[int, int]] = {}
+    for step in steps:
+        if not isinstance(step, Remapped):
+            continue  # a step acting on all the args does not favor any qubits
+        qubits = sorted(set(iter_struct(step.indices, atom_typ=int)))
+        for qubit in qubits:
+            weights.setdefault(qubit, {})
+        for qubit0, qubit1 in itertools.combinations(qubits, 2):
+            weights[qubit0][qubit1] = weights[qubit0].get(qubit1, 0) + 1
+            weights[qubit1][qubit0] = weights[qubit1].get(qubit0, 0) + 1
+
+    totals = {qubit: sum(neighbours.values()) for qubit, neighbours in weights.items()}
+    placed_weights = defaultdict(int)
+    unplaced = set(weights)
+    order = deque()
+    while unplaced:
+        head = weights[order[0]] if order else {}
+        tail = weights[order[-1]] if order else {}
+        qubit = max(unplaced, key=lambda q: (
+            max(head.get(q, 0), tail.get(q, 0)), placed_weights[q], totals[q], -q))
+        unplaced.remove(qubit)
+        if head.get(qubit, 0) > tail.get(qubit, 0):
+            order.appendleft(qubit)
+        else:
+            order.append(qubit)
+        for neighbour, weight in weights[qubit].items():
+            placed_weights[neighbour] += weight
+    return steps, tuple(order)
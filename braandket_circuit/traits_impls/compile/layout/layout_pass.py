@@ -0,0 +1,17 @@
+from braandket_circuit.basics import QOperation
+from braandket_circuit.traits import CompilePass
+
+
+class LayoutPass(CompilePass):
+    """ Prepends a Layout to the flattened circuit, ordering the qubits so that the ones acted on together most
+    frequently are adjacent.
+
+    Runtimes keeping a stable layout (like BnkRuntime with stable_layout) then keep these qubits at adjacent axes
+    of the state tensors, so that the gates on them contract neighbouring axes.
+    """
+
+    def layout(self, op: QOperation) -> tuple[int, ...]:
+        """ Indices of the qubits in the order of the layout. """
+        from .impls import layout_steps
+        _, order = layout_steps(op)
+        return order
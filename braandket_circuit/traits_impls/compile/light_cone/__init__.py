@@ -0,0 +1,6 @@
+import importlib
+
+from .light_cone_pass import LightConePass
+
+importlib.import_module(".impls", __package__)
+del importlib
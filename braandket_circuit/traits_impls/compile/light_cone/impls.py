@@ -0,0 +1,39 @@
+from braandket_circuit.basics import QOperation
+from braandket_circuit.operations import Remapped, Sequential
+from braandket_circuit.traits import compile, register_compile_impl
+from braandket_circuit.traits_impls.compile.flatten import FlattenPass
+from braandket_circuit.utils import iter_struct, map_struct
+from .light_cone_pass import LightConePass
+
+
+@register_compile_impl(LightConePass, None)
+def common_impl(ps: LightConePass, op: QOperation) -> Sequential:
+    steps, cone = light_cone_steps(ps, op)
+    if ps.drop_unused:
+        if not all(isinstance(step, Remapped) for step in steps):
+            raise ValueError("Can not drop qubits of a circuit with steps acting on all of its args.")
+        qubits = {qubit: i for i, qubit in enumerate(sorted(cone))}
+        steps = [Remapped(step.op, *map_struct(qubits.get, step.indices, atom_typ=int)) for step in steps]
+    return Sequential(steps, name=op.name)
+
+
+def light_cone_steps(ps: LightConePass, op: QOperation) -> tuple[list[QOperation], frozenset[int]]:
+    """ Returns the flattened steps in the light cone of the outputs and the qubits they act on. """
+    flattened = compile(FlattenPass(), op)
+    flattened = flattened if isinstance(flattened, Sequential) else (flattened,)
+
+    live = set(ps.outputs)
+    all_live = False
+    steps = []
+    for step in reversed(flattened):
+        if not isinstance(step, Remapped):
+            # a step acting on all the args reaches every qubit
+            all_live = True
+            steps.append(step)
+            continue
+        qubits = set(iter_struct(step.indices, atom_typ=int))
+        if all_live or not live.isdisjoint(qubits):
+            live |= qubits
+            steps.append(step)
+    steps.reverse()
+    return steps, frozenset(live)
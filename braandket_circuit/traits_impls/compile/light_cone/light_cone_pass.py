@@ -0,0 +1,22 @@
+from typing import Iterable
+
+from braandket_circuit.basics import QOperation
+from braandket_circuit.traits import CompilePass
+
+
+class LightConePass(CompilePass):
+    """ Removes the gates outside the backward light cone of the output qubits.
+
+    With drop_unused, the qubits outside the cone are dropped as well,
+    so that the i-th arg of the compiled circuit is the i-th qubit in the cone (see light_cone()).
+    """
+
+    def __init__(self, outputs: Iterable[int], *, drop_unused: bool = False):
+        self.outputs = frozenset(outputs)
+        self.drop_unused = drop_unused
+
+    def light_cone(self, op: QOperation) -> tuple[int, ...]:
+        """ Qubits in the light cone, in the order of the args of the circuit compiled with drop_unused. """
+        from .impls import light_cone_steps
+        _, cone = light_cone_steps(self, op)
+        return tuple(sorted(cone))
@@ -0,0 +1,6 @@
+import importlib
+
+from .schedule_pass import SchedulePass
+
+importlib.import_module(".impls", __package__)
+del importlib
@@ -0,0 +1,60 @@
+from braandket_circuit.basics import QOperation
+from braandket_circuit.operations import Controlled, GlobalPhaseGate, HalfPiPhaseGate, Identity, \
+    InverseHalfPiPhaseGate, InverseQuarterPiPhaseGate, Moment, PauliZGate, QuarterPiPhaseGate, Remapped, \
+    RotationZGate, Sequential
+from braandket_circuit.traits import compile, register_compile_impl
+from braandket_circuit.traits_impls.compile.flatten import FlattenPass
+from braandket_circuit.utils import iter_struct
+from .schedule_pass import SchedulePass
+
+diagonal_types = (
+    PauliZGate, HalfPiPhaseGate, QuarterPiPhaseGate, InverseHalfPiPhaseGate, InverseQuarterPiPhaseGate,
+    RotationZGate, GlobalPhaseGate, Identity)
+
+
+@register_compile_impl(SchedulePass, None)
+def common_impl(ps: SchedulePass, op: QOperation) -> Sequential[Moment]:
+    flattened = compile(FlattenPass(), op)
+    flattened = flattened if isinstance(flattened, Sequential) else (flattened,)
+
+    moments: list[list[QOperation]] = []
+    moments_qubits: list[set[int]] = []
+    last_moment: dict[int, int] = {}  # the last moment of each qubit
+    last_blocking_moment: dict[int, int] = {}  # the last moment of each qubit with a gate that does not commute
+    barrier = -1  # the last moment of a step acting on all the args
+
+    for step in flattened:
+        if not isinstance(step, Remapped):
+            moment = len(moments)
+            moments.append([step])
+            moments_qubits.append(set())
+            barrier = moment
+            continue
+
+        qubits = set(iter_struct(step.indices, atom_typ=int))
+        if ps.reorder_diagonal and is_diagonal(step.op):
+            moment = max((last_blocking_moment.get(qubit, -1) for qubit in qubits), default=-1) + 1
+            moment = max(moment, barrier + 1)
+            while moment < len(moments) and not moments_qubits[moment].isdisjoint(qubits):
+                moment += 1
+        else:
+            moment = max((last_moment.get(qubit, -1) for qubit in qubits), default=-1) + 1
+            moment = max(moment, barrier + 1)
+            for qubit in qubits:
+                last_blocking_moment[qubit] = moment
+
+        if moment == len(moments):
+            moments.append([])
+            moments_qubits.append(set())
+        moments[moment].append(step)
+        moments_qubits[moment] |= qubits
+        for qubit in qubits:
+            last_moment[qubit] = max(last_moment.get(qubit, -1), moment)
+
+    return Sequential([Moment(steps) for steps in moments], name=op.name)
+
+
+def is_diagonal(op: QOperation) -> bool:
+    while isinstance(op, Controlled):
+        op = op.op
+    return isinstance(op, diagonal_types)
@@ -0,0 +1,12 @@
+from braandket_circuit.traits import CompilePass
+
+
+class SchedulePass(CompilePass):
+    """ Groups the steps of the flattened circuit into a Sequential of Moments, each as early as possible.
+
+    The depth of the circuit is the number of moments. With reorder_diagonal, gates diagonal in the computational
+    basis (like Z, Rz and CZ) commute with each other, so they may be moved before each other to fill earlier moments.
+    """
+
+    def __init__(self, *, reorder_diagonal: bool = False):
+        self.reorder_diagonal = reorder_diagonal
@@ -1,2 +1,4 @@
 from .invert import Invert
+from .structural_hash import StructuralHash
 from .to_matrix import ToMatrix
+from .to_sparse_matrix import ToSparseMatrix
@@ -1,10 +1,32 @@
-from typing import Iterable
+import functools
+from typing import Callable, Iterable
 
-from braandket_circuit.operations import Controlled, H, I, Phase, Remapped, Rx, Ry, Rz, Sequential, X, Y, Z
+import numpy as np
+
+from braandket_circuit.basics import QOperation
+from braandket_circuit.operations import Checkpoint, CompactCircuit, Controlled, H, I, InverseQFT, Layout, \
+    MatrixOperation, Moment, PauliEvolution, Phase, QFT, Remapped, Repeat, Rx, Ry, Rz, S, Sdg, Sequential, \
+    StreamingSequential, T, Tdg, X, Y, Z
 from braandket_circuit.traits import convert, register_convert_impl
 from .invert import Invert
 
 
+def memoized(impl: Callable[[Invert, QOperation], QOperation]) -> Callable[[Invert, QOperation], QOperation]:
+    """ Looks up the inverse of composed operations in the cache of Invert, which is independent of the args. """
+
+    @functools.wraps(impl)
+    def memoized_impl(cv: Invert, op: QOperation) -> QOperation:
+        if cv.args is not None:
+            return impl(cv, op)
+        inverted = Invert.lookup(op)
+        if inverted is None:
+            inverted = impl(cv, op)
+            Invert.memoize(op, inverted)
+        return inverted
+
+    return memoized_impl
+
+
 @register_convert_impl(Invert, I)
 def identity_impl(_: Invert, __: I) -> I:
     return I
@@ -25,7 +47,25 @@ def z_gate_impl(_: Invert, __: Z) -> Z:
     return Z
 
 
-# TODO S,T
+@register_convert_impl(Invert, S)
+def s_gate_impl(_: Invert, __: S) -> Sdg:
+    return Sdg
+
+
+@register_convert_impl(Invert, Sdg)
+def sdg_gate_impl(_: Invert, __: Sdg) -> S:
+    return S
+
+
+@register_convert_impl(Invert, T)
+def t_gate_impl(_: Invert, __: T) -> Tdg:
+    return Tdg
+
+
+@register_convert_impl(Invert, Tdg)
+def tdg_gate_impl(_: Invert, __: Tdg) -> T:
+    return T
+
 
 @register_convert_impl(Invert, H)
 def h_gate_impl(_: Invert, __: H) -> H:
@@ -52,12 +92,80 @@ def rz_gate_impl(_: Invert, op: Rz) -> Rz:
     return Rz(theta=-op.theta)
 
 
+@register_convert_impl(Invert, QFT)
+def qft_impl(_: Invert, op: QFT) -> InverseQFT:
+    return InverseQFT(op.n)
+
+
+@register_convert_impl(Invert, InverseQFT)
+def inverse_qft_impl(_: Invert, op: InverseQFT) -> QFT:
+    return QFT(op.n)
+
+
+@register_convert_impl(Invert, Checkpoint)
+@register_convert_impl(Invert, Layout)
+def marker_impl(_: Invert, op: Checkpoint | Layout) -> Checkpoint | Layout:
+    return op
+
+
+@register_convert_impl(Invert, MatrixOperation)
+def matrix_impl(_: Invert, op: MatrixOperation) -> MatrixOperation:
+    return op.ct
+
+
+@register_convert_impl(Invert, PauliEvolution)
+def pauli_evolution_impl(_: Invert, op: PauliEvolution) -> PauliEvolution:
+    return PauliEvolution(reversed(op.observable), -op.time)
+
+
 @register_convert_impl(Invert, Sequential)
+@memoized
 def sequential_impl(cv: Invert, op: Sequential) -> Sequential:
     return Sequential(reversed([convert(cv, step) for step in op]))
 
 
+@register_convert_impl(Invert, Moment)
+@memoized
+def moment_impl(cv: Invert, op: Moment) -> Moment:
+    # the steps of a moment act on distinct qubits, so they stay in a moment
+    return Moment([convert(cv, step) for step in op], name=op.name)
+
+
+@register_convert_impl(Invert, CompactCircuit)
+@memoized
+def compact_impl(cv: Invert, op: CompactCircuit) -> CompactCircuit:
+    if cv.args is not None:
+        return CompactCircuit.from_sequential(convert(cv, op.to_sequential()))
+
+    # the rows are reversed, the op table is inverted and the angles of the parametric rotations are negated
+    ops = tuple(o if parametric else convert(cv, o) for o, parametric in zip(op.ops, op.parametric))
+    opcodes = op.opcodes[::-1]
+    params = op.params[::-1]
+    params = np.where(op.parametric[opcodes], -params, params)
+
+    lengths = np.diff(op.offsets)[::-1]
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    starts = op.offsets[:-1][::-1]
+    indices = op.indices[np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])]
+    return CompactCircuit(ops, op.parametric, opcodes, params, op.remapped[::-1], offsets, indices)
+
+
+@register_convert_impl(Invert, StreamingSequential)
+@memoized
+def streaming_impl(cv: Invert, op: StreamingSequential) -> StreamingSequential | Sequential:
+    if not op.reversible:
+        return Sequential(reversed([convert(cv, step) for step in op]))
+    return StreamingSequential(lambda: (convert(cv, step) for step in reversed(op)), name=op.name)
+
+
+@register_convert_impl(Invert, Repeat)
+@memoized
+def repeat_impl(cv: Invert, op: Repeat) -> Repeat:
+    return Repeat(convert(cv, op.op), op.n, name=op.name)
+
+
 @register_convert_impl(Invert, Controlled)
+@memoized
 def controlled_impl(cv: Invert, op: Controlled) -> Controlled:
     if cv.args is None:
         return Controlled(convert(cv, op.op))
@@ -68,6 +176,7 @@ def controlled_impl(cv: Invert, op: Controlled) -> Controlled:
 
 
 @register_convert_impl(Invert, Remapped)
+@memoized
 def remapped_impl(cv: Invert, op: Remapped) -> Remapped:
     if cv.args is None:
         return Remapped(convert(cv, op.op), *op.indices)
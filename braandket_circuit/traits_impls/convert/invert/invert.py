@@ -1,5 +1,6 @@
-from braandket_circuit import QOperation
+import weakref
 
+from braandket_circuit import QOperation
 from braandket_circuit.basics import QSystemStruct
 from braandket_circuit.traits import Conversion
 
@@ -7,3 +8,46 @@ from braandket_circuit.traits import Conversion
 class Invert(Conversion[QOperation]):
     def __init__(self, args: tuple[QSystemStruct, ...] | None = None):
         self.args = args
+
+    # cache
+
+    @staticmethod
+    def lookup(op: QOperation) -> QOperation | None:
+        try:
+            inverted = _inverted_cache.get(op)
+            if inverted is None:
+                inverted_of = _inverted_of.get(op)
+                inverted = inverted_of() if inverted_of is not None else None
+        except TypeError:  # not hashable
+            return None
+        return inverted
+
+    @staticmethod
+    def memoize(op: QOperation, inverted: QOperation):
+        try:
+            if inverted is op:
+                # referenced weakly too, as op referencing itself strongly would keep its entry alive forever
+                _inverted_of[op] = weakref.ref(op)
+                return
+            _inverted_cache[op] = inverted
+            # the inverse of the inverse is op, referenced weakly so that the entries do not keep op alive
+            _inverted_of.setdefault(inverted, weakref.ref(op))
+        except TypeError:  # not hashable
+            pass
+
+    @staticmethod
+    def invalidate(op: QOperation | None = None):
+        """ Drops the memoized inverse of op, or of all operations if op is None.
+
+        Needed only when a custom operation changes what its __call__ does after it has been inverted.
+        """
+        if op is None:
+            _inverted_cache.clear()
+            _inverted_of.clear()
+        else:
+            _inverted_cache.pop(op, None)
+            _inverted_of.pop(op, None)
+
+
+_inverted_cache: weakref.WeakKeyDictionary[QOperation, QOperation] = weakref.WeakKeyDictionary()
+_inverted_of: weakref.WeakKeyDictionary[QOperation, weakref.ref[QOperation]] = weakref.WeakKeyDictionary()
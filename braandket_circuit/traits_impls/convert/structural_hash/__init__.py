@@ -0,0 +1,6 @@
+import importlib
+
+from .structural_hash import StructuralHash
+
+importlib.import_module(".impls", __package__)
+del importlib
@@ -0,0 +1,121 @@
+import hashlib
+from typing import Any
+
+import numpy as np
+
+from braandket_circuit.basics import QOperation
+from braandket_circuit.operations import AllocateParticle, Checkpoint, CompactCircuit, Controlled, DesiredMeasurement, \
+    GlobalPhaseGate, HadamardGate, HalfPiPhaseGate, Identity, InverseHalfPiPhaseGate, InverseQuantumFourierTransform, \
+    InverseQuarterPiPhaseGate, Layout, MatrixOperation, PauliEvolution, PauliXGate, PauliYGate, PauliZGate, \
+    ProjectiveMeasurement, PureStatePreparation, QuantumFourierTransform, QuarterPiPhaseGate, Remapped, Repeat, \
+    RotationXGate, RotationYGate, RotationZGate, Sequential, StreamingSequential
+from braandket_circuit.traits import compile, convert, register_convert_impl
+from braandket_circuit.traits_impls.compile import FreezePass
+from .structural_hash import StructuralHash
+
+
+def digest(op: QOperation, *parts: Any) -> str:
+    hasher = hashlib.sha256()
+    hasher.update(f"{type(op).__module__}.{type(op).__qualname__}".encode())
+    for part in parts:
+        hasher.update(b"|")
+        if isinstance(part, str):
+            hasher.update(part.encode())
+        else:
+            array = np.asarray(part)
+            if array.dtype == object:
+                raise TypeError(f"Can not hash parameter {part!r} of operation {op}!")
+            hasher.update(f"{array.dtype}{array.shape}".encode())
+            hasher.update(array.tobytes())
+    return hasher.hexdigest()
+
+
+@register_convert_impl(StructuralHash, None)
+def common_impl(cv: StructuralHash, op: QOperation) -> str:
+    frozen = compile(FreezePass(), op)
+    if frozen is op:
+        raise NotImplementedError(f"No structural hash for operation {op}.")
+    return convert(cv, frozen)
+
+
+@register_convert_impl(StructuralHash, PauliXGate)
+@register_convert_impl(StructuralHash, PauliYGate)
+@register_convert_impl(StructuralHash, PauliZGate)
+@register_convert_impl(StructuralHash, HalfPiPhaseGate)
+@register_convert_impl(StructuralHash, QuarterPiPhaseGate)
+@register_convert_impl(StructuralHash, InverseHalfPiPhaseGate)
+@register_convert_impl(StructuralHash, InverseQuarterPiPhaseGate)
+@register_convert_impl(StructuralHash, HadamardGate)
+@register_convert_impl(StructuralHash, Identity)
+@register_convert_impl(StructuralHash, Checkpoint)
+@register_convert_impl(StructuralHash, Layout)
+@register_convert_impl(StructuralHash, ProjectiveMeasurement)
+def constant_impl(_: StructuralHash, op: QOperation) -> str:
+    return digest(op)
+
+
+@register_convert_impl(StructuralHash, RotationXGate)
+@register_convert_impl(StructuralHash, RotationYGate)
+@register_convert_impl(StructuralHash, RotationZGate)
+@register_convert_impl(StructuralHash, GlobalPhaseGate)
+def rotation_impl(_: StructuralHash, op: RotationXGate | RotationYGate | RotationZGate | GlobalPhaseGate) -> str:
+    return digest(op, op.theta)
+
+
+@register_convert_impl(StructuralHash, DesiredMeasurement)
+def desired_measurement_impl(_: StructuralHash, op: DesiredMeasurement) -> str:
+    return digest(op, op.value)
+
+
+@register_convert_impl(StructuralHash, AllocateParticle)
+def allocate_particle_impl(_: StructuralHash, op: AllocateParticle) -> str:
+    return digest(op, op.ndim)
+
+
+@register_convert_impl(StructuralHash, MatrixOperation)
+def matrix_impl(_: StructuralHash, op: MatrixOperation) -> str:
+    return digest(op, op.matrix)
+
+
+@register_convert_impl(StructuralHash, PureStatePreparation)
+def pure_state_preparation_impl(_: StructuralHash, op: PureStatePreparation) -> str:
+    return digest(op, op.state)
+
+
+@register_convert_impl(StructuralHash, QuantumFourierTransform)
+@register_convert_impl(StructuralHash, InverseQuantumFourierTransform)
+def fourier_transform_impl(_: StructuralHash, op: QuantumFourierTransform | InverseQuantumFourierTransform) -> str:
+    return digest(op, op.n)
+
+
+@register_convert_impl(StructuralHash, PauliEvolution)
+def pauli_evolution_impl(_: StructuralHash, op: PauliEvolution) -> str:
+    return digest(op, *(part for term in op.observable for part in term), op.time)
+
+
+@register_convert_impl(StructuralHash, Controlled)
+def controlled_impl(cv: StructuralHash, op: Controlled) -> str:
+    return digest(op, convert(cv, op.op))
+
+
+@register_convert_impl(StructuralHash, Remapped)
+def remapped_impl(cv: StructuralHash, op: Remapped) -> str:
+    return digest(op, repr(op.indices), convert(cv, op.op))
+
+
+@register_convert_impl(StructuralHash, Sequential)
+@register_convert_impl(StructuralHash, StreamingSequential)
+def sequential_impl(cv: StructuralHash, op: Sequential) -> str:
+    return digest(op, *(convert(cv, step) for step in op))
+
+
+@register_convert_impl(StructuralHash, Repeat)
+def repeat_impl(cv: StructuralHash, op: Repeat) -> str:
+    return digest(op, str(op.n), convert(cv, op.op))
+
+
+@register_convert_impl(StructuralHash, CompactCircuit)
+def compact_impl(cv: StructuralHash, op: CompactCircuit) -> str:
+    # the steps are hashed by the columns, with the angles of the parametric entries of the op table in params
+    ops = tuple(digest(o) if parametric else convert(cv, o) for o, parametric in zip(op.ops, op.parametric))
+    return digest(op, *ops, op.parametric, op.opcodes, op.params, op.remapped, op.offsets, op.indices)
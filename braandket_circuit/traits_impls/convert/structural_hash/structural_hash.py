@@ -0,0 +1,6 @@
+from braandket_circuit.traits import Conversion
+
+
+class StructuralHash(Conversion[str]):
+    """ Converts an operation into a hex digest, which is equal for operations of equal structures and parameters. """
+    pass
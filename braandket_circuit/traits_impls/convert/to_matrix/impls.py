@@ -1,26 +1,297 @@
-from braandket import ArrayLike
+import math
+from typing import Iterable
 
-from braandket_circuit.operations import MatrixOperation, Sequential
-from braandket_circuit.traits import convert, register_convert_impl
+import numpy as np
+
+from braandket import ArrayLike, PureStateTensor
+from braandket_circuit.basics import QOperation
+from braandket_circuit.basics.operation import IndexStruct
+from braandket_circuit.operations import Checkpoint, CompactCircuit, Controlled, GlobalPhaseGate, HadamardGate, \
+    HalfPiPhaseGate, Identity, InverseHalfPiPhaseGate, InverseQuantumFourierTransform, InverseQuarterPiPhaseGate, \
+    Layout, MatrixOperation, PauliEvolution, PauliXGate, PauliYGate, PauliZGate, QuantumFourierTransform, \
+    QuarterPiPhaseGate, Remapped, Repeat, RotationXGate, RotationYGate, RotationZGate, Sequential, StreamingSequential
+from braandket_circuit.traits import convert, match_convert_impls, register_convert_impl
+from braandket_circuit.utils import iter_struct, map_struct
 from .to_matrix import ToMatrix
 
 
+@register_convert_impl(ToMatrix, None)
+def simulated_matrix_impl(cv: ToMatrix, op: QOperation) -> ArrayLike:
+    """ Simulates the op on all the basis states in one pass, with the args maximally entangled with references.
+
+    The final state sum_b |b> U|b> / sqrt(size) then holds the columns of the matrix U.
+    Only custom operations are simulated, so that the errors of the other impls are not covered.
+    """
+    if not hasattr(op, '_custom_call') or match_convert_impls(cv, op) != (simulated_matrix_impl,):
+        raise NotImplementedError(f"Can not simulate {op}, which is not a custom operation.")
+    args = cv.args
+    if args is None:
+        from braandket_circuit.traits_impls.compile.freeze.impls import arg_names_from_signature
+        # noinspection PyProtectedMember
+        args = (2,) * len(arg_names_from_signature(op._custom_call))
+    dims = args_dims(args)
+    size = math.prod(dims)
+
+    from braandket_circuit.operations import PureStatePreparation, allocate_particle
+    from braandket_circuit.traits_impls.apply.braandket import BnkRuntime, BnkState
+    with BnkRuntime():
+        references = tuple(allocate_particle(dim) for dim in dims)
+        particles = tuple(allocate_particle(dim) for dim in dims)
+        PureStatePreparation(np.eye(size, dtype=complex) / np.sqrt(size))(*particles, *references)
+
+        particles_iter = iter(particles)
+        results = op(*map_struct(lambda _: next(particles_iter), args, atom_typ=int))
+        if not all(result is None for result in iter_struct(results)):
+            raise ValueError(f"{op} is not unitary, with results {results}.")
+
+        tensor = BnkState.prod(*(particle.state for particle in (*particles, *references))).tensor
+        if not isinstance(tensor, PureStateTensor) or len(tensor.ket_spaces) != 2 * len(dims):
+            raise ValueError(f"{op} is not unitary on its args.")
+        spaces = tuple(particle.space for particle in (*particles, *references))
+        values = tensor.values(*spaces)
+    return np.reshape(np.asarray(values), (size, size)) * np.sqrt(size)
+
+
+# gates
+
+@register_convert_impl(ToMatrix, PauliXGate)
+def x_gate_matrix_impl(cv: ToMatrix, _: PauliXGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    return np.asarray([[0, 1], [1, 0]], dtype=complex)
+
+
+@register_convert_impl(ToMatrix, PauliYGate)
+def y_gate_matrix_impl(cv: ToMatrix, _: PauliYGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    return np.asarray([[0, -1j], [+1j, 0]])
+
+
+@register_convert_impl(ToMatrix, PauliZGate)
+def z_gate_matrix_impl(cv: ToMatrix, _: PauliZGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    return np.asarray([[1, 0], [0, -1]], dtype=complex)
+
+
+@register_convert_impl(ToMatrix, HalfPiPhaseGate)
+def s_gate_matrix_impl(cv: ToMatrix, _: HalfPiPhaseGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    return np.asarray([[1, 0], [0, 1j]])
+
+
+@register_convert_impl(ToMatrix, QuarterPiPhaseGate)
+def t_gate_matrix_impl(cv: ToMatrix, _: QuarterPiPhaseGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    return np.asarray([[1, 0], [0, np.exp(1j * np.pi / 4)]])
+
+
+@register_convert_impl(ToMatrix, InverseHalfPiPhaseGate)
+def sdg_gate_matrix_impl(cv: ToMatrix, _: InverseHalfPiPhaseGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    return np.asarray([[1, 0], [0, -1j]])
+
+
+@register_convert_impl(ToMatrix, InverseQuarterPiPhaseGate)
+def tdg_gate_matrix_impl(cv: ToMatrix, _: InverseQuarterPiPhaseGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    return np.asarray([[1, 0], [0, np.exp(-1j * np.pi / 4)]])
+
+
+@register_convert_impl(ToMatrix, HadamardGate)
+def h_gate_matrix_impl(cv: ToMatrix, _: HadamardGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    return np.asarray([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
+
+
+@register_convert_impl(ToMatrix, GlobalPhaseGate)
+def phase_gate_matrix_impl(cv: ToMatrix, op: GlobalPhaseGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    return np.exp(1j * op.theta) * np.eye(2)
+
+
+@register_convert_impl(ToMatrix, RotationXGate)
+def rx_gate_matrix_impl(cv: ToMatrix, op: RotationXGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    cos, sin = np.cos(op.theta / 2), np.sin(op.theta / 2)
+    return np.asarray([[cos, -1j * sin], [-1j * sin, cos]], dtype=complex)
+
+
+@register_convert_impl(ToMatrix, RotationYGate)
+def ry_gate_matrix_impl(cv: ToMatrix, op: RotationYGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    cos, sin = np.cos(op.theta / 2), np.sin(op.theta / 2)
+    return np.asarray([[cos, -sin], [sin, cos]], dtype=complex)
+
+
+@register_convert_impl(ToMatrix, RotationZGate)
+def rz_gate_matrix_impl(cv: ToMatrix, op: RotationZGate) -> ArrayLike:
+    check_dims(cv, (2,))
+    phase = np.exp(0.5j * op.theta)
+    return np.asarray([[1 / phase, 0], [0, phase]], dtype=complex)
+
+
+@register_convert_impl(ToMatrix, QuantumFourierTransform)
+@register_convert_impl(ToMatrix, InverseQuantumFourierTransform)
+def fourier_matrix_impl(cv: ToMatrix, op: QuantumFourierTransform | InverseQuantumFourierTransform) -> ArrayLike:
+    check_dims(cv, (2,) * op.n)
+    size = 2 ** op.n
+    sign = -1 if isinstance(op, InverseQuantumFourierTransform) else 1
+    k = np.arange(size)
+    return np.exp(sign * 2j * np.pi * np.outer(k, k) / size) / np.sqrt(size)
+
+
+@register_convert_impl(ToMatrix, PauliEvolution)
+def pauli_evolution_matrix_impl(cv: ToMatrix, op: PauliEvolution) -> ArrayLike:
+    check_dims(cv, (2,) * op.n)
+    paulis = {
+        "I": np.eye(2), "X": np.asarray([[0, 1], [1, 0]]),
+        "Y": np.asarray([[0, -1j], [1j, 0]]), "Z": np.asarray([[1, 0], [0, -1]])}
+    matrix = np.eye(2 ** op.n, dtype=complex)
+    for pauli, coefficient in op.observable:
+        theta = np.multiply(coefficient, op.time)
+        pauli_matrix = _kron(paulis[p] for p in pauli)
+        # exp(-i theta P) = cos(theta) - i sin(theta) P, for P ** 2 = I
+        matrix = (np.cos(theta) * np.eye(2 ** op.n) - 1j * np.sin(theta) * pauli_matrix) @ matrix
+    return matrix
+
+
 @register_convert_impl(ToMatrix, MatrixOperation)
-def matrix_operation_matrix_impl(_: ToMatrix, op: MatrixOperation) -> ArrayLike:
-    # TODO check args match
+def matrix_operation_matrix_impl(cv: ToMatrix, op: MatrixOperation) -> ArrayLike:
+    if cv.args is not None and math.prod(args_dims(cv.args)) != op.N:
+        raise ValueError(f"The args of dimensions {cv.args} do not match the matrix of {op.N}x{op.N}.")
     return op.matrix
 
 
+@register_convert_impl(ToMatrix, Identity)
+@register_convert_impl(ToMatrix, Checkpoint)
+@register_convert_impl(ToMatrix, Layout)
+def identity_matrix_impl(cv: ToMatrix, _: Identity | Checkpoint | Layout) -> ArrayLike:
+    return 1 if cv.args is None else np.eye(math.prod(args_dims(cv.args)), dtype=complex)
+
+
+# composed
+
+@register_convert_impl(ToMatrix, Controlled)
+def controlled_matrix_impl(cv: ToMatrix, op: Controlled) -> ArrayLike:
+    control, target = cv.args if cv.args is not None else (2, None)
+    control_dims = args_dims(control)
+    target_args = None if target is None else (target,) if isinstance(target, int) else tuple(target)
+    target_matrix = convert(ToMatrix(target_args), op.op)
+    if isinstance(target_matrix, int) and target_matrix == 1:
+        if target_args is None:
+            return 1
+        target_matrix = np.eye(math.prod(args_dims(target_args)), dtype=complex)
+    target_size = np.shape(target_matrix)[0]
+
+    # the op is applied when all the control particles are at state 1
+    on = np.ravel_multi_index((1,) * len(control_dims), control_dims) if control_dims else 0
+    matrix = np.eye(math.prod(control_dims) * target_size, dtype=complex)
+    matrix[on * target_size:(on + 1) * target_size, on * target_size:(on + 1) * target_size] = target_matrix
+    return matrix
+
+
+@register_convert_impl(ToMatrix, Remapped)
+def remapped_matrix_impl(cv: ToMatrix, op: Remapped) -> ArrayLike:
+    args = cv.args if cv.args is not None else infer_args((op,))
+    return steps_matrix(args, (op,))
+
+
 @register_convert_impl(ToMatrix, Sequential)
-def sequential_matrix_impl(cv: ToMatrix, op: Sequential) -> ArrayLike:
-    sub_ops_matrix = (convert(cv, sub_op) for sub_op in op)
+@register_convert_impl(ToMatrix, StreamingSequential)
+def sequential_matrix_impl(cv: ToMatrix, op: Sequential | StreamingSequential) -> ArrayLike:
+    args = cv.args if cv.args is not None else infer_args(op)
+    if args is None:
+        # none of the steps are remapped, so they are on the same args
+        matrix = 1
+        for step in op:
+            step_matrix = convert(cv, step)
+            if not (isinstance(step_matrix, int) and step_matrix == 1):
+                matrix = step_matrix if isinstance(matrix, int) else step_matrix @ matrix
+        return matrix
+    return steps_matrix(args, op)
+
 
+@register_convert_impl(ToMatrix, CompactCircuit)
+def compact_matrix_impl(cv: ToMatrix, op: CompactCircuit) -> ArrayLike:
+    return convert(cv, op.to_sequential())
+
+
+@register_convert_impl(ToMatrix, Repeat)
+def repeat_matrix_impl(cv: ToMatrix, op: Repeat) -> ArrayLike:
+    # exponentiation by squaring
     matrix = 1
-    for sub_op_matrix in sub_ops_matrix:
-        if isinstance(sub_op_matrix, int) and sub_op_matrix == 1:
-            continue
-        if isinstance(matrix, int) and matrix == 1:
-            matrix = sub_op_matrix
-            continue
-        matrix = matrix @ sub_op_matrix
+    base = convert(cv, op.op)
+    n = op.n
+    while n > 0:
+        if n % 2 == 1:
+            matrix = base if isinstance(matrix, int) else matrix @ base
+        n //= 2
+        if n > 0 and not (isinstance(base, int) and base == 1):
+            base = base @ base
     return matrix
+
+
+# utils
+
+def args_dims(args: IndexStruct) -> tuple[int, ...]:
+    return tuple(iter_struct(args, atom_typ=int))
+
+
+def check_dims(cv: ToMatrix, dims: tuple[int, ...]):
+    if cv.args is not None and args_dims(cv.args) != dims:
+        raise ValueError(f"Expected args of dimensions {dims}, got {cv.args}.")
+
+
+def infer_args(steps: Iterable[QOperation]) -> tuple[int, ...] | None:
+    """ Takes the args indexed by the remapped steps as qubits, or returns None if none of the steps are remapped. """
+    indices = [
+        index for step in steps if isinstance(step, Remapped)
+        for index in iter_struct(step.indices, atom_typ=int)]
+    return (2,) * (max(indices) + 1) if indices else None
+
+
+def steps_matrix(args: tuple[IndexStruct, ...], steps: Iterable[QOperation]) -> np.ndarray:
+    """ Matrix of the steps on the args, by contracting the matrix of each step with the axes it acts on.
+
+    The matrix is kept as a tensor with an axis for each particle and one for the flattened input,
+    so that each step costs the size of the matrix times the dimension of its own particles.
+    """
+    dims = args_dims(args)
+    size = math.prod(dims)
+
+    args_axes, start = [], 0
+    for arg in args:
+        n = len(args_dims(arg))
+        args_axes.append(tuple(range(start, start + n)))
+        start += n
+
+    tensor = np.reshape(np.eye(size, dtype=complex), (*dims, size))
+    for step in steps:
+        if isinstance(step, Remapped):
+            step_args = map_struct(lambda i: args[i], step.indices, atom_typ=int)
+            axes = tuple(axis for i in iter_struct(step.indices, atom_typ=int) for axis in args_axes[i])
+            step_matrix = convert(ToMatrix(step_args), step.op)
+        else:
+            axes = tuple(range(len(dims)))
+            step_matrix = convert(ToMatrix(args), step)
+        if isinstance(step_matrix, int) and step_matrix == 1:
+            continue
+
+        step_size = math.prod(dims[axis] for axis in axes)
+        if axes == tuple(range(axes[0], axes[0] + len(axes))):
+            # contiguous axes are contracted in place by a batched matmul
+            tensor = np.reshape(tensor, (math.prod(dims[:axes[0]]), step_size, -1))
+            tensor = np.matmul(step_matrix, tensor)
+        else:
+            others = tuple(axis for axis in range(len(dims) + 1) if axis not in axes)
+            tensor = np.transpose(tensor, (*axes, *others))
+            tensor = np.reshape(step_matrix @ np.reshape(tensor, (step_size, -1)), tensor.shape)
+            tensor = np.transpose(tensor, np.argsort((*axes, *others)))
+        tensor = np.reshape(tensor, (*dims, size))
+    return np.reshape(tensor, (size, size))
+
+
+def _kron(matrices: Iterable[np.ndarray]) -> np.ndarray:
+    result = np.ones((1, 1))
+    for matrix in matrices:
+        result = np.kron(result, matrix)
+    return result
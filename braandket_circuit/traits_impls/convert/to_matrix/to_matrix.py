@@ -1,9 +1,15 @@
 from braandket import ArrayLike
 
-from braandket_circuit.basics import QSystemStruct
+from braandket_circuit.basics.operation import IndexStruct
 from braandket_circuit.traits import Conversion
 
 
 class ToMatrix(Conversion[ArrayLike]):
-    def __init__(self, args: tuple[QSystemStruct, ...] | None = None):
+    """ Matrix of the operation on its args, with the first particle as the most significant one.
+
+    The args are given as structs of the dimensions of the particles, like (2, (2, 2)) for a qubit and a pair of
+    qubits. Without args, the args are inferred from the operation, taking each of them as a qubit.
+    """
+
+    def __init__(self, args: tuple[IndexStruct, ...] | None = None):
         self.args = args
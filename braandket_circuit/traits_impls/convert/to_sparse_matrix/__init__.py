@@ -0,0 +1,6 @@
+import importlib
+
+from .to_sparse_matrix import ToSparseMatrix
+
+importlib.import_module(".impls", __package__)
+del importlib
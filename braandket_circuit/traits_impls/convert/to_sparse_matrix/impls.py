@@ -0,0 +1,142 @@
+import math
+from typing import Any, Iterable
+
+import numpy as np
+
+from braandket_circuit.basics import QOperation
+from braandket_circuit.operations import CompactCircuit, Controlled, Remapped, Repeat, Sequential, StreamingSequential
+from braandket_circuit.traits import convert, register_convert_impl
+from braandket_circuit.traits_impls.convert.to_matrix import ToMatrix
+from braandket_circuit.traits_impls.convert.to_matrix.impls import args_dims, infer_args
+from braandket_circuit.utils import iter_struct, map_struct
+from .to_sparse_matrix import ToSparseMatrix
+
+
+@register_convert_impl(ToSparseMatrix, None)
+def dense_impl(cv: ToSparseMatrix, op: QOperation) -> Any:
+    from scipy import sparse
+    matrix = convert(ToMatrix(cv.args), op)
+    if isinstance(matrix, int) and matrix == 1:
+        return 1
+    return sparse.csr_array(np.asarray(matrix))
+
+
+@register_convert_impl(ToSparseMatrix, Controlled)
+def controlled_impl(cv: ToSparseMatrix, op: Controlled) -> Any:
+    from scipy import sparse
+    control, target = cv.args if cv.args is not None else (2, None)
+    control_dims = args_dims(control)
+    target_args = None if target is None else (target,) if isinstance(target, int) else tuple(target)
+    target_matrix = convert(ToSparseMatrix(target_args), op.op)
+    if isinstance(target_matrix, int):
+        if target_args is None:
+            return 1
+        target_matrix = sparse.identity(math.prod(args_dims(target_args)), dtype=complex)
+    target_size = target_matrix.shape[0]
+
+    # the op is applied when all the control particles are at state 1
+    on = int(np.ravel_multi_index((1,) * len(control_dims), control_dims)) if control_dims else 0
+    off_before = on * target_size
+    off_after = (math.prod(control_dims) - on - 1) * target_size
+    blocks = [
+        *([sparse.identity(off_before, dtype=complex)] if off_before else []),
+        target_matrix,
+        *([sparse.identity(off_after, dtype=complex)] if off_after else [])]
+    return sparse.csr_array(sparse.block_diag(blocks))
+
+
+@register_convert_impl(ToSparseMatrix, Remapped)
+def remapped_impl(cv: ToSparseMatrix, op: Remapped) -> Any:
+    args = cv.args if cv.args is not None else infer_args((op,))
+    return steps_sparse_matrix(args, (op,))
+
+
+@register_convert_impl(ToSparseMatrix, Sequential)
+@register_convert_impl(ToSparseMatrix, StreamingSequential)
+def sequential_impl(cv: ToSparseMatrix, op: Sequential | StreamingSequential) -> Any:
+    args = cv.args if cv.args is not None else infer_args(op)
+    if args is None:
+        # none of the steps are remapped, so they are on the same args
+        matrix = 1
+        for step in op:
+            step_matrix = convert(cv, step)
+            if not (isinstance(step_matrix, int) and step_matrix == 1):
+                matrix = step_matrix if isinstance(matrix, int) else step_matrix @ matrix
+        return matrix
+    return steps_sparse_matrix(args, op)
+
+
+@register_convert_impl(ToSparseMatrix, CompactCircuit)
+def compact_impl(cv: ToSparseMatrix, op: CompactCircuit) -> Any:
+    return convert(cv, op.to_sequential())
+
+
+@register_convert_impl(ToSparseMatrix, Repeat)
+def repeat_impl(cv: ToSparseMatrix, op: Repeat) -> Any:
+    # exponentiation by squaring
+    matrix = 1
+    base = convert(cv, op.op)
+    n = op.n
+    while n > 0:
+        if n % 2 == 1:
+            matrix = base if isinstance(matrix, int) else matrix @ base
+        n //= 2
+        if n > 0 and not (isinstance(base, int) and base == 1):
+            base = base @ base
+    return matrix
+
+
+# utils
+
+def steps_sparse_matrix(args: tuple, steps: Iterable[QOperation]) -> Any:
+    """ Matrix of the steps on the args, by multiplying the sparse embedding of each step into the args. """
+    from scipy import sparse
+    dims = args_dims(args)
+    size = math.prod(dims)
+
+    args_axes, start = [], 0
+    for arg in args:
+        n = len(args_dims(arg))
+        args_axes.append(tuple(range(start, start + n)))
+        start += n
+
+    matrix = sparse.identity(size, dtype=complex, format='csr')
+    for step in steps:
+        if isinstance(step, Remapped):
+            step_args = map_struct(lambda i: args[i], step.indices, atom_typ=int)
+            axes = tuple(axis for i in iter_struct(step.indices, atom_typ=int) for axis in args_axes[i])
+            step_matrix = convert(ToSparseMatrix(step_args), step.op)
+            if isinstance(step_matrix, int) and step_matrix == 1:
+                continue
+            step_matrix = embed_sparse_matrix(step_matrix, dims, axes)
+        else:
+            step_matrix = convert(ToSparseMatrix(args), step)
+            if isinstance(step_matrix, int) and step_matrix == 1:
+                continue
+        matrix = sparse.csr_array(step_matrix) @ matrix
+    return sparse.csr_array(matrix)
+
+
+def embed_sparse_matrix(matrix: Any, dims: tuple[int, ...], axes: tuple[int, ...]) -> Any:
+    """ Embeds the matrix on the particles at the axes into all the particles, as the identity on the others. """
+    from scipy import sparse
+    size = math.prod(dims)
+    strides = np.cumprod((1, *reversed(dims[1:])))[::-1]
+    others = tuple(axis for axis in range(len(dims)) if axis not in axes)
+
+    # the offset of each basis state of the particles at the axes and at the others in the basis of all
+    axes_offsets = _basis_offsets(dims, strides, axes)
+    others_offsets = _basis_offsets(dims, strides, others)
+
+    matrix = sparse.coo_array(matrix)
+    rows = np.add.outer(axes_offsets[matrix.row], others_offsets).ravel()
+    cols = np.add.outer(axes_offsets[matrix.col], others_offsets).ravel()
+    data = np.repeat(matrix.data, len(others_offsets))
+    return sparse.csr_array((data, (rows, cols)), shape=(size, size))
+
+
+def _basis_offsets(dims: tuple[int, ...], strides: np.ndarray, axes: tuple[int, ...]) -> np.ndarray:
+    offsets = np.zeros((1,), dtype=np.int64)
+    for axis in axes:
+        offsets = np.add.outer(offsets, np.arange(dims[axis]) * strides[axis]).ravel()
+    return offsets
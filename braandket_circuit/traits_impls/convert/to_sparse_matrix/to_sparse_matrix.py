@@ -0,0 +1,15 @@
+from typing import Any
+
+from braandket_circuit.basics.operation import IndexStruct
+from braandket_circuit.traits import Conversion
+
+
+class ToSparseMatrix(Conversion[Any]):
+    """ Matrix of the operation on its args as a scipy.sparse CSR array, like ToMatrix.
+
+    Composing the steps keeps the matrix sparse, so that the unitaries of permutation and diagonal heavy circuits
+    are extracted far beyond the sizes of dense matrices. Requires scipy.
+    """
+
+    def __init__(self, args: tuple[IndexStruct, ...] | None = None):
+        self.args = args
@@ -1 +1,2 @@
+from .hashing import value_key
 from .struct import freeze_struct, iter_struct, map_struct
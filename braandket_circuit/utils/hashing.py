@@ -0,0 +1,11 @@
+import numbers
+from typing import Any, Hashable
+
+import numpy as np
+
+
+def value_key(value: Any) -> Hashable:
+    """ Hashable key of a parameter value: scalars compare by value, anything else (arrays, tensors) by identity. """
+    if isinstance(value, (numbers.Number, np.number)):
+        return type(value), value
+    return id(value)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from braandket_circuit import CNOT, CompactCircuit, Controlled, DepolarizingChannel, FlattenPass, H, M, \
+    MatrixOperation, PauliEvolution, QFT, QOperation, Remapped, Rx, Rz, Sequential, X, compile, load_circuit, \
+    save_circuit
+
+
+def make_circuit() -> Sequential:
+    return Sequential([QFT(3).on(0, 1, 2), Rx(0.5).on(1), CNOT.on(1, 2), H], name="circuit")
+
+
+def test_save_load(tmp_path):
+    path = tmp_path / "circuit.bin"
+    save_circuit(make_circuit(), path)
+    loaded = load_circuit(path)
+    assert isinstance(loaded, CompactCircuit)
+    assert isinstance(loaded.indices.base, np.memmap)
+    assert loaded.name == "circuit"
+    assert list(loaded) == list(compile(FlattenPass(), make_circuit()))
+
+
+def test_save_load_without_mmap(tmp_path):
+    path = tmp_path / "circuit.bin"
+    compact = CompactCircuit.from_sequential(Sequential([H]))
+    save_circuit(compact, path)
+    loaded = load_circuit(path, mmap=False)
+    assert list(loaded) == [H]
+    assert len(loaded.indices) == 0
+
+
+def test_save_load_ops(tmp_path):
+    path = tmp_path / "circuit.bin"
+    matrix = MatrixOperation(np.asarray([[0, 1j], [1j, 0]]))
+    circuit = Sequential([
+        Remapped(Controlled(X), 0, 1), matrix.on(1), Rz(np.float64(0.3)).on(0),
+        PauliEvolution({"XZ": 0.5}, 0.2).on(0, 1), DepolarizingChannel(0.1).on(1), M.on(0)])
+    save_circuit(CompactCircuit.from_sequential(circuit), path)
+    loaded = load_circuit(path)
+    # nested ops are rebuilt through their constructors, so they are interned again
+    assert loaded.ops[0] is Controlled(X)
+    assert loaded.ops[2] is Rz(np.float64(0.3))
+    assert np.allclose(loaded.ops[1].matrix, matrix.matrix)
+    assert loaded.ops[3].observable == (("XZ", 0.5),)
+    assert loaded.ops[4].probabilities == DepolarizingChannel(0.1).probabilities
+
+
+def test_save_custom(tmp_path):
+    class Custom(QOperation):
+        def __call__(self, q):
+            X(q)
+
+    with pytest.raises(ValueError):
+        save_circuit(CompactCircuit([Custom()], [False], [0], [np.nan], [False], [0, 0], []), tmp_path / "c.bin")
@@ -0,0 +1,116 @@
+import io
+import math
+
+import numpy as np
+import pytest
+
+from braandket_circuit import CNOT, CX, Controlled, H, M, QFT, Remapped, Rx, Sdg, Sequential, X, read_qasm, simulate, \
+    write_qasm
+
+
+def test_read_qasm2():
+    source = io.StringIO("""
+        OPENQASM 2.0;
+        include "qelib1.inc";
+        qreg q[2];
+        qreg r[1];  // a second register
+        creg c[3];
+        h q[0];
+        cx q[0],
+           r[0];
+        rx(pi / 2) q[1];
+        ccx q[0], q[1], r[0];
+        barrier q;
+        measure q -> c[0:1];
+    """)
+    steps = list(read_qasm(source))
+    assert steps == [
+        Remapped(H, 0),
+        Remapped(CX, 0, 2),
+        Remapped(Rx(math.pi / 2), 1),
+        Remapped(Controlled(CX), 0, (1, 2)),
+        Remapped(M, 0),
+        Remapped(M, 1),
+    ]
+
+
+def test_read_qasm3():
+    source = io.StringIO("""
+        OPENQASM 3.0;
+        include "stdgates.inc";
+        qubit[2] q;
+        bit[2] c;
+        x q;
+        sdg q[1];
+        c[0] = measure q[0];
+    """)
+    assert list(read_qasm(source)) == [Remapped(X, 0), Remapped(X, 1), Remapped(Sdg, 1), Remapped(M, 0)]
+
+
+def test_read_unsupported():
+    with pytest.raises(ValueError):
+        list(read_qasm(io.StringIO("qreg q[1]; gate g a { x a; }")))
+
+
+def test_write_qasm():
+    file = io.StringIO()
+    write_qasm(Sequential(H.on(1), CNOT.on(1, 0), Rx(0.5).on(0), M.on(1)), file)
+    assert file.getvalue().splitlines()[2:] == [
+        "qreg q[2];",
+        "creg c[2];",
+        "h q[1];",
+        "cx q[1], q[0];",
+        "rx(0.5) q[0];",
+        "measure q[1] -> c[1];",
+    ]
+
+
+@pytest.mark.parametrize("version", [2, 3])
+def test_roundtrip(version: int):
+    circuit = Sequential(H.on(0), QFT(3).on(0, 1, 2), Rx(0.3).on(2))
+    file = io.StringIO()
+    write_qasm(circuit, file, version=version)
+    file.seek(0)
+    restored = Sequential(read_qasm(file))
+    assert np.allclose(simulate(restored, 3).state, simulate(circuit, 3).state)
+
+
+@pytest.mark.parametrize("version", [2, 3])
+def test_roundtrip_controlled(version: int):
+    circuit = Sequential(
+        H.on(0), H.on(1), Controlled(Controlled(X)).on(0, (1, 2)), Controlled(Rx(0.3)).on(2, 0),
+        Controlled(X).on((0, 2), 1))
+    file = io.StringIO()
+    write_qasm(circuit, file, version=version)
+    file.seek(0)
+    restored = Sequential(read_qasm(file))
+    assert np.allclose(simulate(restored, 3).state, simulate(circuit, 3).state)
+
+
+def test_roundtrip_qasm2_phases():
+    source = """
+        OPENQASM 2.0;
+        include "qelib1.inc";
+        qreg q[2];
+        h q[0];
+        u1(0.3) q[0];
+        cx q[0], q[1];
+        u3(0.4, 0.5, 0.6) q[1];
+        cu1(0.7) q[1], q[0];
+    """
+    circuit = Sequential(read_qasm(io.StringIO(source)))
+    file = io.StringIO()
+    write_qasm(circuit, file, version=2)
+    file.seek(0)
+    restored = Sequential(read_qasm(file))
+    # equal up to the dropped global phases
+    assert np.isclose(abs(np.vdot(simulate(restored, 2).state, simulate(circuit, 2).state)), 1)
+
+
+def test_write_unsupported_controls():
+    with pytest.raises(ValueError):
+        write_qasm(Sequential(Controlled(Controlled(Controlled(X))).on(0, (1, (2, 3)))), io.StringIO())
+    with pytest.raises(ValueError):
+        write_qasm(Sequential(Controlled(X).on((0, 1, 2), 3)), io.StringIO())
+    with pytest.raises(ValueError):
+        write_qasm(Sequential(Controlled(H).on((0, 1), 2)), io.StringIO())
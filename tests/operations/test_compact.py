@@ -0,0 +1,70 @@
+import numpy as np
+
+from braandket_circuit import CNOT, CompactCircuit, DM, FlattenPass, H, Invert, QFT, Remapped, Rx, Rz, Sequential, \
+    StructuralHash, X, allocate_qubits, compile, convert
+
+
+def make_circuit(theta: float = 0.5) -> Sequential:
+    return Sequential([
+        H.on(0),
+        CNOT.on(0, 1),
+        Rx(theta).on(1),
+        Rx(0.25).on(0),
+        Rz(np.float64(0.3)).on(2),
+        X,
+    ], name="circuit")
+
+
+def test_roundtrip():
+    circuit = make_circuit()
+    compact = CompactCircuit.from_sequential(circuit)
+    assert len(compact) == len(circuit)
+    assert compact.name == "circuit"
+    assert list(compact) == list(circuit)
+    assert compact[2] is Rx(0.5).on(1)
+    assert compact[-1] is X
+
+
+def test_structural_hash():
+    def compact_hash(theta: float) -> str:
+        return convert(StructuralHash(), CompactCircuit.from_sequential(make_circuit(theta)))
+
+    assert compact_hash(0.5) == compact_hash(0.5)
+    assert compact_hash(0.5) != compact_hash(0.6)
+
+
+def test_columns():
+    compact = CompactCircuit.from_sequential(make_circuit())
+    # both Rx steps share one entry of the op table
+    assert len(compact.ops) == 5
+    assert compact.opcodes[2] == compact.opcodes[3]
+    assert compact.params[2] == 0.5
+    assert np.isnan(compact.params[0])
+    assert list(compact.indices) == [0, 0, 1, 1, 0, 2]
+    assert list(compact.offsets) == [0, 1, 3, 4, 5, 6, 6]
+    assert not compact.remapped[-1]
+
+
+def test_run():
+    circuit = Sequential([QFT(3).on(0, 1, 2), Rx(0.5).on(1), CNOT.on(1, 2)])
+    compact = CompactCircuit.from_sequential(compile(FlattenPass(), circuit))
+    for value in np.ndindex(2, 2, 2):
+        probs = []
+        for op in (circuit, compact):
+            qubits = allocate_qubits(3)
+            op(*qubits)
+            probs.append(DM(value)(*qubits).prob)
+        assert np.allclose(probs[0], probs[1])
+
+
+def test_passes():
+    compact = CompactCircuit.from_sequential(make_circuit())
+    flattened = compile(FlattenPass(), compact)
+    assert isinstance(flattened, Sequential)
+    assert list(flattened) == list(make_circuit())
+
+    inverted = convert(Invert(), compact)
+    assert isinstance(inverted, CompactCircuit)
+    assert inverted[0] is X
+    assert inverted[-1] is Remapped(H, 0)
+    assert list(inverted) == list(convert(Invert(), make_circuit()))
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+
+from braandket_circuit import BnkRuntime, DM, FlattenPass, Invert, PauliEvolution, PureStatePreparation, \
+    Sequential, X, allocate_qubits, compile, convert
+
+
+def evolve(op: PauliEvolution, state_value: np.ndarray, *, native: bool = True) -> np.ndarray:
+    with BnkRuntime():
+        qubits = allocate_qubits(op.n)
+        PureStatePreparation(state_value)(*qubits)
+        if native:
+            op(*qubits)
+        else:
+            compile(FlattenPass(), op)(*qubits)
+        return qubits[0].state.tensor.values(*(qubit.space for qubit in qubits)).reshape(-1)
+
+
+def test_evolution_x():
+    qubits = allocate_qubits(1)
+    PauliEvolution({"X": 1.0}, math.pi / 2)(*qubits)
+    result, prob = DM(1)(qubits[0])
+    assert abs(prob - 1.0) < 1e-6
+
+
+def test_evolution_zz_phase():
+    op = PauliEvolution({"ZZ": 0.5}, 0.3)
+    state_value = np.full(4, 0.5)
+    expected = state_value * np.exp(-1j * 0.15 * np.asarray([1, -1, -1, 1]))
+    assert np.allclose(evolve(op, state_value), expected, atol=1e-6)
+
+
+def test_evolution_matches_decomposition():
+    op = PauliEvolution([("XYZ", 0.7), ("ZIX", -0.4), ("IYY", 0.2), ("III", 0.1)], 0.9)
+    state_value = np.arange(8) + 1j * np.arange(8)[::-1]
+    state_value = state_value / np.linalg.norm(state_value)
+    assert np.allclose(evolve(op, state_value), evolve(op, state_value, native=False), atol=1e-6)
+
+
+def test_evolution_then_inverse():
+    op = PauliEvolution([("XY", 0.7), ("ZX", -0.4)], 0.9)
+    qubits = allocate_qubits(2)
+    X(qubits[1])
+    Sequential(op, convert(Invert(), op))(*qubits)
+    result, prob = DM([0, 1])(*qubits)
+    assert abs(prob - 1.0) < 1e-6
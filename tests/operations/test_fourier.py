@@ -0,0 +1,62 @@
+import numpy as np
+
+from braandket import tensorflow_backend
+from braandket_circuit import BnkRuntime, DM, FlattenPass, H, InverseQFT, Invert, PureStatePreparation, QFT, \
+    Remapped, Sequential, X, allocate_qubits, compile, convert
+
+
+def test_qft_zero_state():
+    qubits = allocate_qubits(3)
+    QFT(3)(*qubits)
+    result, prob = DM([1, 0, 1])(*qubits)
+    assert abs(prob - 1 / 8) < 1e-6
+
+
+def test_qft_matches_decomposition():
+    state_value = np.arange(8) + 1j * np.arange(8)[::-1]
+    state_value = state_value / np.linalg.norm(state_value)
+
+    def run(native: bool):
+        with BnkRuntime():
+            qubits = allocate_qubits(3)
+            PureStatePreparation(state_value)(*qubits)
+            if native:
+                QFT(3)(*qubits)
+            else:
+                compile(FlattenPass(), QFT(3))(*qubits)
+            return qubits[0].state.tensor.values(*(qubit.space for qubit in qubits))
+
+    assert np.allclose(run(native=True), run(native=False), atol=1e-6)
+
+
+def test_qft_then_inverse_qft():
+    qubits = allocate_qubits(3)
+    X(qubits[0])
+    X(qubits[2])
+    QFT(3)(*qubits)
+    InverseQFT(3)(*qubits)
+    result, prob = DM([1, 0, 1])(*qubits)
+    assert abs(prob - 1.0) < 1e-6
+
+
+def test_qft_tensorflow():
+    with BnkRuntime(tensorflow_backend):
+        qubits = allocate_qubits(2)
+        QFT(2)(*qubits)
+        result, prob = DM([1, 1])(*qubits)
+        assert abs(prob - 1 / 4) < 1e-6
+
+
+def test_flatten_qft():
+    flattened = compile(FlattenPass(), Sequential(QFT(2).on(1, 0)))
+    assert isinstance(flattened, Sequential)
+    assert isinstance(flattened[0], Remapped)
+    assert flattened[0].indices == (1,)
+    assert flattened[0].op is H
+
+
+def test_invert_qft():
+    inverted = convert(Invert(), QFT(3))
+    assert isinstance(inverted, InverseQFT)
+    assert inverted.n == 3
+    assert isinstance(convert(Invert(), inverted), QFT)
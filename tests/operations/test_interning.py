@@ -0,0 +1,43 @@
+import numpy as np
+
+from braandket_circuit import C, CX, Controlled, FlattenPass, Invert, PauliXGate, QOperation, Remapped, Rx, \
+    Sequential, X, compile, convert
+
+
+def test_leaf_gates_interned():
+    assert PauliXGate() is X
+    assert Rx(0.5) is Rx(0.5)
+    assert Rx(0.5) is not Rx(0.25)
+    assert PauliXGate(name="x") is not X
+
+
+def test_wrappers_interned():
+    assert C(X) is CX
+    assert Controlled(Rx(0.5)) is Controlled(Rx(0.5))
+    assert Remapped(CX, 1, 0) is Remapped(CX, 1, 0)
+    assert Remapped(CX, 1, 0) is not Remapped(CX, 0, 1)
+
+
+def test_array_params_by_identity():
+    theta = np.asarray(0.5)
+    assert Rx(theta) is Rx(theta)
+    assert Rx(theta) is not Rx(np.asarray(0.5))
+
+
+def test_structural_eq_hash():
+    assert hash(Remapped(C(Rx(0.5)), 0, 1)) == hash(Remapped(C(Rx(0.5)), 0, 1))
+    assert {Rx(0.5): 1}[Rx(0.5)] == 1
+
+
+def test_custom_ops_not_interned():
+    class CustomOp(QOperation[None]):
+        pass
+
+    assert CustomOp() is not CustomOp()
+    assert CustomOp() != CustomOp()
+
+
+def test_passes_reuse_instances():
+    circuit = Sequential([Rx(0.5).on(1), CX.on(0, 1)])
+    assert compile(FlattenPass(), circuit)[0] is Remapped(Rx(0.5), 1)
+    assert convert(Invert(), circuit)[0] is Remapped(CX, 0, 1)
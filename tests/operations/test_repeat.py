@@ -0,0 +1,47 @@
+import numpy as np
+
+from braandket_circuit import BnkRuntime, CNOT, FlattenPass, H, Invert, M, MatrixOperation, Remapped, Repeat, Rx, \
+    Sequential, ToMatrix, allocate_qubits, compile, convert, simulate
+from braandket_circuit.traits_impls.apply.braandket.impls import repeat_plan
+
+
+def test_mul():
+    body = Sequential(Rx(0.1).on(0), CNOT.on(0, 1))
+    circuit = body * 5
+    assert circuit is Repeat(body, 5)
+    assert (Sequential(H, name="body") * 2).name == "body"
+    expanded = Sequential([body] * 5)
+    assert np.allclose(simulate(circuit, 2).state, simulate(expanded, 2).state)
+
+
+def test_flatten():
+    circuit = Repeat(Sequential(H.on(1), CNOT.on(1, 0)), 3).on(2, 0)
+    flattened = compile(FlattenPass(), circuit)
+    assert list(flattened) == [Remapped(H, 0), Remapped(CNOT, 0, 2)] * 3
+
+
+def test_invert():
+    inverted = convert(Invert(), Repeat(Rx(0.1), 3))
+    assert inverted is Repeat(Rx(-0.1), 3)
+
+
+def test_to_matrix():
+    matrix = np.asarray([[0.6, 0.8], [-0.8, 0.6]])
+    for n in (1, 6, 7):
+        result = convert(ToMatrix(), Repeat(MatrixOperation(matrix), n))
+        assert np.allclose(result, np.linalg.matrix_power(matrix, n))
+    assert convert(ToMatrix(), Repeat(MatrixOperation(matrix), 0)) == 1
+
+
+def test_results():
+    with BnkRuntime():
+        q0, = allocate_qubits(1)
+        results = Repeat(Sequential(H, M), 3)(q0)
+        assert len(results) == 3
+        assert all(result[1] is not None for result in results)
+
+
+def test_plan_cached():
+    body = Sequential(Sequential(H.on(0), CNOT.on(0, 1)), Rx(0.2).on(1))
+    assert repeat_plan(body) is repeat_plan(body)
+    assert list(repeat_plan(body)) == list(compile(FlattenPass(), body))
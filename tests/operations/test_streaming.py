@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from braandket_circuit import BnkRuntime, CNOT, FlattenPass, H, Invert, M, Remapped, Rx, Sequential, \
+    StreamingSequential, X, allocate_qubits, compile, convert, simulate
+
+
+def trotter_steps(n: int):
+    for i in range(n):
+        yield Rx(0.1).on(0)
+        yield CNOT.on(0, 1)
+
+
+def test_iterator_rejected():
+    with pytest.raises(TypeError):
+        StreamingSequential(trotter_steps(3))
+
+
+def test_run_from_factory():
+    produced = []
+
+    def factory():
+        for step in trotter_steps(3):
+            produced.append(step)
+            yield step
+
+    circuit = StreamingSequential(factory)
+    assert np.allclose(simulate(circuit, 2).state, simulate(Sequential(trotter_steps(3)), 2).state)
+    assert len(produced) == 6
+
+
+def test_flatten_lazily():
+    produced = []
+
+    def factory():
+        for i in range(3):
+            produced.append(i)
+            yield Sequential(H.on(1), X.on(0))
+
+    flattened = compile(FlattenPass(), StreamingSequential(factory))
+    assert isinstance(flattened, StreamingSequential)
+    assert produced == []
+    assert list(flattened) == [Remapped(H, 1), Remapped(X, 0)] * 3
+
+
+def test_invert():
+    steps = [Rx(0.1).on(0), CNOT.on(0, 1), H.on(1)]
+    inverted = convert(Invert(), StreamingSequential(steps))
+    assert isinstance(inverted, StreamingSequential)
+    assert list(inverted) == [Remapped(H, 1), Remapped(CNOT, 0, 1), Remapped(Rx(-0.1), 0)]
+
+    inverted = convert(Invert(), StreamingSequential(lambda: iter(steps)))
+    assert isinstance(inverted, Sequential)
+    assert list(inverted) == [Remapped(H, 1), Remapped(CNOT, 0, 1), Remapped(Rx(-0.1), 0)]
+
+
+def test_steps_from_sequential():
+    steps = Sequential(H.on(0), CNOT.on(0, 1))
+    circuit = StreamingSequential(steps)
+    assert circuit.reversible
+    assert list(circuit) == list(steps)
+    assert np.allclose(simulate(circuit, 2).state, simulate(steps, 2).state)
+
+    with pytest.raises(TypeError):
+        StreamingSequential(H)
+
+
+def test_results():
+    # the results of the steps without any are not kept
+    flip = Sequential(X.on(0), H.on(0), H.on(0))
+    circuit = StreamingSequential(lambda: (step for _ in range(100) for step in (flip, M.on(0))))
+    with BnkRuntime():
+        q0, = allocate_qubits(1)
+        results = circuit(q0)
+    assert len(results) == 100
+    assert [result.value for result in results] == [1, 0] * 50
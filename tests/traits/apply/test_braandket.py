@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+
+from braandket_circuit import BnkRuntime, BnkSnapshot, BnkState, CNOT, Checkpoint, DM, H, Layout, M, Rx, Sequential, \
+    X, allocate_qubits
+
+
+def test_snapshot_restore():
+    with BnkRuntime():
+        q0, q1 = allocate_qubits(2)
+        H(q0)
+        CNOT(q0, q1)
+        snapshot = BnkSnapshot((q0, q1))
+
+        r0, r1 = allocate_qubits(2)
+        snapshot.restore((r1, r0))
+        result, prob = DM([1, 1])(r0, r1)
+        assert abs(prob - 0.5) < 1e-6
+
+        # the snapshot is not affected by later operations on the original particles
+        X(q0)
+        s0, s1 = allocate_qubits(2)
+        snapshot.restore((s0, s1))
+        result, prob = DM([0, 0])(s0, s1)
+        assert abs(prob - 0.5) < 1e-6
+
+
+def test_prefix_cache():
+    prefix = Sequential(H.on(0), CNOT.on(0, 1))
+
+    def circuit(theta: float):
+        return Sequential(prefix, Checkpoint(), Rx(theta).on(1), DM([0, 0]).on(0, 1))
+
+    with BnkRuntime(prefix_cache=True) as rt:
+        for theta in np.linspace(0, math.pi, 5):
+            q0, q1 = allocate_qubits(2)
+            result, prob = circuit(theta)(q0, q1)[-1]
+            assert abs(prob - 0.5 * math.cos(theta / 2) ** 2) < 1e-6
+        assert len(rt.prefix_cache) == 1
+
+
+def test_prefix_cache_skips_measurements():
+    circuit = Sequential(H.on(0), M.on(0), Checkpoint())
+    with BnkRuntime(prefix_cache=True) as rt:
+        q0, = allocate_qubits(1)
+        circuit(q0)
+        assert len(rt.prefix_cache) == 0
+
+
+def test_stable_layout():
+    with BnkRuntime(stable_layout=True):
+        q0, q1, q2 = allocate_qubits(3)
+        H(q2)
+        CNOT(q2, q0)
+        assert BnkState.prod(q0.state, q1.state).tensor.spaces == (q0.space, q1.space, q2.space)
+        CNOT(q1, q2)
+
+        Layout()(q2, q0, q1)
+        assert q0.state.tensor.spaces == (q2.space, q0.space, q1.space)
+        X(q1)
+        result, prob = DM([1, 1, 1])(q0, q1, q2)
+        assert abs(prob - 0.5) < 1e-6
+
+
+class CountingRuntime(BnkRuntime):
+    def __init__(self):
+        super().__init__(stable_layout=True)
+        self.transposes = 0  # tensors transposed to the layout
+        self.unordered = 0  # tensors given to states out of the order of the layout
+
+    def _adapted(self, tensor):
+        self.unordered += BnkRuntime._arranged(self, tensor) is not tensor
+        return super()._adapted(tensor)
+
+    def _arranged(self, tensor):
+        arranged = super()._arranged(tensor)
+        self.transposes += arranged is not tensor
+        return arranged
+
+
+def test_stable_layout_transposes():
+    # only merges are laid out, not every gate leaving the axes in another order
+    with CountingRuntime() as rt:
+        qubits = allocate_qubits(5)
+        for i in range(4):
+            H(qubits[i])
+            CNOT(qubits[i], qubits[i + 1])
+            X(qubits[i])
+            Rx(0.3)(qubits[4])
+        assert 0 < rt.transposes <= 4 < rt.unordered
+
+
+def test_seed():
+    def measure_all(seed: int) -> list:
+        with BnkRuntime(seed=seed):
+            results = []
+            for _ in range(20):
+                q0, q1 = allocate_qubits(2)
+                H(q0)
+                Rx(1.0)(q1)
+                results.append(M(q0, q1).value.tolist())
+            return results
+
+    assert measure_all(1) == measure_all(1)
+    assert measure_all(1) != measure_all(2)
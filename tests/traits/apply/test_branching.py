@@ -0,0 +1,58 @@
+import math
+
+from braandket_circuit import BranchingRuntime, CX, DM, H, M, Rx, allocate_qubit, allocate_qubits
+
+
+def test_branching_bell_state():
+    with BranchingRuntime() as rt:
+        q0, q1 = allocate_qubits(2)
+        H(q0)
+        CX(q0, q1)
+        M(q0)
+        M(q1)
+    distribution = rt.distribution
+    assert set(distribution) == {(0, 0), (1, 1)}
+    assert abs(distribution[(0, 0)] - 0.5) < 1e-6
+    assert abs(distribution[(1, 1)] - 0.5) < 1e-6
+
+
+def test_branching_multiple_qubits():
+    with BranchingRuntime() as rt:
+        q0, q1 = allocate_qubits(2)
+        Rx(math.pi / 3)(q0)
+        H(q1)
+        result = M(q0, q1)
+    assert len(rt.branch_weights) == 4
+    assert abs(rt.distribution[((1, 0),)] - 1 / 8) < 1e-6
+    assert result.value.shape == (4, 2)
+
+
+def test_branching_merge_identical():
+    with BranchingRuntime() as rt:
+        qubit = allocate_qubit()
+        for _ in range(3):
+            H(qubit)
+            M(qubit)
+    assert len(rt.branch_weights) == 2
+    assert len(rt.distribution) == 8
+    assert all(abs(prob - 1 / 8) < 1e-6 for prob in rt.distribution.values())
+
+
+def test_branching_prune():
+    with BranchingRuntime(threshold=0.3) as rt:
+        q0, q1 = allocate_qubits(2)
+        Rx(math.pi / 3)(q0)
+        M(q0)
+    assert set(rt.distribution) == {(0,)}
+    assert abs(rt.pruned_weight - 1 / 4) < 1e-6
+
+
+def test_branching_desired_measurement():
+    with BranchingRuntime() as rt:
+        q0, q1 = allocate_qubits(2)
+        H(q0)
+        CX(q0, q1)
+        M(q0)
+        DM(1)(q1)
+    assert set(rt.distribution) == {(1,)}
+    assert abs(rt.distribution[(1,)] - 0.5) < 1e-6
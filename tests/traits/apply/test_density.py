@@ -0,0 +1,64 @@
+import numpy as np
+
+from braandket_circuit import AmplitudeDampingChannel, BnkRuntime, BnkState, CNOT, DensityMatrixRuntime, \
+    DepolarizingChannel, H, KrausChannel, M, PauliChannel, ReadoutError, Ry, X, allocate_qubits
+
+
+def density_matrix(*qubits) -> np.ndarray:
+    tensor = BnkState.prod(*(qubit.state for qubit in qubits)).tensor
+    spaces = [qubit.space for qubit in qubits]
+    return np.reshape(tensor.values(*spaces, *(space.ct for space in spaces)), [2 ** len(qubits)] * 2)
+
+
+def test_amplitude_damping():
+    for runtime in (DensityMatrixRuntime(), BnkRuntime()):
+        with runtime:
+            q, = allocate_qubits(1)
+            X(q)
+            AmplitudeDampingChannel(0.3)(q)
+            assert np.allclose(density_matrix(q), np.diag([0.3, 0.7]))
+
+
+def test_depolarizing_bell():
+    p = 0.3
+    bell = np.asarray([1, 0, 0, 1]) / np.sqrt(2)
+    paulis = [np.eye(2), np.asarray([[0, 1], [1, 0]]), np.asarray([[0, -1j], [1j, 0]]), np.diag([1, -1])]
+    expected = sum(
+        w * np.kron(np.eye(2), pauli) @ np.outer(bell, bell) @ np.kron(np.eye(2), pauli).conj().T
+        for w, pauli in zip([1 - p, p / 3, p / 3, p / 3], paulis))
+
+    with DensityMatrixRuntime():
+        q0, q1 = allocate_qubits(2)
+        H(q0)
+        CNOT(q0, q1)
+        DepolarizingChannel(p)(q1)
+        assert np.allclose(density_matrix(q0, q1), expected)
+
+
+def test_controlled_on_mixed():
+    k0, k1 = np.diag([1, np.sqrt(0.6)]), np.diag([0, np.sqrt(0.4)])
+    with DensityMatrixRuntime():
+        q0, q1 = allocate_qubits(2)
+        Ry(0.8)(q0)
+        KrausChannel([k0, k1])(q0)
+        CNOT(q0, q1)
+        PauliChannel({"XZ": 0.2})(q0, q1)
+        rho = density_matrix(q0, q1)
+
+    psi = np.asarray([np.cos(0.4), np.sin(0.4)])
+    rho0 = sum(k @ np.outer(psi, psi) @ k.conj().T for k in (k0, k1))
+    rho0 = np.kron(rho0, np.diag([1, 0]))
+    cnot = np.asarray([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
+    xz = np.kron([[0, 1], [1, 0]], np.diag([1, -1]))
+    rho0 = cnot @ rho0 @ cnot.T
+    expected = 0.8 * rho0 + 0.2 * xz @ rho0 @ xz.T
+    assert np.allclose(rho, expected)
+
+
+def test_readout_error():
+    with DensityMatrixRuntime():
+        q, = allocate_qubits(1)
+        X(q)
+        assert ReadoutError(0.0, 1.0)(q).value == 0
+        assert ReadoutError(0.0, 0.0)(q).value == 1
+        assert M(q).value == 1
@@ -0,0 +1,22 @@
+from braandket_circuit import CX, H, M, Ry, allocate_qubits, run_parallel
+
+
+def noisy_bell():
+    q0, q1 = allocate_qubits(2)
+    H(q0)
+    CX(q0, q1)
+    Ry(0.7)(q1)
+    return M(q0), M(q1)
+
+
+def test_run_parallel():
+    counts = run_parallel(noisy_bell, 300, 1, seed=7, chunk_size=32)
+    assert sum(counts.values()) == 300
+    assert set(counts) <= {(0, 0), (0, 1), (1, 0), (1, 1)}
+    assert counts[(0, 0)] + counts[(1, 1)] > counts[(0, 1)] + counts[(1, 0)]
+
+
+def test_run_parallel_reproducible():
+    counts = run_parallel(noisy_bell, 200, 1, seed=7, chunk_size=32)
+    assert run_parallel(noisy_bell, 200, 3, seed=7, chunk_size=32) == counts
+    assert run_parallel(noisy_bell, 200, 1, seed=8, chunk_size=32) != counts
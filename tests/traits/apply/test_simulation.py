@@ -0,0 +1,59 @@
+import numpy as np
+
+from braandket_circuit import CNOT, H, M, QOperation, Sequential, SimulationCache, simulate
+
+
+def test_simulate_bell_state():
+    result = simulate(Sequential(H.on(0), CNOT.on(0, 1)), 2)
+    assert np.allclose(result.probabilities, [[0.5, 0.0], [0.0, 0.5]])
+
+
+def test_simulate_cache():
+    cache = SimulationCache()
+    result1 = simulate(Sequential(H.on(0), CNOT.on(0, 1)), 2, cache=cache)
+    result2 = simulate(Sequential(H.on(0), CNOT.on(0, 1)), 2, cache=cache)
+    result3 = simulate(Sequential(H.on(0), CNOT.on(0, 1)), 2, cache=cache)
+    assert len(cache) == 1
+    assert result2 is result3
+    assert np.allclose(result1.state, result2.state)
+
+
+def test_simulate_cache_skips_measurements():
+    cache = SimulationCache()
+    simulate(Sequential(H.on(0), M.on(0)), 1, cache=cache)
+    assert len(cache) == 0
+
+
+def test_simulate_cache_skips_custom_measurements():
+    class Coin(QOperation):
+        def __call__(self, q):
+            H(q)
+            M(q)
+
+    cache = SimulationCache()
+    states = {tuple(simulate(Coin(), 1, cache=cache).probabilities) for _ in range(20)}
+    assert len(cache) == 0
+    assert states == {(1.0, 0.0), (0.0, 1.0)}
+
+
+def test_simulate_cache_on_disk(tmp_path):
+    simulate(Sequential(H.on(0), CNOT.on(0, 1)), 2, cache=SimulationCache(directory=tmp_path))
+    cache = SimulationCache(directory=tmp_path)
+    result = simulate(Sequential(H.on(0), CNOT.on(0, 1)), 2, cache=cache)
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+    assert len(cache) == 1
+    assert np.allclose(result.probabilities, [[0.5, 0.0], [0.0, 0.5]])
+
+
+def test_simulate_seed():
+    circuit = Sequential(Sequential([H.on(i) for i in range(8)]), Sequential([M.on(i) for i in range(8)]))
+    state = simulate(circuit, 8, seed=1).state
+    assert np.allclose(simulate(circuit, 8, seed=1).state, state)
+    assert not np.allclose(simulate(circuit, 8, seed=2).state, state)
+
+
+def test_simulate_separate_entangled_pairs():
+    # qubits of the same state are not adjacent among the qubits
+    result = simulate(Sequential(H.on(0), H.on(1), CNOT.on(0, 2), CNOT.on(1, 3)), 4)
+    assert np.allclose(result.probabilities.sum(axis=(1, 3)), [[0.5, 0.0], [0.0, 0.5]])
+    assert np.allclose(result.probabilities.sum(axis=(0, 2)), [[0.5, 0.0], [0.0, 0.5]])
@@ -0,0 +1,41 @@
+import numpy as np
+
+from braandket_circuit import AmplitudeDampingChannel, CX, CZ, DepolarizingChannel, H, M, Ry, Sequential, \
+    TrajectoryRuntime, X, allocate_qubits, simulate
+
+
+def test_trajectory_probabilities():
+    circuit = Sequential(
+        H.on(0), CX.on(0, 1),
+        DepolarizingChannel(0.3).on(1), AmplitudeDampingChannel(0.4).on(0),
+        Ry(0.3).on(1), CZ.on(0, 1))
+    expected = simulate(circuit, 2).probabilities
+
+    with TrajectoryRuntime(2000, seed=0) as rt:
+        q0, q1 = allocate_qubits(2)
+        circuit(q0, q1)
+        probabilities, errors = rt.probabilities(q0, q1)
+    assert np.all(errors > 0)
+    assert np.all(np.abs(probabilities - expected) < 5 * errors)
+
+
+def test_trajectory_noiseless():
+    with TrajectoryRuntime(10) as rt:
+        q0, q1 = allocate_qubits(2)
+        H(q0)
+        CX(q0, q1)
+        probabilities, errors = rt.probabilities(q0, q1)
+    assert np.allclose(probabilities, [[0.5, 0], [0, 0.5]])
+    assert np.all(errors == 0)
+
+
+def test_trajectory_measurement():
+    with TrajectoryRuntime(1000, seed=0):
+        q0, q1 = allocate_qubits(2)
+        X(q0)
+        AmplitudeDampingChannel(0.25)(q0)
+        CX(q0, q1)
+        result = M(q0, q1)
+    assert result.value.shape == (1000, 2)
+    assert np.all(result.value[:, 0] == result.value[:, 1])
+    assert abs(np.mean(result.value[:, 0]) - 0.75) < 0.05
@@ -1,4 +1,6 @@
-from braandket_circuit import CNOT, FlattenPass, Remapped, Sequential, X, Y, compile
+import sys
+
+from braandket_circuit import CNOT, FlattenPass, M, Remapped, Sequential, X, Y, compile
 
 
 def test_flatten_elementary_gate():
@@ -55,3 +57,21 @@ def test_flatten_nested_remapped():
     assert isinstance(flattened, Remapped)
     assert flattened.indices == (2, 1)
     assert flattened.op is CNOT
+
+
+def test_flatten_nested_indices():
+    circuit = Sequential(M.on([1, (0,)])).on(2, 0)
+    flattened = compile(FlattenPass(), circuit)
+    assert flattened[0].op is M
+    assert flattened[0].indices == ((0, (2,)),)
+
+
+def test_flatten_deeply_nested():
+    depth = 5 * sys.getrecursionlimit()
+    circuit = X.on(0)
+    for i in range(depth):
+        circuit = Sequential(circuit.on(1, 0), Y.on(0))
+    flattened = compile(FlattenPass(), circuit)
+    assert len(flattened) == depth + 1
+    assert flattened[0].op is X
+    assert flattened[0].indices == (depth % 2,)
@@ -1,5 +1,5 @@
-from braandket_circuit import CNOT, Controlled, FreezePass, H, QOperation, QParticle, Remapped, Sequential, X, \
-    apply, compile
+from braandket_circuit import CNOT, Controlled, FlattenPass, FreezePass, H, M, QOperation, QParticle, Remapped, \
+    Sequential, SymbolicParticle, X, apply, compile
 
 
 class CustomGate(QOperation[None]):
@@ -19,3 +19,52 @@ def test_freeze_custom_gate():
     assert isinstance(frozen[1], Remapped)
     assert isinstance(frozen[1].op, Controlled)
     assert frozen[1].op.op is X
+
+
+class CountingGate(QOperation[None]):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def __call__(self, q0: QParticle, q1: QParticle):
+        self.calls += 1
+        CNOT(q1, q0)
+
+
+def test_freeze_memoized():
+    gate = CountingGate()
+    frozen = compile(FreezePass(), gate)
+    assert compile(FreezePass(), gate) is frozen
+    assert compile(FlattenPass(), Sequential(gate, gate)) is not None
+    assert gate.calls == 1
+
+    FreezePass.invalidate(gate)
+    assert compile(FreezePass(), gate) is not frozen
+    assert gate.calls == 2
+
+
+class NestedArgsGate(QOperation[None]):
+    def __call__(self, q0: QParticle, q1: QParticle):
+        X(q1)
+        M([q0, (q1,)])
+
+
+def test_freeze_nested_args():
+    frozen = compile(FreezePass(), NestedArgsGate())
+    assert frozen[0].indices == (1,)
+    assert frozen[1].op is M
+    assert frozen[1].indices == ((0, (1,)),)
+
+
+class WideGate(QOperation[None]):
+    def __call__(self, *qubits: QParticle):
+        for q0, q1 in zip(qubits[:-1], qubits[1:]):
+            CNOT(q0, q1)
+
+
+def test_freeze_wide_gate():
+    n = 1000
+    args = tuple(SymbolicParticle(2) for _ in range(n))
+    frozen = compile(FreezePass(args), WideGate())
+    assert len(frozen) == n - 1
+    assert frozen[-1].indices == (n - 2, n - 1)
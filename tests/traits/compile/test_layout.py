@@ -0,0 +1,18 @@
+import numpy as np
+
+from braandket_circuit import CNOT, CZ, H, Layout, LayoutPass, QFT, Remapped, Sequential, X, compile, simulate
+
+
+def test_layout():
+    circuit = Sequential(H.on(0), CNOT.on(0, 3), CZ.on(3, 1), CNOT.on(0, 3), X.on(2), CZ.on(1, 2))
+    assert LayoutPass().layout(circuit) == (2, 1, 3, 0)
+
+    compiled = compile(LayoutPass(), circuit)
+    assert compiled[0] == Remapped(Layout(), 2, 1, 3, 0)
+    assert list(compiled[1:]) == list(circuit)
+
+
+def test_run_layout():
+    circuit = Sequential(H.on(0), H.on(2), CNOT.on(2, 0), QFT(2).on(3, 1), CZ.on(0, 2))
+    compiled = compile(LayoutPass(), circuit)
+    assert np.allclose(simulate(compiled, 4).state, simulate(circuit, 4).state)
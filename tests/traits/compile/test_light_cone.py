@@ -0,0 +1,34 @@
+import numpy as np
+
+from braandket_circuit import CNOT, H, LightConePass, M, Remapped, Rx, Sequential, X, compile, simulate
+
+
+def make_circuit() -> Sequential:
+    return Sequential(
+        H.on(0),
+        Rx(0.3).on(3),
+        CNOT.on(0, 1),
+        X.on(2),
+        CNOT.on(3, 2),
+        Rx(0.5).on(1),
+        M.on(3),
+    )
+
+
+def test_light_cone():
+    pruned = compile(LightConePass([1]), make_circuit())
+    assert list(pruned) == [Remapped(H, 0), Remapped(CNOT, 0, 1), Remapped(Rx(0.5), 1)]
+
+    pruned = compile(LightConePass([2]), make_circuit())
+    assert list(pruned) == [Remapped(Rx(0.3), 3), Remapped(X, 2), Remapped(CNOT, 3, 2)]
+
+
+def test_drop_unused():
+    ps = LightConePass([2], drop_unused=True)
+    assert ps.light_cone(make_circuit()) == (2, 3)
+    pruned = compile(ps, make_circuit())
+    assert list(pruned) == [Remapped(Rx(0.3), 1), Remapped(X, 0), Remapped(CNOT, 1, 0)]
+
+    # the marginal distribution of the output qubit is unchanged, flipped by X unless qubit 3 is rotated to 1
+    pruned_probs = simulate(pruned, 2).probabilities.sum(axis=1)
+    assert np.allclose(pruned_probs, [np.sin(0.15) ** 2, np.cos(0.15) ** 2])
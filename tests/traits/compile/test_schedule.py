@@ -0,0 +1,47 @@
+import numpy as np
+
+from braandket_circuit import CNOT, CZ, H, M, Moment, QFT, Remapped, Rx, Rz, SchedulePass, Sequential, X, Z, compile, \
+    simulate
+
+
+def test_schedule():
+    circuit = Sequential(H.on(0), H.on(1), CNOT.on(0, 1), X.on(2), Rx(0.5).on(1), M.on(0))
+    scheduled = compile(SchedulePass(), circuit)
+    assert len(scheduled) == 3
+    assert all(isinstance(moment, Moment) for moment in scheduled)
+    assert list(scheduled[0]) == [Remapped(H, 0), Remapped(H, 1), Remapped(X, 2)]
+    assert list(scheduled[1]) == [Remapped(CNOT, 0, 1)]
+    assert list(scheduled[2]) == [Remapped(Rx(0.5), 1), Remapped(M, 0)]
+
+
+def test_reorder_diagonal():
+    circuit = Sequential(H.on(0), CZ.on(0, 1), Rz(0.5).on(1), Z.on(2), CZ.on(1, 2))
+    assert len(compile(SchedulePass(), circuit)) == 4
+
+    scheduled = compile(SchedulePass(reorder_diagonal=True), circuit)
+    assert list(scheduled[0]) == [Remapped(H, 0), Remapped(Rz(0.5), 1), Remapped(Z, 2)]
+    assert list(scheduled[1]) == [Remapped(CZ, 0, 1)]
+    assert list(scheduled[2]) == [Remapped(CZ, 1, 2)]
+
+
+def test_run_moments():
+    circuit = Sequential(H.on(0), H.on(1), Rx(0.3).on(2), QFT(3).on(0, 1, 2), Rx(0.2).on(0), Rz(0.1).on(1))
+    scheduled = compile(SchedulePass(reorder_diagonal=True), circuit)
+    assert np.allclose(simulate(scheduled, 3).state, simulate(circuit, 3).state)
+
+
+def test_run_moment_merging_states():
+    # the multi-qubit steps merge the states of qubits that single qubit gates of the same moment act on
+    prepare = Sequential(H.on(0), H.on(2), Rx(0.4).on(3))
+    moment = Moment([Rx(0.3).on(1), CNOT.on(0, 2), H.on(3), X.on(4)])
+    expected = Sequential(prepare, Sequential(list(moment)))
+    assert np.allclose(simulate(Sequential(prepare, moment), 5).state, simulate(expected, 5).state)
+
+
+def test_run_moment_entangled():
+    # the gates on a state of many entangled qubits are contracted one by one, not as one product operator
+    n = 14
+    prepare = Sequential(H.on(0), Sequential([CNOT.on(i, i + 1) for i in range(n - 1)]))
+    moment = Moment([Rx(0.1 * i).on(i) for i in range(n)])
+    expected = Sequential(prepare, Sequential(list(moment)))
+    assert np.allclose(simulate(Sequential(prepare, moment), n).state, simulate(expected, n).state)
@@ -1,4 +1,10 @@
-from braandket_circuit import CNOT, Controlled, H, Remapped, Rx, Sequential, X, convert
+import gc
+import weakref
+
+import numpy as np
+
+from braandket_circuit import CNOT, Controlled, H, QubitsMatrixOperation, Remapped, Rx, S, Sdg, Sequential, T, Tdg, \
+    ToMatrix, X, convert
 from braandket_circuit.traits_impls.convert.invert import Invert
 
 
@@ -33,3 +39,41 @@ def test_invert_sequential():
     assert isinstance(inverted[3], Remapped)
     assert inverted[3].indices == (0,)
     assert inverted[3].op is H
+
+
+def test_invert_phase_gates():
+    assert convert(Invert(), S) is Sdg
+    assert convert(Invert(), Sdg) is S
+    assert convert(Invert(), T) is Tdg
+    assert convert(Invert(), Tdg) is T
+
+
+def test_invert_matrix():
+    op = QubitsMatrixOperation(np.asarray([[0, 1j], [1, 0]]))
+    inverted = convert(Invert(), op)
+    assert isinstance(inverted, QubitsMatrixOperation)
+    assert np.allclose(inverted.matrix @ op.matrix, np.eye(2))
+    assert convert(Invert(), inverted) is op
+
+
+def test_invert_memoized():
+    adder = Sequential(H.on(0), T.on(0), CNOT.on(0, 1), S.on(1))
+    circuit = Sequential(adder.on(0, 1), X.on(2), adder.on(1, 2))
+    inverted = convert(Invert(), circuit)
+    assert inverted[0].op is inverted[2].op
+    assert convert(Invert(), circuit) is inverted
+    assert convert(Invert(), inverted) is circuit
+
+    matrix = convert(ToMatrix(), Sequential(circuit, inverted))
+    assert np.allclose(matrix, np.eye(8))
+
+
+def test_invert_memoized_self_inverse():
+    remapped = Remapped(H, 7)
+    assert convert(Invert(), remapped) is remapped
+    assert Invert.lookup(remapped) is remapped
+
+    remapped_ref = weakref.ref(remapped)
+    del remapped
+    gc.collect()
+    assert remapped_ref() is None
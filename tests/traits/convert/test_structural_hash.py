@@ -0,0 +1,32 @@
+import numpy as np
+
+from braandket_circuit import CNOT, Controlled, H, MatrixOperation, QOperation, QParticle, Rx, Sequential, \
+    StructuralHash, X, convert
+
+
+def test_structural_hash_equal():
+    circuit1 = Sequential(H.on(0), CNOT.on(0, 1), Rx(0.5).on(1))
+    circuit2 = Sequential(H.on(0), Controlled(X).on(0, 1), Rx(0.5).on(1))
+    assert convert(StructuralHash(), circuit1) == convert(StructuralHash(), circuit2)
+
+
+def test_structural_hash_different():
+    circuit = Sequential(H.on(0), CNOT.on(0, 1), Rx(0.5).on(1))
+    assert convert(StructuralHash(), circuit) != convert(StructuralHash(), Sequential(H.on(0), CNOT.on(1, 0)))
+    assert convert(StructuralHash(), circuit) != convert(StructuralHash(), Sequential(H.on(0), Rx(0.6).on(1)))
+
+
+def test_structural_hash_matrix():
+    matrix = np.asarray([[0, 1], [1, 0]])
+    assert convert(StructuralHash(), MatrixOperation(matrix)) == convert(StructuralHash(), MatrixOperation(matrix))
+    assert convert(StructuralHash(), MatrixOperation(matrix)) != convert(StructuralHash(), MatrixOperation(-matrix))
+
+
+class CustomGate(QOperation[None]):
+    def __call__(self, q0: QParticle, q1: QParticle):
+        H(q0)
+        CNOT(q0, q1)
+
+
+def test_structural_hash_custom():
+    assert convert(StructuralHash(), CustomGate()) == convert(StructuralHash(), Sequential(H.on(0), CNOT.on(0, 1)))
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from braandket_circuit import C, CX, CZ, Controlled, H, I, MatrixOperation, PauliEvolution, Phase, QFT, QOperation, \
+    QParticle, Rx, Ry, Rz, S, Sequential, T, ToMatrix, X, Y, convert, simulate
+
+
+def _simulated_matrix(circuit, n: int) -> np.ndarray:
+    columns = []
+    for basis in range(2 ** n):
+        prepare = Sequential([X.on(i) for i in range(n) if (basis >> (n - 1 - i)) & 1])
+        columns.append(simulate(Sequential(prepare, circuit), n).state.reshape(-1))
+    return np.stack(columns, axis=1)
+
+
+def test_gates():
+    assert np.allclose(convert(ToMatrix(), H), np.asarray([[1, 1], [1, -1]]) / np.sqrt(2))
+    assert np.allclose(convert(ToMatrix(), CX), np.asarray([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]]))
+    assert np.allclose(convert(ToMatrix(), Sequential(H, X)), np.asarray([[1, -1], [1, 1]]) / np.sqrt(2))
+
+
+def test_circuit():
+    circuit = Sequential(
+        H.on(0), CX.on(0, 1), Rx(0.3).on(1), Ry(0.2).on(2), Rz(0.7).on(0), S.on(2), T.on(1),
+        X.on(2, control=(0, 1)), QFT(3).on(2, 0, 1), Phase(0.4).on(1), Y.on(0),
+        PauliEvolution({"XZ": 0.3, "YI": 0.2}, 0.7).on(2, 0),
+        C(Sequential(H.on(1), CZ.on(0, 1))).on(0, (1, 2)))
+    assert np.allclose(convert(ToMatrix(), circuit), _simulated_matrix(circuit, 3))
+
+
+def test_args():
+    # the 3rd qubit is not acted on, but given in the args
+    circuit = Sequential(H.on(0), CX.on(0, 1))
+    matrix = convert(ToMatrix((2, 2, 2)), circuit)
+    assert np.allclose(matrix, np.kron(convert(ToMatrix(), circuit), np.eye(2)))
+
+    # a qutrit
+    matrix = np.roll(np.eye(3), 1, axis=0)
+    circuit = Sequential(MatrixOperation(matrix).on(1), X.on(0))
+    assert np.allclose(convert(ToMatrix((2, 3)), circuit), np.kron(convert(ToMatrix(), X), matrix))
+
+
+class BellRotation(QOperation):
+    def __call__(self, q0: QParticle, q1: QParticle):
+        H(q0)
+        CX(q0, q1)
+        Rz(0.3)(q1)
+
+
+def test_controlled_identity():
+    for op in (Controlled(I), Controlled(Sequential())):
+        assert convert(ToMatrix(), op) == 1
+        assert np.allclose(convert(ToMatrix((2, 2)), op), np.eye(4))
+
+
+def test_custom():
+    expected = convert(ToMatrix(), Sequential(H.on(0), CX.on(0, 1), Rz(0.3).on(1)))
+    assert np.allclose(convert(ToMatrix(), BellRotation()), expected)
+
+    circuit = Sequential(BellRotation().on(1, 0), X.on(1))
+    expected = convert(ToMatrix(), Sequential(H.on(1), CX.on(1, 0), Rz(0.3).on(0), X.on(1)))
+    assert np.allclose(convert(ToMatrix(), circuit), expected)
+
+
+def test_wrong_dims():
+    # built-in ops are not simulated, so the error of their impl is raised
+    with pytest.raises(ValueError, match="dimensions"):
+        convert(ToMatrix((3,)), X)
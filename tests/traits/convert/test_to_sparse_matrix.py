@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from braandket_circuit import C, CX, CZ, H, QFT, Repeat, Rx, Rz, Sequential, T, ToMatrix, ToSparseMatrix, X, convert
+
+sparse = pytest.importorskip("scipy.sparse")
+
+
+def test_to_sparse_matrix():
+    circuit = Sequential(
+        H.on(0), CX.on(0, 2), Rx(0.3).on(1), X.on(2, control=(0, 1)), QFT(2).on(2, 0),
+        C(Sequential(H.on(1), CZ.on(0, 1))).on(0, (1, 2)))
+    matrix = convert(ToSparseMatrix(), circuit)
+    assert sparse.issparse(matrix)
+    assert np.allclose(matrix.toarray(), convert(ToMatrix(), circuit))
+
+    circuit = Repeat(Sequential(T.on(0), CX.on(0, 1)), 5)
+    assert np.allclose(convert(ToSparseMatrix((2, 2, 2)), circuit).toarray(), convert(ToMatrix((2, 2, 2)), circuit))
+
+
+def test_large_permutation():
+    n = 16
+    circuit = Sequential(
+        [X.on(i) for i in range(0, n, 2)] +
+        [CX.on(i, (i + 5) % n) for i in range(n)] +
+        [X.on(n - 1, control=tuple(range(n - 1)))] +
+        [Rz(0.1).on(i) for i in range(n)])
+    matrix = convert(ToSparseMatrix(), circuit)
+    assert matrix.shape == (2 ** n, 2 ** n)
+    assert matrix.nnz == 2 ** n
+    assert np.allclose(np.abs(matrix.data), 1)